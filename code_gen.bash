@@ -16,26 +16,8 @@ datamodel-codegen --input ramsin_adv.json \
     --output ramsin_adv_model.py \
     --class-name RamsinAdvanced
 
-get_list_vars()  {
-  grep ${1} ramsin_model.py ramsin_adv_model.py \
-  | cut -d':' -f2 \
-  | perl -pe 's{^(.*)$}{"$1",}; s/\s+//; s/\n+//'
-}
-
-FLOAT_LIST_VARS=$(get_list_vars "List\[float\]")
-INT_LIST_VARS=$(get_list_vars "List\[int\]")
-STR_LIST_VARS=$(get_list_vars "List\[str\]")
-BOOL_LIST_VARS=$(get_list_vars "List\[bool\]")
-
-
 cat <<-EOF > ramsin_model_config.py
 from pydantic.env_settings import SettingsSourceCallable
-from typing import Any
-
-FLOAT_LIST_VARS = [${FLOAT_LIST_VARS%,}]
-INT_LIST_VARS = [${INT_LIST_VARS%,}]
-STR_LIST_VARS = [${STR_LIST_VARS%,}]
-BOOL_LIST_VARS = [${BOOL_LIST_VARS%,}]
 
 class RamsinConfig:
     env_prefix = 'RAMSIN_'
@@ -47,19 +29,11 @@ class RamsinConfig:
             env_settings: SettingsSourceCallable,
             file_secret_settings: SettingsSourceCallable,
     ) -> tuple[SettingsSourceCallable, ...]:
-        return env_settings, init_settings, file_secret_settings
-
-    @classmethod
-    def parse_env_var(cls, field_name: str, raw_val: str) -> Any:
-        if field_name in FLOAT_LIST_VARS:
-            return [float(x) for x in raw_val.split(',')]
-        elif field_name in INT_LIST_VARS:
-            return [int(x) for x in raw_val.split(',')]
-        elif field_name in STR_LIST_VARS:
-            return [str(x) for x in raw_val.split(',')]
-        elif field_name in BOOL_LIST_VARS:
-            return [bool(x) for x in raw_val.split(',')]
-        return cls.json_loads(raw_val)
+        # RAMSIN_* variables and override files are resolved in one pass by
+        # ramsin_env_resolver and layered over the template values (template <
+        # files < variables) before they reach the models as init settings.
+        # env_settings is left out, so pydantic never parses them itself.
+        return init_settings, file_secret_settings
 
 EOF
 
@@ -67,3 +41,45 @@ EOF
 sed -i -E '7s@^@from ramsin_model_config import RamsinConfig\n\n@ ;
    s@^(class .*:)$@\1\n    class Config(RamsinConfig): pass@
 ' ramsin_adv_model.py  ramsin_model.py
+
+#Generate the field registry used to resolve RAMSIN_* variables in one pass.
+#It is also the frozen schema the rule tables of ramsin_rules validate with,
+#so the default validation never builds the pydantic classes.
+python3 - > ramsin_field_registry.py <<'PY'
+from pydantic.fields import SHAPE_LIST
+from ramsin_model import RamsinBasic
+from ramsin_adv_model import RamsinAdvanced
+
+print("# generated by code_gen.bash from ramsin_model.py and ramsin_adv_model.py")
+print()
+print("# RAMSIN file -> model name")
+print("MODELS = {")
+for name, root in (("basic", RamsinBasic), ("advanced", RamsinAdvanced)):
+    print(f'    "{name}": "{root.__name__}",')
+print("}")
+print()
+print("# group -> RAMSIN file")
+print("GROUPS = {")
+for name, root in (("basic", RamsinBasic), ("advanced", RamsinAdvanced)):
+    for group in root.__fields__:
+        print(f'    "{group}": "{name}",')
+print("}")
+print()
+print("# variable -> (group, type, is list)")
+print("FIELDS = {")
+for root in (RamsinBasic, RamsinAdvanced):
+    for group, group_field in root.__fields__.items():
+        for name, field in group_field.type_.__fields__.items():
+            print(f'    "{name}": ("{group}", "{field.type_.__name__}", '
+                  f'{field.shape == SHAPE_LIST}),')
+print("}")
+print()
+print("# variable -> default, for the variables that may be left out")
+print("DEFAULTS = {")
+for root in (RamsinBasic, RamsinAdvanced):
+    for group, group_field in root.__fields__.items():
+        for name, field in group_field.type_.__fields__.items():
+            if not field.required:
+                print(f'    "{name}": {field.default!r},')
+print("}")
+PY
@@ -0,0 +1,268 @@
+from __future__ import annotations
+import argparse
+import copy
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ramsin_env import read_ramsin, render_ramsin, write_output, get_advanced_path, \
+    add_template_args, add_override_args, add_adjust_args, get_adjusters, template_parser, \
+    open_manifest
+from ramsin_env_resolver import resolve_environ, resolve_overrides, layer
+
+ENV_PREFIX = "RAMSIN_"
+
+_templates = {}
+
+
+def get_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="ramsin_env.py batch",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="""
+Render many RAMSIN_BASIC/RAMSIN_ADVANCED pairs in one process.
+Each row of the override table is one member. Keys are RAMSIN_* variable
+names (the RAMSIN_ prefix is optional) and values use the same syntax as the
+environment variables. Row values take precedence over the environment.
+
+Output paths are templates formatted with {index} and the row overrides in
+lower case without the prefix, e.g. "runs/{expnme}/RAMSIN_BASIC_{index}".
+Unless --ramsin_advanced is given, a row may name its own RAMSIN_ADVANCED
+with ADVANCED_RAMSIN; each one is read once.""",
+    )
+
+    parser.add_argument(
+        "table",
+        action="store",
+        type=str,
+        help="the JSONL or CSV override table",
+    )
+    parser.add_argument(
+        "--format",
+        "-f",
+        action="store",
+        type=str,
+        choices=["jsonl", "csv"],
+        default=None,
+        help="the table format (default: guessed from the extension)",
+    )
+    parser.add_argument(
+        "--ramsin_basic",
+        "-rb",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC",
+        help="the RAMSIN_BASIC file",
+    )
+    parser.add_argument(
+        "--ramsin_advanced",
+        "-ra",
+        action="store",
+        type=str,
+        default="",
+        help="the RAMSIN_ADVANCED file",
+    )
+    parser.add_argument(
+        "--output_basic",
+        "-ob",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC_MODIFIED_{index}",
+        help="the filename template to write each RAMSIN_BASIC",
+    )
+    parser.add_argument(
+        "--output_advanced",
+        "-oa",
+        action="store",
+        type=str,
+        default="RAMSIN_ADVANCED_MODIFIED_{index}",
+        help="the filename template to write each RAMSIN_ADVANCED",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        action="store",
+        type=int,
+        default=os.cpu_count(),
+        help="the number of worker processes (1 renders in this process)",
+    )
+    parser.add_argument(
+        "--manifest",
+        action="store",
+        type=str,
+        default=None,
+        help="a JSON manifest of the outputs written: an output whose rendered\n"
+             "text is unchanged is not written again, keeping its mtime",
+    )
+    parser.add_argument(
+        "--fsync",
+        action="store_true",
+        help="fsync each output and its directory before returning",
+    )
+    add_override_args(parser)
+    add_template_args(parser)
+    add_adjust_args(parser)
+
+    args = parser.parse_args(argv)
+    args.parser = template_parser(parser, args)
+    return args
+
+
+def env_name(key):
+    key = key.strip().upper()
+    if not key.startswith(ENV_PREFIX):
+        key = ENV_PREFIX + key
+    return key
+
+
+def env_value(value):
+    if isinstance(value, bool):
+        return ".true." if value else ".false."
+    if isinstance(value, (list, tuple)):
+        return ",".join(env_value(x) for x in value)
+    return str(value)
+
+
+def read_table(path, table_format=None):
+    if table_format is None:
+        table_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+
+    with open(path, newline="") as f:
+        if table_format == "csv":
+            rows = [row for row in csv.DictReader(f)]
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    return [
+        {env_name(k): env_value(v) for k, v in row.items() if v is not None and v != ""}
+        for row in rows
+    ]
+
+
+def output_paths(index, overrides, output_basic, output_advanced):
+    fields = {k[len(ENV_PREFIX):].lower(): v for k, v in overrides.items()}
+    fields["index"] = index
+    return output_basic.format(**fields), output_advanced.format(**fields)
+
+
+def init_worker(ramsin_basic, ramsin_advanced, read_args, writer, validator, adjusters,
+                environ_overrides, manifest=None, fsync=False):
+    # ramsin_advanced maps paths to the RAMSIN_ADVANCED templates read so far,
+    # read_args are the path given with --ramsin_advanced and the read_ramsin
+    # options for the others
+    _templates["basic"] = ramsin_basic
+    _templates["advanced"] = ramsin_advanced
+    _templates["read_args"] = read_args
+    _templates["writer"] = writer
+    _templates["validator"] = validator
+    _templates["adjusters"] = adjusters
+    _templates["environ"] = environ_overrides
+    _templates["manifest"] = manifest
+    _templates["fsync"] = fsync
+
+
+def template(ramsin):
+    # The f90nml writer patches the namelist in place, splice leaves it alone
+    if _templates["writer"] == "f90nml":
+        return copy.deepcopy(ramsin)
+    return ramsin
+
+
+def advanced_template(basic_patch):
+    # A member may name another RAMSIN_ADVANCED with ADVANCED_RAMSIN, each one
+    # is read once
+    ramsin_advanced, *options = _templates["read_args"]
+    path = get_advanced_path(basic_patch, ramsin_advanced)
+    templates = _templates["advanced"]
+    if path not in templates:
+        templates[path] = read_ramsin(path, *options)
+    return template(templates[path])
+
+
+def write_ramsin(text, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return write_output(path, text, _templates["manifest"], _templates["fsync"])
+
+
+def render_member(member):
+    index, overrides, output_basic, output_advanced = member
+    try:
+        output_basic, output_advanced = output_paths(index, overrides,
+                                                     output_basic, output_advanced)
+        writer = _templates["writer"]
+        validator = _templates["validator"]
+        resolved = layer(_templates["environ"], resolve_environ(overrides))
+        adjusters = _templates["adjusters"]
+        basic_patch, basic_text = render_ramsin(template(_templates["basic"]), "basic",
+                                                resolved, writer, validator,
+                                                adjusters=adjusters)
+        _, advanced_text = render_ramsin(advanced_template(basic_patch), "advanced",
+                                         resolved, writer, validator, adjusters=adjusters)
+        statuses = [write_ramsin(basic_text, output_basic),
+                    write_ramsin(advanced_text, output_advanced)]
+    except Exception as e:
+        return index, f"{type(e).__name__}: {e}", 0, {}
+    # The manifest entries go back to the main process, which saves them
+    manifest = _templates["manifest"]
+    updates = manifest.take_updates() if manifest is not None else {}
+    return index, None, statuses.count("reused"), updates
+
+
+def batch_main(argv=None):
+    args = get_args(argv)
+
+    ramsin_basic = read_ramsin(args.ramsin_basic, args.use_cache, args.cache_dir,
+                               args.parser)
+    ramsin_advanced_path = get_advanced_path(ramsin_basic, args.ramsin_advanced)
+    ramsin_advanced = {ramsin_advanced_path: read_ramsin(
+        ramsin_advanced_path, args.use_cache, args.cache_dir, args.parser)}
+    read_args = (args.ramsin_advanced, args.use_cache, args.cache_dir, args.parser)
+
+    rows = read_table(args.table, args.format)
+    members = [
+        (index, overrides, args.output_basic, args.output_advanced)
+        for index, overrides in enumerate(rows)
+    ]
+
+    print(f"Rendering {len(members)} configurations from {args.table} "
+          f"using {args.ramsin_basic} and {ramsin_advanced_path}")
+
+    environ_overrides = resolve_overrides(args.override_file)
+    adjusters = get_adjusters(args)
+    manifest = open_manifest(args.manifest)
+
+    start = time.perf_counter()
+    if args.jobs is None or args.jobs <= 1:
+        init_worker(ramsin_basic, ramsin_advanced, read_args, args.writer, args.validator,
+                    adjusters, environ_overrides, manifest, args.fsync)
+        results = [render_member(member) for member in members]
+    else:
+        chunksize = max(1, len(members) // (4 * args.jobs))
+        with ProcessPoolExecutor(
+                max_workers=args.jobs, initializer=init_worker,
+                initargs=(ramsin_basic, ramsin_advanced, read_args, args.writer,
+                          args.validator, adjusters, environ_overrides, manifest,
+                          args.fsync)) as executor:
+            results = list(executor.map(render_member, members, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    failures = [(index, error) for index, error, _, _ in results if error is not None]
+    for index, error in failures:
+        print(f"Member {index} failed: {error}", file=sys.stderr)
+
+    rendered = len(results) - len(failures)
+    rate = rendered / elapsed if elapsed > 0 else float("inf")
+    print(f"Rendered {rendered}/{len(results)} configurations in {elapsed:.2f}s "
+          f"({rate:.1f} configs/s)")
+    if manifest is not None:
+        manifest.save({path: entry for _, _, _, updates in results
+                       for path, entry in updates.items()})
+        reused = sum(reused for _, _, reused, _ in results)
+        print(f"Reused {reused}/{2 * rendered} unchanged outputs")
+
+    return 1 if failures else 0
@@ -0,0 +1,326 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import ramsin_incremental
+from ramsin_env import read_ramsin, merge_overrides, validate_ramsin, write_text, PARSERS, \
+    VALIDATORS, WRITERS
+from ramsin_env_resolver import resolve_environ, ENV_PREFIX
+from ramsin_field_registry import FIELDS
+from ramsin_rules import RULES, as_tuple
+
+# Times each stage of a render (import, parse, env resolution, validation,
+# patch and write) on the shipped templates and on synthetic stress templates,
+# optionally saving the results as JSON and comparing them with a baseline.
+
+IMPORTS = {
+    "ramsin_env": "import ramsin_env",
+    "f90nml": "import f90nml",
+    "pydantic models": "import ramsin_model_validator, ramsin_adv_model_validator",
+    "rules": "import ramsin_rules",
+    "pydantic-core": "import ramsin_core",
+}
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="""
+Time the stages of a render on RAMSIN_BASIC/RAMSIN_ADVANCED and on synthetic
+stress templates (many nested grids in MODEL_GRIDS2, hundreds of ZZ levels
+and a large environment). Times are the best round, in seconds per call.""",
+    )
+    parser.add_argument(
+        "--ramsin_basic",
+        "-rb",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC",
+        help="the RAMSIN_BASIC file",
+    )
+    parser.add_argument(
+        "--ramsin_advanced",
+        "-ra",
+        action="store",
+        type=str,
+        default="RAMSIN_ADVANCED",
+        help="the RAMSIN_ADVANCED file",
+    )
+    parser.add_argument(
+        "--repeat",
+        "-n",
+        action="store",
+        type=int,
+        default=20,
+        help="the number of calls timed per round",
+    )
+    parser.add_argument(
+        "--stages",
+        action="store",
+        type=str,
+        default="import,parse,resolve,validate,patch,write",
+        help="the comma separated stages to time",
+    )
+    parser.add_argument(
+        "--grids",
+        action="store",
+        type=int,
+        default=64,
+        help="the number of grids in the stress RAMSIN_ADVANCED",
+    )
+    parser.add_argument(
+        "--levels",
+        action="store",
+        type=int,
+        default=400,
+        help="the number of ZZ levels in the stress RAMSIN_BASIC",
+    )
+    parser.add_argument(
+        "--environ_size",
+        action="store",
+        type=int,
+        default=5000,
+        help="the number of unrelated variables in the stress environment",
+    )
+    parser.add_argument(
+        "--json",
+        action="store",
+        type=str,
+        default=None,
+        help="write the results to this JSON file (use it later as --baseline)",
+    )
+    parser.add_argument(
+        "--baseline",
+        action="store",
+        type=str,
+        default=None,
+        help="compare with the results saved in this JSON file",
+    )
+    parser.add_argument(
+        "--tolerance",
+        action="store",
+        type=float,
+        default=0.2,
+        help="the slowdown over the baseline reported as a regression (default: 0.2)",
+    )
+    return parser.parse_args()
+
+
+def best_of(func, repeat, rounds=5):
+    # Best round of `repeat` calls, in seconds per call
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def time_import(statement, rounds=5):
+    # Cold import in a fresh interpreter, timed inside it to leave out start up
+    code = ("import time; start = time.perf_counter(); " + statement +
+            "; print(time.perf_counter() - start)")
+    best = float("inf")
+    for _ in range(rounds):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if result.returncode != 0:
+            return None
+        best = min(best, float(result.stdout))
+    return best
+
+
+def env_value(value):
+    if isinstance(value, list):
+        return ",".join(env_value(v) for v in value)
+    if isinstance(value, bool):
+        return ".true." if value else ".false."
+    return str(value)
+
+
+def stress_environ(templates, size):
+    # Unrelated variables plus every scalar and numeric list of the templates:
+    # strings without rules get a new value, the others their template value
+    constrained = {name for rules in RULES.values() for _, fields, _ in rules
+                   for name in as_tuple(fields)}
+    environ = {f"UNRELATED_VARIABLE_{i}": "x" * 40 for i in range(size)}
+    for ramsin in templates.values():
+        for group, variables in ramsin.items():
+            for name, value in variables.items():
+                _, type_name, is_list = FIELDS.get(name, (None, "str", False))
+                if is_list and type_name == "str" or value is None:
+                    continue
+                if type_name == "str" and name not in constrained:
+                    value = f"{value}_stress"
+                environ[f"{ENV_PREFIX}{group}_{name}".upper()] = env_value(value)
+    return environ
+
+
+def stress_templates(templates, directory, grids, levels):
+    import ramsin_nml
+
+    basic = templates["basic"]
+    zz = [float(i * 50) for i in range(levels)]
+    basic_text = basic.splice({"model_grids": {"nnzp": levels, "deltaz": 0.0, "zz": zz}})
+
+    advanced = templates["advanced"]
+    per_grid = {
+        name: (value * grids)[:grids]
+        for name, value in advanced["model_grids2"].items() if isinstance(value, list)
+    }
+    per_grid["ngrids"] = grids
+    advanced_text = advanced.splice({"model_grids2": per_grid})
+
+    paths = {}
+    for name, text in (("basic", basic_text), ("advanced", advanced_text)):
+        paths[name] = os.path.join(directory, f"RAMSIN_{name.upper()}_STRESS")
+        write_text(paths[name], text)
+    return paths, {name: ramsin_nml.read(path) for name, path in paths.items()}
+
+
+def bench_imports(results):
+    for name, statement in IMPORTS.items():
+        seconds = time_import(statement)
+        if seconds is not None:
+            results[f"import/{name}"] = seconds
+
+
+def run_once(path, ramsin_file, overrides, cache_dir, validator):
+    ramsin_incremental.BASES.clear()
+    ramsin = read_ramsin(path, cache_dir=cache_dir, parser="native", half=ramsin_file,
+                         validator=validator)
+    return validate_ramsin(ramsin, ramsin_file, overrides, validator)
+
+
+def bench_scenario(scenario, paths, templates, environ, stages, repeat, directory,
+                   results):
+    if "resolve" in stages:
+        results[f"{scenario}/resolve"] = best_of(lambda: resolve_environ(environ), repeat)
+    overrides = resolve_environ(environ)
+
+    for ramsin_file, path in paths.items():
+        prefix = f"{scenario}/{ramsin_file}"
+
+        if "parse" in stages:
+            for parser in PARSERS:
+                results[f"{prefix}/parse/{parser}"] = best_of(
+                    lambda: read_ramsin(path, use_cache=False, parser=parser), repeat)
+            cache_dir = os.path.join(directory, "cache")
+            read_ramsin(path, cache_dir=cache_dir, parser="native")
+            results[f"{prefix}/parse/cached"] = best_of(
+                lambda: read_ramsin(path, cache_dir=cache_dir, parser="native"), repeat)
+
+        ramsin = templates[ramsin_file]
+        values = merge_overrides(dict(ramsin.items()), overrides)
+        patch = None
+        for name, validate in VALIDATORS.items():
+            if name == "incremental":
+                # Against this template, as in a batch or a daemon
+                ramsin_incremental.prime(dict(ramsin.items()), ramsin_file)
+            try:
+                # Warm up, this also pays the model imports outside the timing
+                patch = validate(values, ramsin_file)
+            except ImportError:
+                continue
+            if "validate" in stages:
+                results[f"{prefix}/validate/{name}"] = best_of(
+                    lambda: validate(values, ramsin_file), repeat)
+
+        if "validate" in stages:
+            # One command line render: the cached template, then its validation.
+            # The incremental check of the template is cached with the parse.
+            cache_dir = os.path.join(directory, "cache")
+            for name in ("rules", "incremental"):
+                results[f"{prefix}/run/{name}"] = best_of(
+                    lambda: run_once(path, ramsin_file, overrides, cache_dir, name), repeat)
+
+        texts = {}
+        for name, render in WRITERS.items():
+            texts[name] = render(ramsin, patch)
+            if "patch" in stages:
+                results[f"{prefix}/patch/{name}"] = best_of(
+                    lambda: render(ramsin, patch), repeat)
+
+        if "write" in stages:
+            output = os.path.join(directory, f"{scenario}_{ramsin_file}_output")
+            results[f"{prefix}/write"] = best_of(
+                lambda: write_text(output, texts["f90nml"]), repeat)
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, seconds in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        ratio = seconds / before
+        if ratio > 1 + tolerance:
+            regressions.append((key, before, seconds, ratio))
+    return regressions
+
+
+def format_seconds(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:9.2f} ms"
+    return f"{seconds * 1e6:9.1f} us"
+
+
+def main():
+    args = get_args()
+    stages = set(args.stages.split(","))
+    paths = {"basic": args.ramsin_basic, "advanced": args.ramsin_advanced}
+    templates = {name: read_ramsin(path, use_cache=False, parser="native")
+                 for name, path in paths.items()}
+
+    results = {}
+    if "import" in stages:
+        bench_imports(results)
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench_scenario("templates", paths, templates, dict(os.environ), stages,
+                       args.repeat, directory, results)
+        stress_paths, stress = stress_templates(templates, directory, args.grids,
+                                                args.levels)
+        environ = {**os.environ, **stress_environ(stress, args.environ_size)}
+        bench_scenario("stress", stress_paths, stress, environ, stages, args.repeat,
+                       directory, results)
+
+    baseline = {}
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    for key, seconds in results.items():
+        line = f"{key:45} {format_seconds(seconds)}"
+        if key in baseline:
+            line += f"  {seconds / baseline[key]:6.2f}x baseline"
+        print(line)
+
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "repeat": args.repeat,
+                "stress": {"grids": args.grids, "levels": args.levels,
+                           "environ_size": args.environ_size},
+                "results": results,
+            }, f, indent=2)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for key, before, seconds, ratio in regressions:
+        print(f"REGRESSION {key}: {format_seconds(before).strip()} -> "
+              f"{format_seconds(seconds).strip()} ({ratio:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+
+CACHE_VERSION = 3
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ramsin_env")
+
+
+def cache_key(path, stat, content, tag):
+    content_hash = hashlib.sha256(content).hexdigest()
+    return (CACHE_VERSION, tag, os.path.realpath(path), stat.st_mtime_ns, stat.st_size,
+            content_hash)
+
+
+def cache_path(cache_dir, key):
+    name = hashlib.sha256(repr(key).encode()).hexdigest()
+    return os.path.join(cache_dir, f"{name}.pickle")
+
+
+def load_entry(path, key):
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Truncated or stale entry, drop it and parse again
+        remove_entry(path)
+        return None
+
+    if entry.get("key") != key:
+        return None
+
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return entry
+
+
+def store_entry(cache_dir, path, entry):
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_entry(tmp_path)
+        raise
+
+
+def remove_entry(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def evict(cache_dir, max_bytes=MAX_CACHE_BYTES):
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith(".pickle"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    # Least recently used first, hits refresh the mtime in load_entry
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        remove_entry(path)
+        total -= size
+
+
+def cached_parse(path, parse, tag, cache_dir=None, max_bytes=MAX_CACHE_BYTES, timed=None):
+    # timed(name) times the "read" (file and cache entry) and "parse" steps
+    if timed is None:
+        def timed(name):
+            return contextlib.nullcontext()
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+
+    with timed("read"):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            content = f.read()
+
+        key = cache_key(path, stat, content, tag)
+        entry_path = cache_path(cache_dir, key)
+        entry = load_entry(entry_path, key)
+    if entry is not None:
+        return entry["value"]
+
+    with timed("parse"):
+        value = parse(content.decode())
+    with timed("read"):
+        try:
+            store_entry(cache_dir, entry_path, {"key": key, "value": value})
+            evict(cache_dir, max_bytes)
+        except OSError:
+            # A read-only or full cache directory must not break the render
+            pass
+    return value
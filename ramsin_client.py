@@ -0,0 +1,55 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import sys
+
+# Thin client of the `ramsin_env.py serve` daemon (see ramsin_serve for the
+# protocol), kept to the standard library so a job pays little to start it.
+
+
+def request(path, message):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def render_remote(args):
+    # Returns None when the daemon cannot be reached, so the caller renders itself
+    message = {
+        "environ": {k: v for k, v in os.environ.items() if k.upper().startswith("RAMSIN_")},
+        "override_files": args.override_file or [],
+        "cwd": os.getcwd(),
+        "ramsin_basic": args.ramsin_basic,
+        "ramsin_advanced": args.ramsin_advanced,
+        "output_basic": args.output_basic,
+        "output_advanced": args.output_advanced,
+        "manifest": getattr(args, "manifest", None),
+        "fsync": getattr(args, "fsync", False),
+        "parser": args.parser,
+        "writer": args.writer,
+        "validator": args.validator,
+        "adjust": {name: getattr(args, name) for name in (
+            "check_zz", "emit_zz", "max_stretch", "check_sounding", "sounding",
+            "check_dimensions", "preflight", "preflight_workers")},
+    }
+    try:
+        response = request(args.socket, message)
+    except (OSError, ValueError) as e:
+        print(f"No ramsin_env daemon on {args.socket} ({e}), rendering here",
+              file=sys.stderr)
+        return None
+
+    if not response["ok"]:
+        print(response["error"], file=sys.stderr)
+        return 1
+
+    print(f"Updating RAMSIN_BASIC from {args.ramsin_basic}")
+    if "status_basic" in response:
+        print(f"  {response['status_basic']} {args.output_basic}")
+    print(f"Updating RAMSIN_ADVANCED from {response['ramsin_advanced']}")
+    if "status_advanced" in response:
+        print(f"  {response['status_advanced']} {args.output_advanced}")
+    return 0
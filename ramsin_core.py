@@ -0,0 +1,136 @@
+from __future__ import annotations
+import math
+
+from pydantic_core import SchemaValidator, PydanticCustomError, core_schema as cs
+
+from ramsin_field_registry import GROUPS, FIELDS, DEFAULTS, MODELS
+from ramsin_rules import RULES, RULE_COMPILERS, COMPILED_CROSS_RULES, as_tuple
+
+# The RAMSIN schema on the pydantic v2 core. Field types come from the field
+# registry and the value rules from the ramsin_rules tables, so the three
+# validation backends check the same schema. Choices and bounds become core
+# constraints checked in Rust, rules relating several variables run as group
+# and model level functions.
+
+NATIVE_RULES = {"choices", "each_choice", "positive", "minimum", "between", "min_length"}
+
+
+def truncate_float(v):
+    # pydantic 1 truncates floats given to int fields, the v2 core rejects them
+    if isinstance(v, float) and math.isfinite(v):
+        return int(v)
+    return v
+
+
+def to_str(v):
+    # pydantic 1 turns numbers (bools included) into strings
+    if isinstance(v, (int, float)):
+        return str(v)
+    return v
+
+
+def base_schema(type_name, **constraints):
+    if type_name == "int":
+        return cs.no_info_before_validator_function(truncate_float, cs.int_schema(**constraints))
+    if type_name == "float":
+        return cs.float_schema(**constraints)
+    if type_name == "str":
+        return cs.no_info_before_validator_function(to_str, cs.str_schema(**constraints))
+    return cs.bool_schema()
+
+
+def native_constraints(group):
+    # variable -> (core constraints, allowed values of the scalar or of each item)
+    constraints = {}
+    for kind, fields, params in RULES.get(group, ()):
+        if kind not in NATIVE_RULES:
+            continue
+        for name in as_tuple(fields):
+            kwargs, choices = constraints.get(name, ({}, None))
+            if kind == "choices" or kind == "each_choice":
+                choices = list(params)
+            elif kind == "positive":
+                kwargs["gt"] = 0
+            elif kind == "minimum":
+                kwargs["ge"] = params[0]
+            elif kind == "between":
+                kwargs["ge"], kwargs["le"] = params
+            elif kind == "min_length":
+                kwargs["min_length"] = params[0]
+            constraints[name] = (kwargs, choices)
+    return constraints
+
+
+def field_schema(name, constraints):
+    _, type_name, is_list = FIELDS[name]
+    kwargs, choices = constraints.get(name, ({}, None))
+    item = base_schema(type_name, **kwargs)
+    if choices is not None:
+        item = cs.chain_schema([item, cs.literal_schema(choices)])
+    if is_list:
+        item = cs.list_schema(item)
+    if name in DEFAULTS:
+        return cs.with_default_schema(item, default=DEFAULTS[name])
+    return item
+
+
+def group_function(group):
+    checks = [RULE_COMPILERS[kind](as_tuple(fields), params)
+              for kind, fields, params in RULES.get(group, ()) if kind not in NATIVE_RULES]
+    if not checks:
+        return None
+
+    def validate_group(values):
+        for check in checks:
+            for name, message in check(values):
+                raise PydanticCustomError("value_error", "{name}: {message}",
+                                          {"name": name, "message": message})
+        return values
+    return validate_group
+
+
+def group_schema(group):
+    constraints = native_constraints(group)
+    fields = {
+        name: cs.typed_dict_field(field_schema(name, constraints), required=name not in DEFAULTS)
+        for name, (field_group, _, _) in FIELDS.items() if field_group == group
+    }
+    schema = cs.typed_dict_schema(fields, extra_behavior="forbid", total=True)
+    validate_group = group_function(group)
+    if validate_group is not None:
+        schema = cs.no_info_after_validator_function(validate_group, schema)
+    return schema
+
+
+def model_function(groups):
+    checks = [(group, check) for group in groups for check in COMPILED_CROSS_RULES.get(group, ())]
+
+    def validate_model(values):
+        for group, check in checks:
+            for message in check(values):
+                raise PydanticCustomError("value_error", "{group}: {message}",
+                                          {"group": group, "message": message})
+        return values
+    return validate_model
+
+
+def build_validator(ramsin_file, only=None):
+    # With only, the schema has just those groups
+    groups = [group for group, file_of_group in GROUPS.items()
+              if file_of_group == ramsin_file and (only is None or group in only)]
+    schema = cs.typed_dict_schema(
+        {group: cs.typed_dict_field(group_schema(group)) for group in groups},
+        extra_behavior="forbid", total=True)
+    schema = cs.no_info_after_validator_function(model_function(groups), schema)
+    return SchemaValidator(schema, cs.CoreConfig(title=MODELS[ramsin_file]))
+
+
+VALIDATORS = {}
+
+
+def validate(values, ramsin_file, groups=None):
+    key = ramsin_file if groups is None else (ramsin_file, frozenset(groups))
+    validator = VALIDATORS.get(key)
+    if validator is None:
+        validator = VALIDATORS[key] = build_validator(ramsin_file, groups)
+    return validator.validate_python(values)
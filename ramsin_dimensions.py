@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+# The arrays whose length a size variable of either file governs. Arrays with a
+# value per grid need at least NGRIDS values (BRAMS reads the first NGRIDS),
+# arrays with a value per soil layer exactly NZG.
+
+NGRIDS = ("model_grids2", "ngrids")
+NZG = ("model_grids", "nzg")
+
+
+def per(size, exact, group, *names):
+    return {(group, name): (size, exact) for name in names}
+
+
+# (group, variable) -> (size (group, variable), exact)
+DIMENSIONS = {
+    **per(NGRIDS, False, "model_grids2", "nstratx", "nstraty", "nndtrat", "ninest", "njnest",
+          "nknest", "nnsttop", "nnstbot", "nxtnest"),
+    **per(NGRIDS, False, "ccatt_info2", "diur_cycle"),
+    **per(NGRIDS, False, "model_file_info2", "wt_nudge_grid", "itoptflg", "isstflg",
+          "ivegtflg", "isoilflg", "ndviflg", "nofilflg", "itopsflg", "toptenh", "toptwvl",
+          "iz0flg", "z0max"),
+    **per(NGRIDS, False, "model_options2", "idiffk", "csx", "csz", "xkhkm", "zkhkm", "akmin"),
+    **per(NGRIDS, False, "isan_isentropic2", "gridwt"),
+    **per(NZG, True, "model_options2", "slz", "slmstr", "stgoff"),
+}
+
+
+def check_dimensions(values):
+    # values holds the validated groups of both files
+    errors = []
+    for (group, name), ((size_group, size_name), exact) in DIMENSIONS.items():
+        value = values[group][name]
+        length = len(value) if isinstance(value, list) else 1
+        size = values[size_group][size_name]
+        if length < size or exact and length != size:
+            errors.append(f"{name.upper()} ({group.upper()}) has {length} value"
+                          f"{'' if length == 1 else 's'}, {size_name.upper()} is {size}"
+                          f"{'' if exact else ' (at least that many are needed)'}")
+    return errors
@@ -0,0 +1,217 @@
+from __future__ import annotations
+import argparse
+import math
+import sys
+
+from ramsin_env import read_ramsin, validate_ramsin, get_advanced_path, render_files, \
+    write_text, add_template_args, add_override_args, template_parser
+from ramsin_env_resolver import resolve_overrides
+
+# Largest stable timesteps of each grid. A grid's long timestep is bounded by
+# horizontal advection at --max_wind over DELTAX/DELTAY and vertical advection
+# at --max_vertical_wind over the smallest ZZ spacing; its NACOUST acoustic
+# steps by the sound speed over DELTAX/DELTAY (the vertical acoustic terms are
+# implicit). Nests divide the spacing by NSTRATX/NSTRATY and the timestep of
+# their parent (NXTNEST) by NNDTRAT, so each limit is carried back to the
+# coarse grid DTLONG. Vertical nesting (NSTRATZ) is not taken into account.
+
+MAX_WIND = 80.0
+MAX_VERTICAL_WIND = 0.5
+SOUND_SPEED = 340.0
+ADVECTIVE_COURANT = 0.8
+ACOUSTIC_COURANT = 1.0
+# The groups read from each file, validated even with --parser lazy
+READ_GROUPS = {"basic": ("model_grids",), "advanced": ("model_grids2",)}
+
+
+def get_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="ramsin_env.py dtlong",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="""
+Print the largest stable long and acoustic timesteps of each grid of the run
+described by RAMSIN_BASIC/RAMSIN_ADVANCED and the RAMSIN_* variables, and the
+largest DTLONG within them that FRQANL, CHEM_TIMESTEP and AER_TIMESTEP are
+still multiples of. With --apply the templates are rendered with that DTLONG.""",
+    )
+
+    parser.add_argument(
+        "--ramsin_basic",
+        "-rb",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC",
+        help="the RAMSIN_BASIC file",
+    )
+    parser.add_argument(
+        "--ramsin_advanced",
+        "-ra",
+        action="store",
+        type=str,
+        default="",
+        help="the RAMSIN_ADVANCED file",
+    )
+    parser.add_argument(
+        "--output_basic",
+        "-ob",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC_MODIFIED",
+        help="the filename to write the RAMSIN_BASIC with --apply",
+    )
+    parser.add_argument(
+        "--output_advanced",
+        "-oa",
+        action="store",
+        type=str,
+        default="RAMSIN_ADVANCED_MODIFIED",
+        help="the filename to write the RAMSIN_ADVANCED with --apply",
+    )
+    parser.add_argument(
+        "--max_wind",
+        action="store",
+        type=float,
+        default=MAX_WIND,
+        help=f"the largest horizontal wind speed expected, m/s (default: {MAX_WIND:g})",
+    )
+    parser.add_argument(
+        "--max_vertical_wind",
+        action="store",
+        type=float,
+        default=MAX_VERTICAL_WIND,
+        help=f"the largest vertical wind speed expected, m/s (default: {MAX_VERTICAL_WIND:g})",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="render the templates with the suggested DTLONG",
+    )
+    add_override_args(parser)
+    add_template_args(parser)
+
+    args = parser.parse_args(argv)
+    args.parser = template_parser(parser, args)
+    if args.max_wind <= 0 or args.max_vertical_wind <= 0:
+        parser.error("--max_wind and --max_vertical_wind must be positive")
+    return args
+
+
+def per_grid(value, grid):
+    if isinstance(value, list):
+        return value[grid] if grid < len(value) else value[-1]
+    return value
+
+
+def min_dz(grids):
+    if grids["deltaz"] > 0:
+        from ramsin_vgrid import compute_zz
+        zz = compute_zz(grids["deltaz"], grids["dzrat"], grids["dzmax"], grids["nnzp"])
+    else:
+        zz = grids["zz"]
+    return min(b - a for a, b in zip(zz, zz[1:]))
+
+
+def grid_limits(basic, advanced, max_wind=MAX_WIND, max_vertical_wind=MAX_VERTICAL_WIND):
+    grids = basic["model_grids"]
+    grids2 = advanced["model_grids2"]
+    nacoust = grids2["nacoust"]
+    dz = min_dz(grids)
+    if dz <= 0:
+        raise ValueError("ZZ must increase to derive the vertical timestep limit")
+
+    limits = []
+    for grid in range(grids2["ngrids"]):
+        if grid == 0:
+            dx, dy, ratio = grids["deltax"], grids["deltay"], 1
+        else:
+            parent = per_grid(grids2["nxtnest"], grid) - 1
+            if not 0 <= parent < grid:
+                raise ValueError(f"NXTNEST of grid {grid + 1} must name a coarser grid")
+            dx = limits[parent]["deltax"] / per_grid(grids2["nstratx"], grid)
+            dy = limits[parent]["deltay"] / per_grid(grids2["nstraty"], grid)
+            ratio = limits[parent]["ratio"] * per_grid(grids2["nndtrat"], grid)
+
+        inverse_dx = math.hypot(1 / dx, 1 / dy)
+        advective = ADVECTIVE_COURANT / (max_wind * inverse_dx)
+        vertical = ADVECTIVE_COURANT * dz / max_vertical_wind
+        acoustic = ACOUSTIC_COURANT / (SOUND_SPEED * inverse_dx)
+        long_step = min(advective, vertical, acoustic * nacoust)
+        limits.append({
+            "grid": grid + 1,
+            "deltax": dx,
+            "deltay": dy,
+            "ratio": ratio,
+            "advective": advective,
+            "vertical": vertical,
+            "acoustic": acoustic,
+            "long": long_step,
+            "dtlong": long_step * ratio,
+        })
+    return limits
+
+
+def dtlong_checks():
+    # The cross-group rules that constrain DTLONG, see ramsin_rules.CROSS_RULES
+    from ramsin_rules import CROSS_RULES, compile_cross_rule
+    return [compile_cross_rule(rule) for rule in CROSS_RULES["basic"]
+            if rule[2][0] == ("model_grids", "dtlong")]
+
+
+def suggest_dtlong(basic, limit):
+    # Whole seconds from the limit down, like the templates use
+    checks = dtlong_checks()
+    for dtlong in range(math.floor(limit), 0, -1):
+        values = {**basic, "model_grids": {**basic["model_grids"], "dtlong": float(dtlong)}}
+        if not any(message for check in checks for message in check(values)):
+            return float(dtlong)
+    raise ValueError(f"No DTLONG of at least 1 s below {limit:g} s satisfies the "
+                     f"multiple-of constraints")
+
+
+def print_limits(limits, basic, advanced, suggested):
+    print(f"{'grid':>4} {'deltax':>10} {'ratio':>5} {'advective':>10} {'vertical':>10} "
+          f"{'acoustic':>10} {'long':>10} {'as DTLONG':>10}")
+    for limit in limits:
+        print(f"{limit['grid']:>4} {limit['deltax']:>10.1f} {limit['ratio']:>5} "
+              f"{limit['advective']:>10.2f} {limit['vertical']:>10.2f} "
+              f"{limit['acoustic']:>10.2f} {limit['long']:>10.2f} {limit['dtlong']:>10.2f}")
+    print(f"DTLONG {basic['model_grids']['dtlong']:g} s, largest stable "
+          f"{min(limit['dtlong'] for limit in limits):.2f} s, suggested {suggested:g} s")
+    ideltat = advanced["model_grids2"]["ideltat"]
+    if ideltat != 0:
+        print(f"IDELTAT = {ideltat}: the model adjusts the timesteps itself")
+
+
+def dtlong_main(argv=None):
+    args = get_args(argv)
+
+    def read(path, half=None):
+        return read_ramsin(path, args.use_cache, args.cache_dir, args.parser)
+
+    overrides = resolve_overrides(args.override_file)
+    basic = validate_ramsin(read(args.ramsin_basic), "basic", overrides, args.validator,
+                            READ_GROUPS["basic"])
+    ramsin_advanced_path = get_advanced_path(basic, args.ramsin_advanced)
+    advanced = validate_ramsin(read(ramsin_advanced_path), "advanced", overrides,
+                               args.validator, READ_GROUPS["advanced"])
+
+    limits = grid_limits(basic, advanced, args.max_wind, args.max_vertical_wind)
+    suggested = suggest_dtlong(basic, min(limit["dtlong"] for limit in limits))
+    print_limits(limits, basic, advanced, suggested)
+    if not args.apply:
+        return 0
+
+    overrides = {**overrides,
+                 "model_grids": {**overrides.get("model_grids", {}), "dtlong": suggested}}
+    basic_text, ramsin_advanced_path, advanced_text = render_files(
+        args.ramsin_basic, args.ramsin_advanced, overrides, read, args.writer,
+        args.validator)
+    print(f"Updating RAMSIN_BASIC from {args.ramsin_basic}")
+    write_text(args.output_basic, basic_text)
+    print(f"Updating RAMSIN_ADVANCED from {ramsin_advanced_path}")
+    write_text(args.output_advanced, advanced_text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(dtlong_main())
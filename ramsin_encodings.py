@@ -0,0 +1,127 @@
+from __future__ import annotations
+import math
+import os
+import re
+
+# Compact encodings of list values, for RAMSIN_* variables and ramsin_env.py
+# patch. A list is comma separated and its items may be
+#   45*0.0                    Fortran repeat: 45 times 0.0
+#   range(0, 100, 20)         0, 20, 40, 60, 80 (the stop is excluded)
+#   linspace(0, 1, 5)         5 values from 0 to 1, both included
+#   geomspace(1, 1000, 4)     4 values from 1 to 1000 growing by the same ratio
+# or the whole value is @path, a .npy file or a text file with the values
+# separated by commas, spaces or newlines. Items are stripped of blanks.
+
+LOGICALS = {
+    ".true.": True, ".t.": True, "true": True, "t": True,
+    ".false.": False, ".f.": False, "false": False, "f": False,
+}
+
+
+def parse_bool(raw):
+    return LOGICALS.get(raw.strip().lower(), raw)
+
+
+CONVERTERS = {
+    "int": int,
+    "float": float,
+    "str": str,
+    "bool": parse_bool,
+}
+
+GENERATOR_RE = re.compile(r"\s*(range|linspace|geomspace)\s*\(([^()]*)\)\s*$")
+ITEM_RE = re.compile(r"\s*((?:range|linspace|geomspace)\s*\([^()]*\)|[^,]*?)\s*(,|$)")
+# 12 significant digits hide the rounding of the generated values
+SIGNIFICANT_DIGITS = 12
+
+
+def clean(value):
+    return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+
+
+def generate(kind, args):
+    if kind == "range":
+        if len(args) not in (2, 3):
+            raise ValueError("range takes a start, a stop and an optional step")
+        start, stop, step = (*args, 1.0) if len(args) == 2 else args
+        if step == 0:
+            raise ValueError("the range step must not be 0")
+        count = max(0, math.ceil((stop - start) / step - 1e-9))
+        return [clean(start + i * step) for i in range(count)]
+
+    if len(args) != 3 or args[2] != int(args[2]) or args[2] < 1:
+        raise ValueError(f"{kind} takes a start, a stop and a number of values")
+    start, stop, num = args[0], args[1], int(args[2])
+    if num == 1:
+        return [start]
+    if kind == "linspace":
+        return [clean(start + (stop - start) * i / (num - 1)) for i in range(num - 1)] + [stop]
+    if start == 0 or stop == 0 or (start < 0) != (stop < 0):
+        raise ValueError("geomspace needs a start and a stop of the same sign, not 0")
+    ratio = stop / start
+    return [clean(start * ratio ** (i / (num - 1))) for i in range(num - 1)] + [stop]
+
+
+def as_type(values, type_name):
+    if type_name != "int":
+        return values
+    if any(value != int(value) for value in values):
+        raise ValueError("the generated values are not all integers")
+    return [int(value) for value in values]
+
+
+def expand_item(item, type_name):
+    # An item of the list as the list of values it stands for
+    generator = GENERATOR_RE.match(item)
+    if generator is not None:
+        if type_name not in ("int", "float"):
+            raise ValueError(f"{generator.group(1)} needs a list of numbers")
+        args = [float(arg) for arg in generator.group(2).split(",")]
+        return as_type(generate(generator.group(1), args), type_name)
+    count, star, value = item.partition("*")
+    if star and count.strip().isdigit():
+        return [CONVERTERS[type_name](value.strip())] * int(count)
+    return [CONVERTERS[type_name](item)]
+
+
+def split_items(raw):
+    items = []
+    pos = 0
+    while True:
+        match = ITEM_RE.match(raw, pos)
+        items.append(match.group(1))
+        if not match.group(2):
+            return items
+        pos = match.end()
+
+
+def load_file(path, type_name, cwd=None):
+    path = os.path.join(cwd, path) if cwd is not None else path
+    if path.endswith(".npy"):
+        import numpy as np
+        array = np.load(path).ravel()
+        if type_name == "int":
+            if not np.array_equal(array, array.astype(int)):
+                raise ValueError(f"{path} holds values that are not integers")
+            array = array.astype(int)
+        elif type_name == "float":
+            array = array.astype(float)
+        return array.tolist()
+    with open(path) as f:
+        text = " ".join(line for line in f if line.lstrip()[:1] not in ("#", "!"))
+    return parse_list(",".join(text.replace(",", " ").split()), type_name)
+
+
+def parse_list(raw, type_name, cwd=None):
+    stripped = raw.strip()
+    if stripped.startswith("@"):
+        return load_file(stripped[1:], type_name, cwd)
+    if "*" not in raw and "(" not in raw:
+        # Plain comma separated values; int, float and parse_bool ignore blanks
+        if type_name == "str":
+            return [item.strip() for item in raw.split(",")]
+        return list(map(CONVERTERS[type_name], raw.split(",")))
+    values = []
+    for item in split_items(raw):
+        values.extend(expand_item(item, type_name))
+    return values
@@ -1,9 +1,18 @@
 from __future__ import annotations
 import argparse
+import contextlib
+import functools
+import importlib
+import io
 import os
-import f90nml
-from ramsin_model_validator import RamsinBasic
-from ramsin_adv_model_validator import RamsinAdvanced
+import re
+import sys
+
+# pydantic, f90nml and the validator modules are imported where they are
+# needed, keeping a no-override run free of their import cost.
+ENV_SOCKET_VARIABLE = "RAMSIN_ENV_SOCKET"
+ADVANCED_RAMSIN_RE = re.compile(
+    r"^\s*ADVANCED_RAMSIN\s*=\s*(['\"])(.*?)\1", re.IGNORECASE | re.MULTILINE)
 
 def get_args():
     parser = argparse.ArgumentParser(
@@ -19,7 +28,19 @@ Examples of supported environment variable naming scheme and values: \n
     RAMSIN_VP="topo"                       ( Character )
     RAMSIN_VP="topo,precip"                ( Character array )
     RAMSIN_APPLYMETEOGRAM=".false."        ( Logical )
-    RAMSIN_APPLYMETEOGRAM=".false.,.true." ( Logical array )""",
+    RAMSIN_APPLYMETEOGRAM=".false.,.true." ( Logical array )
+
+Subcommands:
+    batch    render many configurations from a JSONL/CSV override table
+             (see `ramsin_env.py batch -h`)
+    dtlong   print the largest stable timesteps of each grid and suggest a DTLONG
+             (see `ramsin_env.py dtlong -h`)
+    estimate print the grid-point-timesteps, core-hours and memory of the run
+             (see `ramsin_env.py estimate -h`)
+    patch    set -g GROUP -v KEY=VALUE variables of both files in one pass
+             (see `ramsin_env.py patch -h`)
+    serve    keep templates and models loaded and render requests sent over
+             a Unix socket (see `ramsin_env.py serve -h`)""",
     )
 
     parser.add_argument(
@@ -54,8 +75,170 @@ Examples of supported environment variable naming scheme and values: \n
         default="RAMSIN_ADVANCED_MODIFIED",
         help="the filename to write the RAMSIN_ADVANCED",
     )
+    parser.add_argument(
+        "--socket",
+        action="store",
+        type=str,
+        default=os.environ.get(ENV_SOCKET_VARIABLE),
+        help="render through the `ramsin_env.py serve` daemon listening on this\n"
+             "Unix socket, rendering here if it is not running\n"
+             "(default: $RAMSIN_ENV_SOCKET)",
+    )
+    parser.add_argument(
+        "--manifest",
+        action="store",
+        type=str,
+        default=None,
+        help="a JSON manifest of the outputs written: an output whose rendered\n"
+             "text is unchanged is not written again, keeping its mtime",
+    )
+    parser.add_argument(
+        "--fsync",
+        action="store_true",
+        help="fsync each output and its directory before returning",
+    )
+    add_override_args(parser)
+    add_adjust_args(parser)
+    parser.add_argument(
+        "--profile",
+        action="store",
+        type=str,
+        nargs="?",
+        const="-",
+        default=None,
+        help="write the wall and CPU time of each phase, the file sizes and the\n"
+             "override counts as JSON to this file (default: stderr)",
+    )
+    parser.add_argument(
+        "--profile_stats",
+        action="store",
+        type=str,
+        default=None,
+        help="also run under cProfile and dump the pstats to this file",
+    )
+    add_template_args(parser)
+
+    args = parser.parse_args()
+    args.parser = template_parser(parser, args)
+    return args
 
-    return parser.parse_args()
+
+def add_template_args(parser):
+    parser.add_argument(
+        "--parser",
+        action="store",
+        type=str,
+        choices=list(PARSERS),
+        default=None,
+        help="the namelist reader used for the templates\n"
+             "(default: native with --writer splice, f90nml otherwise); lazy\n"
+             "parses and validates only the overridden groups and the groups\n"
+             "cross-group rules tie to them, and needs --writer splice",
+    )
+    parser.add_argument(
+        "--writer",
+        action="store",
+        type=str,
+        choices=list(WRITERS),
+        default=None,
+        help="f90nml re-emits the whole namelist, splice rewrites only the\n"
+             "overridden values in the template text, keeping comments and layout\n"
+             "(default: splice with --parser lazy, f90nml otherwise)",
+    )
+    parser.add_argument(
+        "--validator",
+        action="store",
+        type=str,
+        choices=list(VALIDATORS),
+        default="pydantic",
+        help="pydantic builds the generated (pydantic 1) models, rules runs the\n"
+             "rule tables of ramsin_rules, kept by hand after the model\n"
+             "validators, on the schema frozen in ramsin_field_registry,\n"
+             "pydantic-core checks the same schema on the pydantic v2 core,\n"
+             "incremental checks the template once with the rule tables and then\n"
+             "only the rules the overridden variables reach",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_false",
+        dest="use_cache",
+        help="always parse the templates instead of using the parsed-template cache",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        action="store",
+        type=str,
+        default=None,
+        help="the parsed-template cache directory (default: ~/.cache/ramsin_env)",
+    )
+
+
+def add_override_args(parser):
+    parser.add_argument(
+        "--override_file",
+        action="append",
+        type=str,
+        default=None,
+        help="a TOML, JSON or .env file of overrides, may be repeated: later files\n"
+             "win over earlier ones and RAMSIN_* variables over all of them",
+    )
+
+
+def add_adjust_args(parser):
+    parser.add_argument(
+        "--check_zz",
+        action="store_true",
+        help="check an explicit ZZ (DELTAZ = 0): NNZP levels, increasing, spacing\n"
+             "growing by at most --max_stretch from one level to the next",
+    )
+    parser.add_argument(
+        "--emit_zz",
+        action="store_true",
+        help="write the ZZ levels BRAMS derives from DELTAZ, DZRAT, DZMAX and NNZP\n"
+             "and set DELTAZ = 0, instead of passing the levels through the environment",
+    )
+    parser.add_argument(
+        "--max_stretch",
+        action="store",
+        type=float,
+        default=None,
+        help="the largest spacing ratio between consecutive ZZ levels (default: 1.2)",
+    )
+    parser.add_argument(
+        "--check_sounding",
+        action="store_true",
+        help="check the MODEL_SOUND sounding: PS, TS, RTS, US and VS of equal length,\n"
+             "pressures decreasing or heights increasing, values within physical\n"
+             "bounds for IPSFLG, ITSFLG, IRTSFLG and IUSFLG",
+    )
+    parser.add_argument(
+        "--sounding",
+        action="store",
+        type=str,
+        default=None,
+        help="a CSV or text file with the PS TS RTS US VS columns of the sounding,\n"
+             "written into MODEL_SOUND and checked as with --check_sounding",
+    )
+    parser.add_argument(
+        "--check_dimensions",
+        action="store_true",
+        help="check the lengths of the arrays with a value per grid (at least\n"
+             "NGRIDS) and per soil layer (NZG) across both files",
+    )
+    parser.add_argument(
+        "--preflight",
+        action="store_true",
+        help="check that the input files the RUNTYPE opens (geographic datasets,\n"
+             "emission maps, soil moisture) exist, reporting all missing ones\n"
+             "before anything is written",
+    )
+    parser.add_argument(
+        "--preflight_workers",
+        action="store",
+        type=int,
+        default=None,
+        help="the threads listing input directories for --preflight (default: 16)",
+    )
 
 
 def environ_test_setup():
@@ -72,36 +255,502 @@ def environ_test_setup():
     os.environ.setdefault("ramsin_frqanl", "30.")
 
 
+def read_advanced_path(ramsin_basic_path):
+    with open(ramsin_basic_path) as f:
+        match = ADVANCED_RAMSIN_RE.search(f.read())
+    if match is None:
+        raise ValueError(f"ADVANCED_RAMSIN not found in {ramsin_basic_path}")
+    return match.group(2)
+
+
+def copy_through(args, manifest=None):
+    if len(args.ramsin_advanced) == 0:
+        ramsin_advanced_path = read_advanced_path(args.ramsin_basic)
+    else:
+        ramsin_advanced_path = args.ramsin_advanced
+
+    for template, output in ((args.ramsin_basic, args.output_basic),
+                             (ramsin_advanced_path, args.output_advanced)):
+        print(f"No overrides set, copying {template}")
+        with open(template) as f:
+            status = write_output(output, f.read(), manifest, args.fsync)
+        if manifest is not None:
+            print(f"  {status} {output}")
+
+
+def parse_f90nml(text):
+    import f90nml
+    return f90nml.reads(text)
+
+
+def parse_native(text):
+    import ramsin_nml
+    return ramsin_nml.reads(text)
+
+
+def parse_lazy(text):
+    import ramsin_nml
+    return ramsin_nml.reads_lazy(text)
+
+
+PARSERS = {
+    "f90nml": parse_f90nml,
+    "native": parse_native,
+    "lazy": parse_lazy,
+}
+
+# Parsers whose templates the splice writer can rewrite
+SPLICE_PARSERS = ("native", "lazy")
+
+# Groups validated whatever the overrides, the RAMSIN_ADVANCED path is taken
+# from the RAMSIN_BASIC patch
+ALWAYS_VALIDATED = {"basic": ("model_adv_ramsin",), "advanced": ()}
+
+
+def parse_primed(parse, ramsin_file, text):
+    # --validator incremental checks the template when it is parsed, so the
+    # check is kept with the parse in the cache
+    import ramsin_incremental
+    ramsin = parse(text)
+    ramsin.incremental_base = ramsin_incremental.Base(dict(ramsin.items()), ramsin_file)
+    return ramsin
+
+
+def read_ramsin(path, use_cache=True, cache_dir=None, parser="f90nml", profile=None,
+                half=None, validator=None):
+    parse = PARSERS[parser]
+    tag = parser
+    if validator == "incremental" and parser != "lazy" and half is not None:
+        parse = functools.partial(parse_primed, parse, half)
+        tag = f"{parser}/incremental"
+
+    # Indexing the groups is cheaper than loading a cached parse
+    if not use_cache or parser == "lazy":
+        with phase(profile, half, "read"):
+            with open(path) as f:
+                text = f.read()
+        with phase(profile, half, "parse"):
+            return parse(text)
+
+    from ramsin_cache import cached_parse
+    return cached_parse(path, parse, tag, cache_dir,
+                        timed=lambda name: phase(profile, half, name))
+
+
+def merge_overrides(values, overrides):
+    return {
+        group: {**variables, **overrides[group]} if group in overrides else variables
+        for group, variables in values.items()
+    }
+
+
+def validate_pydantic(values, ramsin_file, groups=None):
+    if ramsin_file == "basic":
+        from ramsin_model_validator import RamsinBasic as model_class
+    else:
+        from ramsin_adv_model_validator import RamsinAdvanced as model_class
+    if groups is None:
+        return model_class(**values).dict()
+
+    # Only the given groups are required
+    from pydantic import ValidationError, validate_model
+    from pydantic.error_wrappers import ErrorWrapper
+    from pydantic.errors import MissingError
+    validated, _, error = validate_model(model_class, values)
+    if error is not None:
+        errors = [e for e in error.raw_errors
+                  if not (isinstance(e, ErrorWrapper) and isinstance(e.exc, MissingError)
+                          and e.loc_tuple()[0] not in groups)]
+        if errors:
+            raise ValidationError(errors, model_class)
+    return {group: model.dict() for group, model in validated.items()}
+
+
+def validate_rules(values, ramsin_file, groups=None):
+    import ramsin_rules
+    return ramsin_rules.validate(values, ramsin_file, groups)
+
+
+def validate_core(values, ramsin_file, groups=None):
+    import ramsin_core
+    return ramsin_core.validate(values, ramsin_file, groups)
+
+
+def validate_incremental(values, ramsin_file, groups=None):
+    import ramsin_incremental
+    return ramsin_incremental.validate(values, ramsin_file, groups)
+
+
+VALIDATORS = {
+    "pydantic": validate_pydantic,
+    "rules": validate_rules,
+    "pydantic-core": validate_core,
+    "incremental": validate_incremental,
+}
+
+
+def validate_ramsin(ramsin, ramsin_file, overrides, validator="pydantic", groups=()):
+    if not getattr(ramsin, "lazy", False):
+        template = dict(ramsin.items())
+        if validator == "incremental":
+            # The template is checked once, override sets against it
+            import ramsin_incremental
+            ramsin_incremental.prime(template, ramsin_file,
+                                     getattr(ramsin, "incremental_base", None))
+        return VALIDATORS[validator](merge_overrides(template, overrides), ramsin_file)
+
+    # A lazy template only parses the groups that are overridden, asked for or
+    # tied to those by cross-group rules; the others are written back as they are
+    from ramsin_field_registry import GROUPS
+    from ramsin_rules import linked_groups
+    wanted = {group for group in overrides if GROUPS.get(group) == ramsin_file}
+    wanted = linked_groups({*wanted, *ALWAYS_VALIDATED[ramsin_file], *groups}, ramsin_file)
+    values = merge_overrides({group: ramsin[group] for group in ramsin if group in wanted},
+                             overrides)
+    return VALIDATORS[validator](values, ramsin_file, wanted)
+
+
+def render_f90nml(ramsin, patch):
+    import f90nml
+
+    if not isinstance(ramsin, f90nml.Namelist):
+        # Item lists keep the template order, Namelist sorts plain dicts
+        ramsin = f90nml.Namelist(
+            [(group, f90nml.Namelist(list(variables.items())))
+             for group, variables in ramsin.items()])
+    ramsin.patch(patch)
+    output = io.StringIO()
+    ramsin.write(output, sort=False)
+    return output.getvalue()
+
+
+def render_splice(ramsin, patch):
+    return ramsin.splice(patch)
+
+
+WRITERS = {
+    "f90nml": render_f90nml,
+    "splice": render_splice,
+}
+
+
+# Modules behind each --parser, --writer and --validator choice
+BACKEND_MODULES = {
+    "f90nml": ["f90nml"],
+    "native": ["ramsin_nml"],
+    "lazy": ["ramsin_nml", "ramsin_rules"],
+    "splice": [],
+    "pydantic": ["ramsin_model_validator", "ramsin_adv_model_validator"],
+    "rules": ["ramsin_rules"],
+    "pydantic-core": ["ramsin_core"],
+    "incremental": ["ramsin_rules", "ramsin_incremental"],
+}
+
+
+def phase(profile, half, name):
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.phase(half, name)
+
+
+def vertical_grid(ramsin_file, patch, check=False, emit=False, max_ratio=None):
+    if ramsin_file != "basic":
+        return patch
+    import ramsin_vgrid
+    return ramsin_vgrid.vertical_grid(patch, check, emit,
+                                      max_ratio or ramsin_vgrid.MAX_STRETCH_RATIO)
+
+
+def sounding(ramsin_file, patch, path=None, cwd=None):
+    if ramsin_file != "advanced":
+        return patch
+    import ramsin_sounding
+    if path is not None and cwd is not None:
+        path = os.path.join(cwd, path)
+    return ramsin_sounding.sounding(patch, path)
+
+
+def basic_patch(ramsin_file, patch, state):
+    # For the adjusters reading both files: keeps the basic patch until the
+    # advanced one, which follows it, and then returns it
+    if ramsin_file == "basic":
+        state["basic"] = patch
+        return None
+    return state.pop("basic")
+
+
+def preflight(ramsin_file, patch, state, workers=None, cwd=None):
+    # state also keeps the directory listings for the next renders
+    basic = basic_patch(ramsin_file, patch, state)
+    if basic is None:
+        return patch
+    import ramsin_preflight
+    listings = state.setdefault("listings", ramsin_preflight.Listings())
+    missing = ramsin_preflight.missing_inputs(basic, patch, listings,
+                                              workers or ramsin_preflight.WORKERS, cwd)
+    if missing:
+        raise ValueError("Missing inputs:\n  " + "\n  ".join(missing))
+    return patch
+
+
+def dimensions(ramsin_file, patch, state):
+    basic = basic_patch(ramsin_file, patch, state)
+    if basic is None:
+        return patch
+    import ramsin_dimensions
+    errors = ramsin_dimensions.check_dimensions({**basic, **patch})
+    if errors:
+        raise ValueError("Inconsistent array lengths:\n  " + "\n  ".join(errors))
+    return patch
+
+
+# The groups each adjuster reads from the patch, validated even when not overridden
+ADJUSTER_GROUPS = {
+    vertical_grid: ("model_grids",),
+    sounding: ("model_sound",),
+    dimensions: ("model_grids", "model_grids2", "ccatt_info2", "model_file_info2",
+                 "model_options2", "isan_isentropic2"),
+    preflight: ("model_grids", "ccatt_info", "model_file_info", "model_options",
+                "model_grids2", "model_file_info2", "model_options2"),
+}
+
+
+def get_adjusters(args):
+    # Steps applied to each validated patch before it is written, as
+    # adjuster(ramsin_file, patch) -> patch
+    adjusters = []
+    if getattr(args, "check_zz", False) or getattr(args, "emit_zz", False):
+        adjusters.append(functools.partial(
+            vertical_grid, check=args.check_zz, emit=args.emit_zz,
+            max_ratio=args.max_stretch))
+    if getattr(args, "check_sounding", False) or getattr(args, "sounding", None):
+        adjusters.append(functools.partial(
+            sounding, path=getattr(args, "sounding", None), cwd=getattr(args, "cwd", None)))
+    if getattr(args, "check_dimensions", False):
+        adjusters.append(functools.partial(dimensions, state={}))
+    if getattr(args, "preflight", False):
+        adjusters.append(functools.partial(
+            preflight, state={}, workers=getattr(args, "preflight_workers", None),
+            cwd=getattr(args, "cwd", None)))
+    return adjusters
+
+
+def render_ramsin(ramsin, ramsin_file, overrides, writer="f90nml", validator="pydantic",
+                  profile=None, adjusters=()):
+    groups = [group for adjust in adjusters
+              for group in ADJUSTER_GROUPS.get(getattr(adjust, "func", adjust), ())]
+    with phase(profile, ramsin_file, "validate"):
+        patch = validate_ramsin(ramsin, ramsin_file, overrides, validator, groups)
+        for adjust in adjusters:
+            patch = adjust(ramsin_file, patch)
+    with phase(profile, ramsin_file, "patch"):
+        text = WRITERS[writer](ramsin, patch)
+    return patch, text
+
+
+def write_text(path, text, fsync=False):
+    # The whole text goes in one write to a uniquely named file next to path,
+    # which is then renamed over it: readers never see a partial output and
+    # concurrent renders into the same directory do not collide
+    data = memoryview(text.encode())
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.urandom(8).hex()}")
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+            with contextlib.suppress(FileNotFoundError):
+                # Keep the mode of the output being replaced, like open(path, "w")
+                os.fchmod(fd, os.stat(path).st_mode & 0o7777)
+            if fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+    if fsync:
+        directory_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+
+def write_output(path, text, manifest=None, fsync=False):
+    # Returns "written", or "reused" when the manifest shows path already holds text
+    if manifest is None:
+        write_text(path, text, fsync)
+        return "written"
+    from ramsin_manifest import digest
+    text_digest = digest(text)
+    if manifest.unchanged(path, text_digest):
+        return "reused"
+    write_text(path, text, fsync)
+    manifest.record(path, text_digest)
+    return "written"
+
+
+def open_manifest(path):
+    if path is None:
+        return None
+    from ramsin_manifest import Manifest
+    return Manifest(path)
+
+
+def template_parser(parser, args):
+    if args.parser == "lazy":
+        # The f90nml writer would parse every group of the template
+        if args.writer not in (None, "splice"):
+            parser.error("--parser lazy needs --writer splice")
+        args.writer = "splice"
+        if args.validator == "incremental":
+            print("warning: --parser lazy checks the groups it parses with the full rule "
+                  "tables, --validator incremental has no effect", file=sys.stderr)
+    args.writer = args.writer or "f90nml"
+    if args.writer == "splice":
+        if args.parser not in (None, *SPLICE_PARSERS):
+            parser.error("--writer splice needs the native or lazy parser")
+        return args.parser or "native"
+    return args.parser or "f90nml"
+
+
+def get_advanced_path(basic_patch, ramsin_advanced=""):
+    if len(ramsin_advanced) == 0:
+        return basic_patch["model_adv_ramsin"]["advanced_ramsin"]
+    return ramsin_advanced
+
+
+def render_files(ramsin_basic_path, ramsin_advanced_path, overrides, read,
+                 writer="f90nml", validator="pydantic", profile=None, adjusters=()):
+    ramsin_basic = read(ramsin_basic_path, "basic")
+    basic_patch, basic_text = render_ramsin(ramsin_basic, "basic", overrides, writer,
+                                            validator, profile, adjusters)
+
+    ramsin_advanced_path = get_advanced_path(basic_patch, ramsin_advanced_path)
+    ramsin_advanced = read(ramsin_advanced_path, "advanced")
+    _, advanced_text = render_ramsin(ramsin_advanced, "advanced", overrides, writer,
+                                     validator, profile, adjusters)
+    return basic_text, ramsin_advanced_path, advanced_text
+
+
+def record_profile(profile, args, overrides, ramsin_advanced_path):
+    from ramsin_field_registry import GROUPS
+
+    profile.record("main", "options", {"parser": args.parser, "writer": args.writer,
+                                       "validator": args.validator,
+                                       "use_cache": args.use_cache})
+    for half, template, output in (
+            ("basic", args.ramsin_basic, args.output_basic),
+            ("advanced", ramsin_advanced_path, args.output_advanced)):
+        if template is not None:
+            profile.record_file(half, "template", template)
+        profile.record_file(half, "output", output)
+        profile.record(half, "overrides", sum(
+            len(variables) for group, variables in overrides.items()
+            if GROUPS[group] == half))
+
+
 def main():
     if os.environ.get("DEV_ENV") is not None:
         environ_test_setup()
 
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from ramsin_batch import batch_main
+        return batch_main(sys.argv[2:])
+
+    if len(sys.argv) > 1 and sys.argv[1] == "dtlong":
+        from ramsin_dtlong import dtlong_main
+        return dtlong_main(sys.argv[2:])
+
+    if len(sys.argv) > 1 and sys.argv[1] == "estimate":
+        from ramsin_estimate import estimate_main
+        return estimate_main(sys.argv[2:])
+
+    if len(sys.argv) > 1 and sys.argv[1] == "patch":
+        from ramsin_patch import patch_main
+        return patch_main(sys.argv[2:])
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from ramsin_serve import serve_main
+        return serve_main(sys.argv[2:])
+
     args = get_args()
 
-    with open(args.ramsin_basic) as f:
-        ramsin_basic = f90nml.read(f)
+    profile = None
+    if args.profile is not None or args.profile_stats is not None:
+        from ramsin_profile import Profile
+        profile = Profile(args.profile_stats)
+    try:
+        return render_main(args, profile)
+    finally:
+        if profile is not None:
+            profile.finish(args.profile)
 
-    print(f"Updating RAMSIN_BASIC from {args.ramsin_basic}")
 
-    values = ramsin_basic.values().mapping
-    model = RamsinBasic(**values)
-    ramsin_basic.patch(model.dict())
-    ramsin_basic.write(nml_path=args.output_basic, force=True, sort=False)
+def render_main(args, profile=None):
+    with phase(profile, "main", "resolve"):
+        from ramsin_env_resolver import resolve_overrides
+        try:
+            overrides = resolve_overrides(args.override_file)
+        except (OSError, ValueError) as e:
+            print(f"ramsin_env.py: error: {e}", file=sys.stderr)
+            return 2
 
-    if len(args.ramsin_advanced) == 0:
-        ramsin_advanced_path = ramsin_basic["MODEL_ADV_RAMSIN"]["ADVANCED_RAMSIN"]
-    else:
-        ramsin_advanced_path = args.ramsin_advanced
+    # Adjusters need the validated templates even when nothing is overridden
+    adjusters = get_adjusters(args)
+    if not overrides and not adjusters:
+        with phase(profile, "main", "copy"):
+            manifest = open_manifest(args.manifest)
+            copy_through(args, manifest)
+            if manifest is not None:
+                manifest.save()
+        if profile is not None:
+            record_profile(profile, args, overrides, None)
+        return
 
-    with open(ramsin_advanced_path) as f:
-        ramsin_advanced = f90nml.read(f)
+    # A profiled run renders here, the daemon's phases are not visible
+    if args.socket and profile is None:
+        from ramsin_client import render_remote
+        rendered = render_remote(args)
+        if rendered is not None:
+            return rendered
+
+    if profile is not None:
+        with phase(profile, "main", "import"):
+            for choice in (args.parser, args.writer, args.validator):
+                for module in BACKEND_MODULES[choice]:
+                    importlib.import_module(module)
+
+    def read(path, half):
+        return read_ramsin(path, args.use_cache, args.cache_dir, args.parser, profile, half,
+                           args.validator)
+
+    manifest = open_manifest(args.manifest)
+    print(f"Updating RAMSIN_BASIC from {args.ramsin_basic}")
+    basic_text, ramsin_advanced_path, advanced_text = render_files(
+        args.ramsin_basic, args.ramsin_advanced, overrides, read, args.writer,
+        args.validator, profile, adjusters)
+    with phase(profile, "basic", "write"):
+        status = write_output(args.output_basic, basic_text, manifest, args.fsync)
+    if manifest is not None:
+        print(f"  {status} {args.output_basic}")
 
     print(f"Updating RAMSIN_ADVANCED from {ramsin_advanced_path}")
-    adv_values = ramsin_advanced.values().mapping
-    adv_model = RamsinAdvanced(**adv_values)
-    ramsin_advanced.patch(adv_model.dict())
-    ramsin_advanced.write(nml_path=args.output_advanced, force=True, sort=False)
+    with phase(profile, "advanced", "write"):
+        status = write_output(args.output_advanced, advanced_text, manifest, args.fsync)
+        if manifest is not None:
+            manifest.save()
+    if manifest is not None:
+        print(f"  {status} {args.output_advanced}")
+
+    if profile is not None:
+        record_profile(profile, args, overrides, ramsin_advanced_path)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import os
+
+from ramsin_encodings import parse_bool, parse_list
+from ramsin_field_registry import GROUPS, FIELDS
+
+ENV_PREFIX = "RAMSIN_"
+
+
+def build_env_index():
+    # Lower case name after the prefix -> (group, variable, is group-qualified)
+    index = {}
+    for name, (group, _, _) in FIELDS.items():
+        index[name] = (group, name, False)
+        index[f"{group}_{name}"] = (group, name, True)
+    return index
+
+
+ENV_INDEX = build_env_index()
+
+
+def parse_env_value(name, raw, cwd=None):
+    # Lists may use the compact encodings of ramsin_encodings, @file paths are
+    # taken from cwd
+    _, type_name, is_list = FIELDS[name]
+    if is_list:
+        return parse_list(raw, type_name, cwd)
+    if type_name == "bool":
+        return parse_bool(raw)
+    # Scalars are coerced by the models, as when they were read from the environment
+    return raw
+
+
+def resolve_environ(environ=os.environ, cwd=None):
+    resolved = {}
+    qualified = set()
+    prefix_length = len(ENV_PREFIX)
+
+    for key, raw in environ.items():
+        if key[:prefix_length].upper() != ENV_PREFIX:
+            continue
+        entry = ENV_INDEX.get(key[prefix_length:].lower())
+        if entry is None:
+            continue
+
+        group, name, is_qualified = entry
+        # RAMSIN_{GROUP}_{VARIABLE} wins over RAMSIN_{VARIABLE}
+        if not is_qualified and (group, name) in qualified:
+            continue
+        if is_qualified:
+            qualified.add((group, name))
+        try:
+            resolved.setdefault(group, {})[name] = parse_env_value(name, raw, cwd)
+        except ValueError as e:
+            raise ValueError(f'error parsing env var "{key}": {e}') from None
+
+    return resolved
+
+
+def layer(*sources):
+    layered = {}
+    for source in sources:
+        for group, variables in source.items():
+            layered.setdefault(group, {}).update(variables)
+    return layered
+
+
+# Override files: TOML, JSON or .env (KEY=VALUE lines, any other extension).
+# TOML and JSON hold tables named after the groups, or variables named as in
+# RAMSIN_* variables with or without the prefix; an unknown name is an error.
+# Their strings are read as RAMSIN_* values, so lists may use the compact
+# encodings, with @file paths taken from the directory of the file. .env files
+# are read as the environment is. Parsed files are kept by path while their
+# mtime and size hold, so a batch or the daemon reads a shared file once.
+OVERRIDE_FILES = {}
+
+
+def file_value(name, value, path, label, cwd):
+    if isinstance(value, str):
+        try:
+            return parse_env_value(name, value, cwd)
+        except ValueError as e:
+            raise ValueError(f"{path}: error parsing {label}: {e}") from None
+    if FIELDS[name][2] and not isinstance(value, list):
+        return [value]
+    return value
+
+
+def resolve_mapping(mapping, path, cwd=None):
+    resolved = {}
+    prefix_length = len(ENV_PREFIX)
+    for label, value in mapping.items():
+        key = label.lower()
+        if key in GROUPS and isinstance(value, dict):
+            for variable, variable_value in value.items():
+                name = variable.lower()
+                if name not in FIELDS or FIELDS[name][0] != key:
+                    raise ValueError(f"{path}: {key.upper()} has no variable {name.upper()}")
+                resolved.setdefault(key, {})[name] = file_value(
+                    name, variable_value, path, f"{label}.{variable}", cwd)
+            continue
+
+        if key[:prefix_length].upper() == ENV_PREFIX:
+            key = key[prefix_length:]
+        entry = ENV_INDEX.get(key)
+        if entry is None:
+            raise ValueError(f"{path}: unknown variable {key.upper()}")
+        group, name, _ = entry
+        resolved.setdefault(group, {})[name] = file_value(name, value, path, label, cwd)
+    return resolved
+
+
+def parse_dotenv(text, path):
+    environ = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):]
+        key, sep, value = line.partition("=")
+        if not sep:
+            raise ValueError(f"{path}:{number}: expected KEY=VALUE, not {line}")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        environ[key.strip()] = value
+    return environ
+
+
+def read_override_file(path):
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    entry = OVERRIDE_FILES.get(path)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    cwd = os.path.dirname(path)
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError(f"{path}: TOML override files need Python 3.11 or newer, "
+                             f"use a JSON or .env file instead") from None
+        with open(path, "rb") as f:
+            overrides = resolve_mapping(tomllib.load(f), path, cwd)
+    elif path.endswith(".json"):
+        import json
+        with open(path) as f:
+            mapping = json.load(f)
+        if not isinstance(mapping, dict):
+            raise ValueError(f"{path}: expected a JSON object")
+        overrides = resolve_mapping(mapping, path, cwd)
+    else:
+        with open(path) as f:
+            overrides = resolve_environ(parse_dotenv(f.read(), path), cwd)
+    OVERRIDE_FILES[path] = (version, overrides)
+    return overrides
+
+
+def resolve_overrides(paths=(), environ=os.environ, cwd=None):
+    # The template < each override file in turn < RAMSIN_* variables. The
+    # models take the layered values as their init settings, the only source
+    # RamsinConfig.customise_sources keeps besides file secrets.
+    files = [read_override_file(os.path.join(cwd, path) if cwd is not None else path)
+             for path in paths or ()]
+    environ_overrides = resolve_environ(environ, cwd)
+    if not files:
+        return environ_overrides
+    return layer(*files, environ_overrides)
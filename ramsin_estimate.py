@@ -0,0 +1,233 @@
+from __future__ import annotations
+import argparse
+import json
+import math
+import sys
+
+from ramsin_env import read_ramsin, validate_ramsin, get_advanced_path, add_template_args, \
+    add_override_args, template_parser
+from ramsin_env_resolver import resolve_overrides
+
+# Rough cost model of a BRAMS run. Times are core-seconds, memory is bytes,
+# both per grid point. The defaults are a starting point: calibrate them
+# against measured runs on your machine and pass the result with --cost_table.
+COST_TABLE = {
+    # every long timestep
+    "dynamics": 1.0e-6,
+    # every acoustic (small) timestep, NACOUST per long timestep
+    "acoustic": 1.5e-7,
+    # every long timestep, by MCPHYS_TYPE
+    "microphysics": {"0": 4.0e-7, "1": 4.0e-7, "2": 6.0e-7, "3": 8.0e-7, "4": 6.0e-7,
+                     "5": 8.0e-7, "6": 8.0e-7, "7": 1.0e-6},
+    # every RADFRQ seconds, by ILWRTYP
+    "radiation": {"0": 0.0, "1": 2.0e-6, "2": 4.0e-6, "3": 4.0e-6, "4": 8.0e-6,
+                  "5": 8.0e-6, "6": 8.0e-6},
+    # every CONFRQ seconds, by NNQPARM
+    "cumulus": {"0": 0.0, "1": 1.0e-6, "2": 2.0e-6, "3": 2.0e-6, "4": 2.0e-6,
+                "5": 2.0e-6, "6": 2.0e-6, "7": 2.0e-6, "8": 3.0e-6},
+    # every long timestep with CCATT = 1, by CHEMISTRY
+    "chemistry": {"-1": 0.0, "0": 5.0e-7, "1": 2.0e-6, "2": 3.0e-6, "3": 4.0e-6,
+                  "4": 5.0e-6},
+    "memory": {
+        "base": 600,
+        "microphysics": {"0": 40, "1": 40, "2": 80, "3": 120, "4": 80, "5": 120,
+                         "6": 120, "7": 160},
+        "chemistry": {"-1": 0, "0": 50, "1": 400, "2": 800, "3": 1200, "4": 1600},
+    },
+}
+
+TIME_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0}
+# The groups read from each file, validated even with --parser lazy
+READ_GROUPS = {"basic": ("model_grids", "model_options", "ccatt_info"),
+               "advanced": ("model_grids2",)}
+
+
+def get_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="ramsin_env.py estimate",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="""
+Estimate the grid-point-timesteps, core-hours and memory of each grid of the
+run described by RAMSIN_BASIC/RAMSIN_ADVANCED and the RAMSIN_* variables,
+without writing anything. NNXP/NNYP/NNZP only give the size of the coarse
+grid and the nest bounds (NINEST/NJNEST) only their corner, so nests are
+costed with the size of the coarse grid and a warning says so.""",
+    )
+
+    parser.add_argument(
+        "--ramsin_basic",
+        "-rb",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC",
+        help="the RAMSIN_BASIC file",
+    )
+    parser.add_argument(
+        "--ramsin_advanced",
+        "-ra",
+        action="store",
+        type=str,
+        default="",
+        help="the RAMSIN_ADVANCED file",
+    )
+    parser.add_argument(
+        "--cost_table",
+        action="store",
+        type=str,
+        default=None,
+        help="a JSON file overriding entries of the cost table",
+    )
+    parser.add_argument(
+        "--json",
+        action="store",
+        type=str,
+        default=None,
+        help="also write the estimate as JSON to this file (- for stdout)",
+    )
+    add_override_args(parser)
+    add_template_args(parser)
+
+    args = parser.parse_args(argv)
+    args.parser = template_parser(parser, args)
+    return args
+
+
+def merge_costs(table, overrides):
+    merged = dict(table)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_costs(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def per_grid(value, grid):
+    if isinstance(value, list):
+        return value[grid] if grid < len(value) else value[-1]
+    return value
+
+
+def scheme_cost(costs, name, scheme):
+    try:
+        return costs[name][str(scheme)]
+    except KeyError:
+        raise ValueError(f"No {name} cost for {scheme} in the cost table") from None
+
+
+def grid_timesteps(grids2, dtlong, ngrids):
+    # Each nest runs NNDTRAT timesteps per timestep of its parent (NXTNEST)
+    timesteps = []
+    for grid in range(ngrids):
+        if grid == 0:
+            timesteps.append(dtlong)
+            continue
+        parent = per_grid(grids2["nxtnest"], grid) - 1
+        if not 0 <= parent < grid:
+            raise ValueError(f"NXTNEST of grid {grid + 1} must name a coarser grid")
+        timesteps.append(timesteps[parent] / per_grid(grids2["nndtrat"], grid))
+    return timesteps
+
+
+def estimate(basic, advanced, costs=COST_TABLE):
+    grids, options, ccatt = basic["model_grids"], basic["model_options"], basic["ccatt_info"]
+    grids2 = advanced["model_grids2"]
+    ngrids = grids2["ngrids"]
+    duration = grids["timmax"] * TIME_UNITS[grids["timeunit"]]
+    nacoust = grids2["nacoust"]
+
+    per_step = (costs["dynamics"] + costs["acoustic"] * nacoust
+                + scheme_cost(costs, "microphysics", options["mcphys_type"]))
+    memory_per_point = (costs["memory"]["base"]
+                        + scheme_cost(costs["memory"], "microphysics", options["mcphys_type"]))
+    if ccatt["ccatt"] == 1:
+        per_step += scheme_cost(costs, "chemistry", ccatt["chemistry"])
+        memory_per_point += scheme_cost(costs["memory"], "chemistry", ccatt["chemistry"])
+    radiation = scheme_cost(costs, "radiation", options["ilwrtyp"])
+    cumulus = scheme_cost(costs, "cumulus", options["nnqparm"])
+
+    result = {"duration_seconds": duration, "grids": []}
+    dx, dy = grids["deltax"], grids["deltay"]
+    for grid, dt in enumerate(grid_timesteps(grids2, grids["dtlong"], ngrids)):
+        if grid > 0:
+            parent = per_grid(grids2["nxtnest"], grid) - 1
+            dx = result["grids"][parent]["deltax"] / per_grid(grids2["nstratx"], grid)
+            dy = result["grids"][parent]["deltay"] / per_grid(grids2["nstraty"], grid)
+        # The coarse grid size, the only one the namelists give
+        nx, ny, nz = grids["nnxp"], grids["nnyp"], grids["nnzp"]
+        points = nx * ny * nz
+        steps = math.ceil(duration / dt)
+        radiation_calls = math.ceil(duration / max(options["radfrq"], dt))
+        cumulus_calls = math.ceil(duration / max(options["confrq"], dt))
+        core_seconds = points * (steps * per_step + radiation_calls * radiation
+                                 + cumulus_calls * cumulus)
+        result["grids"].append({
+            "grid": grid + 1,
+            "nnxp": nx,
+            "nnyp": ny,
+            "nnzp": nz,
+            "deltax": dx,
+            "deltay": dy,
+            "dt": dt,
+            "timesteps": steps,
+            "grid_point_timesteps": points * steps,
+            "core_hours": core_seconds / 3600.0,
+            "memory_bytes": points * memory_per_point,
+        })
+
+    for key in ("grid_point_timesteps", "core_hours", "memory_bytes"):
+        result[key] = sum(grid[key] for grid in result["grids"])
+    return result
+
+
+def print_estimate(result):
+    print(f"{'grid':>4} {'nnxp':>6} {'nnyp':>6} {'nnzp':>5} {'deltax':>10} {'dt':>8} "
+          f"{'timesteps':>10} {'point-steps':>12} {'core-h':>10} {'memory':>10}")
+    for grid in result["grids"]:
+        print(f"{grid['grid']:>4} {grid['nnxp']:>6} {grid['nnyp']:>6} {grid['nnzp']:>5} "
+              f"{grid['deltax']:>10.1f} {grid['dt']:>8.2f} {grid['timesteps']:>10} "
+              f"{grid['grid_point_timesteps']:>12.4g} {grid['core_hours']:>10.3g} "
+              f"{grid['memory_bytes'] / 2 ** 20:>6.1f} MiB")
+    print(f"total {result['grid_point_timesteps']:.4g} grid-point-timesteps, "
+          f"{result['core_hours']:.3g} core-hours, "
+          f"{result['memory_bytes'] / 2 ** 20:.1f} MiB")
+
+
+def estimate_main(argv=None):
+    args = get_args(argv)
+
+    costs = COST_TABLE
+    if args.cost_table is not None:
+        with open(args.cost_table) as f:
+            costs = merge_costs(COST_TABLE, json.load(f))
+
+    overrides = resolve_overrides(args.override_file)
+    ramsin_basic = read_ramsin(args.ramsin_basic, args.use_cache, args.cache_dir,
+                               args.parser)
+    basic = validate_ramsin(ramsin_basic, "basic", overrides, args.validator,
+                            READ_GROUPS["basic"])
+    ramsin_advanced_path = get_advanced_path(basic, args.ramsin_advanced)
+    ramsin_advanced = read_ramsin(ramsin_advanced_path, args.use_cache, args.cache_dir,
+                                  args.parser)
+    advanced = validate_ramsin(ramsin_advanced, "advanced", overrides, args.validator,
+                               READ_GROUPS["advanced"])
+
+    result = estimate(basic, advanced, costs)
+    ngrids = len(result["grids"])
+    if ngrids > 1:
+        nests = "grid 2 is" if ngrids == 2 else f"grids 2 to {ngrids} are"
+        print(f"warning: NNXP, NNYP and NNZP only size the coarse grid, {nests} costed "
+              f"with as many points", file=sys.stderr)
+    if args.json == "-":
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print_estimate(result)
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(estimate_main())
@@ -0,0 +1,336 @@
+# generated by code_gen.bash from ramsin_model.py and ramsin_adv_model.py
+
+# RAMSIN file -> model name
+MODELS = {
+    "basic": "RamsinBasic",
+    "advanced": "RamsinAdvanced",
+}
+
+# group -> RAMSIN file
+GROUPS = {
+    "model_adv_ramsin": "basic",
+    "model_grids": "basic",
+    "ccatt_info": "basic",
+    "model_file_info": "basic",
+    "model_options": "basic",
+    "isan_control": "basic",
+    "isan_isentropic": "basic",
+    "post": "basic",
+    "model_grids2": "advanced",
+    "ccatt_info2": "advanced",
+    "teb_spm_info": "advanced",
+    "model_file_info2": "advanced",
+    "model_options2": "advanced",
+    "model_sound": "advanced",
+    "model_print": "advanced",
+    "isan_control2": "advanced",
+    "isan_isentropic2": "advanced",
+    "digitalfilter": "advanced",
+    "meteogram": "advanced",
+}
+
+# variable -> (group, type, is list)
+FIELDS = {
+    "advanced_ramsin": ("model_adv_ramsin", "str", False),
+    "expnme": ("model_grids", "str", False),
+    "runtype": ("model_grids", "str", False),
+    "timeunit": ("model_grids", "str", False),
+    "timmax": ("model_grids", "float", False),
+    "imonth1": ("model_grids", "int", False),
+    "idate1": ("model_grids", "int", False),
+    "iyear1": ("model_grids", "int", False),
+    "itime1": ("model_grids", "int", False),
+    "nnxp": ("model_grids", "int", False),
+    "nnyp": ("model_grids", "int", False),
+    "nnzp": ("model_grids", "int", False),
+    "nzg": ("model_grids", "int", False),
+    "nzs": ("model_grids", "int", False),
+    "deltax": ("model_grids", "float", False),
+    "deltay": ("model_grids", "float", False),
+    "deltaz": ("model_grids", "float", False),
+    "dzrat": ("model_grids", "float", False),
+    "dzmax": ("model_grids", "float", False),
+    "fixlevels": ("model_grids", "int", False),
+    "zz": ("model_grids", "float", True),
+    "dtlong": ("model_grids", "float", False),
+    "polelat": ("model_grids", "float", False),
+    "polelon": ("model_grids", "float", False),
+    "centlat": ("model_grids", "float", False),
+    "centlon": ("model_grids", "float", False),
+    "ccatt": ("ccatt_info", "int", False),
+    "chemistry": ("ccatt_info", "int", False),
+    "chem_timestep": ("ccatt_info", "float", False),
+    "chem_assim": ("ccatt_info", "int", False),
+    "srcmapfn": ("ccatt_info", "str", False),
+    "aerosol": ("ccatt_info", "int", False),
+    "aer_assim": ("ccatt_info", "int", False),
+    "aer_timestep": ("ccatt_info", "float", False),
+    "initial": ("model_file_info", "int", False),
+    "varfpfx": ("model_file_info", "str", False),
+    "tnudcent": ("model_file_info", "float", False),
+    "nudlat": ("model_file_info", "int", False),
+    "tnudlat": ("model_file_info", "float", False),
+    "tnudtop": ("model_file_info", "float", False),
+    "znudtop": ("model_file_info", "float", False),
+    "ipos": ("model_file_info", "int", False),
+    "ioutput": ("model_file_info", "int", False),
+    "hfilout": ("model_file_info", "str", False),
+    "afilout": ("model_file_info", "str", False),
+    "frqhis": ("model_file_info", "float", False),
+    "frqanl": ("model_file_info", "float", False),
+    "topfiles": ("model_file_info", "str", False),
+    "sfcfiles": ("model_file_info", "str", False),
+    "sstfpfx": ("model_file_info", "str", False),
+    "ndvifpfx": ("model_file_info", "str", False),
+    "itoptfn": ("model_file_info", "str", False),
+    "isstfn": ("model_file_info", "str", False),
+    "ivegtfn": ("model_file_info", "str", False),
+    "isoilfn": ("model_file_info", "str", False),
+    "ndvifn": ("model_file_info", "str", False),
+    "iswrtyp": ("model_options", "int", False),
+    "ilwrtyp": ("model_options", "int", False),
+    "radfrq": ("model_options", "float", False),
+    "nnqparm": ("model_options", "int", False),
+    "closure_type": ("model_options", "str", False),
+    "nnshcu": ("model_options", "int", False),
+    "confrq": ("model_options", "float", False),
+    "shcufrq": ("model_options", "float", False),
+    "isfcl": ("model_options", "int", False),
+    "isfcl_ocean": ("model_options", "int", False),
+    "soil_moist_fail": ("model_options", "str", False),
+    "usdata_in": ("model_options", "str", False),
+    "usmodel_in": ("model_options", "str", False),
+    "mcphys_type": ("model_options", "int", False),
+    "level": ("model_options", "int", False),
+    "isan_inc": ("isan_control", "int", False),
+    "iapr": ("isan_control", "str", False),
+    "varpfx": ("isan_control", "str", False),
+    "icfiletype": ("isan_isentropic", "int", False),
+    "icprefix": ("isan_isentropic", "str", False),
+    "wind_u_varname": ("isan_isentropic", "str", False),
+    "wind_v_varname": ("isan_isentropic", "str", False),
+    "temperature_varname": ("isan_isentropic", "str", False),
+    "geo_varname": ("isan_isentropic", "str", False),
+    "ur_varname": ("isan_isentropic", "str", False),
+    "initial_latitude": ("isan_isentropic", "float", False),
+    "final_latitude": ("isan_isentropic", "float", False),
+    "initial_longitude": ("isan_isentropic", "float", False),
+    "final_longitude": ("isan_isentropic", "float", False),
+    "z_max_level": ("isan_isentropic", "int", False),
+    "scale_factor": ("isan_isentropic", "float", True),
+    "nvp": ("post", "int", False),
+    "vp": ("post", "str", True),
+    "gprefix": ("post", "str", False),
+    "csvfile": ("post", "str", False),
+    "anl2gra": ("post", "str", False),
+    "proj": ("post", "str", False),
+    "mean_type": ("post", "str", False),
+    "lati": ("post", "float", True),
+    "latf": ("post", "float", True),
+    "loni": ("post", "float", True),
+    "lonf": ("post", "float", True),
+    "zlevmax": ("post", "int", True),
+    "ipresslev": ("post", "int", False),
+    "inplevs": ("post", "int", False),
+    "iplevs": ("post", "int", True),
+    "ascii_data": ("post", "str", False),
+    "site_lat": ("post", "float", False),
+    "site_lon": ("post", "float", False),
+    "ngrids": ("model_grids2", "int", False),
+    "if_adap": ("model_grids2", "int", False),
+    "ihtran": ("model_grids2", "int", False),
+    "nacoust": ("model_grids2", "int", False),
+    "ideltat": ("model_grids2", "int", False),
+    "nstratx": ("model_grids2", "int", True),
+    "nstraty": ("model_grids2", "int", True),
+    "nndtrat": ("model_grids2", "int", True),
+    "nestz1": ("model_grids2", "int", False),
+    "nstratz1": ("model_grids2", "int", True),
+    "nestz2": ("model_grids2", "int", False),
+    "nstratz2": ("model_grids2", "int", True),
+    "ninest": ("model_grids2", "int", True),
+    "njnest": ("model_grids2", "int", True),
+    "nknest": ("model_grids2", "int", True),
+    "nnsttop": ("model_grids2", "int", True),
+    "nnstbot": ("model_grids2", "int", True),
+    "nxtnest": ("model_grids2", "int", True),
+    "split_method": ("ccatt_info2", "str", False),
+    "chemistry_aq": ("ccatt_info2", "int", False),
+    "recycle_tracers": ("ccatt_info2", "int", False),
+    "def_proc_src": ("ccatt_info2", "str", False),
+    "diur_cycle": ("ccatt_info2", "int", True),
+    "na_extra2d": ("ccatt_info2", "int", False),
+    "na_extra3d": ("ccatt_info2", "int", False),
+    "plumerise": ("ccatt_info2", "int", False),
+    "prfrq": ("ccatt_info2", "float", False),
+    "volcanoes": ("ccatt_info2", "int", False),
+    "mech": ("ccatt_info2", "int", False),
+    "teb_spm": ("teb_spm_info", "int", False),
+    "nud_type": ("model_file_info2", "int", False),
+    "vwait1": ("model_file_info2", "float", False),
+    "vwaittot": ("model_file_info2", "float", False),
+    "nud_hfile": ("model_file_info2", "str", False),
+    "ramp": ("model_file_info2", "float", False),
+    "timewindowiau": ("model_file_info2", "float", False),
+    "iclobber": ("model_file_info2", "int", False),
+    "ihistdel": ("model_file_info2", "int", False),
+    "wt_nudge_grid": ("model_file_info2", "float", True),
+    "wt_nudge_uv": ("model_file_info2", "float", False),
+    "wt_nudge_th": ("model_file_info2", "float", False),
+    "wt_nudge_pi": ("model_file_info2", "float", False),
+    "wt_nudge_rt": ("model_file_info2", "float", False),
+    "applyiau": ("model_file_info2", "int", False),
+    "filenameiau": ("model_file_info2", "str", False),
+    "timstr": ("model_file_info2", "float", False),
+    "hfilin": ("model_file_info2", "str", False),
+    "ipastin": ("model_file_info2", "int", False),
+    "pastfn": ("model_file_info2", "str", False),
+    "kwrite": ("model_file_info2", "int", False),
+    "frqprt": ("model_file_info2", "float", False),
+    "initfld": ("model_file_info2", "int", False),
+    "itoptflg": ("model_file_info2", "int", True),
+    "isstflg": ("model_file_info2", "int", True),
+    "ivegtflg": ("model_file_info2", "int", True),
+    "isoilflg": ("model_file_info2", "int", True),
+    "ndviflg": ("model_file_info2", "int", True),
+    "nofilflg": ("model_file_info2", "int", True),
+    "iupdndvi": ("model_file_info2", "int", False),
+    "iupdsst": ("model_file_info2", "int", False),
+    "itopsflg": ("model_file_info2", "int", True),
+    "toptenh": ("model_file_info2", "float", True),
+    "toptwvl": ("model_file_info2", "float", True),
+    "iz0flg": ("model_file_info2", "int", True),
+    "z0max": ("model_file_info2", "float", True),
+    "z0fact": ("model_file_info2", "float", False),
+    "mkcoltab": ("model_file_info2", "int", False),
+    "coltabfn": ("model_file_info2", "str", False),
+    "mapaotfile": ("model_file_info2", "str", False),
+    "julesin": ("model_file_info2", "str", False),
+    "dyncore_flag": ("model_options2", "int", False),
+    "advmnt": ("model_options2", "int", False),
+    "pd_or_mnt_constraint": ("model_options2", "int", False),
+    "order_h": ("model_options2", "int", False),
+    "order_v": ("model_options2", "int", False),
+    "ghostzonelength": ("model_options2", "int", False),
+    "icorflg": ("model_options2", "int", False),
+    "vveldamp": ("model_options2", "int", False),
+    "iexev": ("model_options2", "int", False),
+    "imassflx": ("model_options2", "int", False),
+    "ibnd": ("model_options2", "int", False),
+    "jbnd": ("model_options2", "int", False),
+    "cphas": ("model_options2", "float", False),
+    "lsflg": ("model_options2", "int", False),
+    "nfpt": ("model_options2", "int", False),
+    "distim": ("model_options2", "float", False),
+    "raddatfn": ("model_options2", "str", False),
+    "lonrad": ("model_options2", "int", False),
+    "radtun": ("model_options2", "float", False),
+    "g3d_spread": ("model_options2", "int", False),
+    "wcldbs": ("model_options2", "float", False),
+    "npatch": ("model_options2", "int", False),
+    "nvegpat": ("model_options2", "int", False),
+    "nvgcon": ("model_options2", "int", False),
+    "pctlcon": ("model_options2", "float", False),
+    "nslcon": ("model_options2", "int", False),
+    "zrough": ("model_options2", "float", False),
+    "albedo": ("model_options2", "float", False),
+    "seatmp": ("model_options2", "float", False),
+    "dthcon": ("model_options2", "float", False),
+    "drtcon": ("model_options2", "float", False),
+    "soil_moist": ("model_options2", "str", False),
+    "slz": ("model_options2", "float", True),
+    "slmstr": ("model_options2", "float", True),
+    "stgoff": ("model_options2", "float", True),
+    "idiffk": ("model_options2", "int", True),
+    "ihorgrad": ("model_options2", "int", False),
+    "csx": ("model_options2", "float", True),
+    "csz": ("model_options2", "float", True),
+    "xkhkm": ("model_options2", "float", True),
+    "zkhkm": ("model_options2", "float", True),
+    "akmin": ("model_options2", "float", True),
+    "irime": ("model_options2", "int", False),
+    "iplaws": ("model_options2", "int", False),
+    "icloud": ("model_options2", "int", False),
+    "idriz": ("model_options2", "int", False),
+    "irain": ("model_options2", "int", False),
+    "ipris": ("model_options2", "int", False),
+    "isnow": ("model_options2", "int", False),
+    "iaggr": ("model_options2", "int", False),
+    "igraup": ("model_options2", "int", False),
+    "ihail": ("model_options2", "int", False),
+    "cparm": ("model_options2", "float", False),
+    "rparm": ("model_options2", "float", False),
+    "pparm": ("model_options2", "float", False),
+    "sparm": ("model_options2", "float", False),
+    "aparm": ("model_options2", "float", False),
+    "gparm": ("model_options2", "float", False),
+    "hparm": ("model_options2", "float", False),
+    "dparm": ("model_options2", "float", False),
+    "gnu": ("model_options2", "float", True),
+    "windfarm": ("model_options2", "int", False),
+    "wffile": ("model_options2", "str", False),
+    "timeinterval_wf": ("model_options2", "int", False),
+    "dammodule": ("model_options2", "int", False),
+    "frqprecip": ("model_options2", "float", False),
+    "damoutprefix": ("model_options2", "str", False),
+    "ipsflg": ("model_sound", "int", False),
+    "itsflg": ("model_sound", "int", False),
+    "irtsflg": ("model_sound", "int", False),
+    "iusflg": ("model_sound", "int", False),
+    "hs": ("model_sound", "float", False),
+    "ps": ("model_sound", "float", True),
+    "ts": ("model_sound", "float", True),
+    "rts": ("model_sound", "float", True),
+    "us": ("model_sound", "float", True),
+    "vs": ("model_sound", "float", True),
+    "nplt": ("model_print", "int", False),
+    "iplfld": ("model_print", "str", True),
+    "ixsctn": ("model_print", "int", True),
+    "isbval": ("model_print", "int", True),
+    "guess1st": ("isan_control2", "str", False),
+    "iszstage": ("isan_control2", "int", False),
+    "ivrstage": ("isan_control2", "int", False),
+    "i1st_flg": ("isan_control2", "int", False),
+    "iupa_flg": ("isan_control2", "int", False),
+    "isfc_flg": ("isan_control2", "int", False),
+    "iarawi": ("isan_control2", "str", False),
+    "iasrfce": ("isan_control2", "str", False),
+    "ioflgisz": ("isan_control2", "int", False),
+    "ioflgvar": ("isan_control2", "int", False),
+    "nisn": ("isan_isentropic2", "int", False),
+    "levth": ("isan_isentropic2", "int", True),
+    "nigrids": ("isan_isentropic2", "int", False),
+    "topsigz": ("isan_isentropic2", "float", False),
+    "hybbot": ("isan_isentropic2", "float", False),
+    "hybtop": ("isan_isentropic2", "float", False),
+    "sfcinf": ("isan_isentropic2", "float", False),
+    "sigzwt": ("isan_isentropic2", "float", False),
+    "nfeedvar": ("isan_isentropic2", "int", False),
+    "maxsta": ("isan_isentropic2", "int", False),
+    "maxsfc": ("isan_isentropic2", "int", False),
+    "notsta": ("isan_isentropic2", "int", False),
+    "notid": ("isan_isentropic2", "str", False),
+    "iobswin": ("isan_isentropic2", "int", False),
+    "stasep": ("isan_isentropic2", "float", False),
+    "igridfl": ("isan_isentropic2", "int", False),
+    "gridwt": ("isan_isentropic2", "float", True),
+    "gobsep": ("isan_isentropic2", "float", False),
+    "gobrad": ("isan_isentropic2", "float", False),
+    "wvlnth": ("isan_isentropic2", "float", True),
+    "swvlnth": ("isan_isentropic2", "float", True),
+    "respon": ("isan_isentropic2", "float", True),
+    "dlimit": ("isan_isentropic2", "float", True),
+    "ulimit": ("isan_isentropic2", "float", True),
+    "ccgradswrite": ("isan_isentropic2", "int", False),
+    "icgradsprefix": ("isan_isentropic2", "str", False),
+    "applydigitalfilter": ("digitalfilter", "bool", False),
+    "digitalfiltertimewindow": ("digitalfilter", "float", False),
+    "applymeteogram": ("meteogram", "bool", False),
+    "meteogramfreq": ("meteogram", "float", False),
+    "meteogrammap": ("meteogram", "str", False),
+    "meteogramdir": ("meteogram", "str", False),
+}
+
+# variable -> default, for the variables that may be left out
+DEFAULTS = {
+}
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from ramsin_field_registry import GROUPS, MODELS
+from ramsin_rules import RULES, CROSS_RULES, COMPILED_RULES, COMPILED_CROSS_RULES, \
+    GROUP_FIELDS, FIELD_ORDER, RamsinValidationError, as_tuple, coerce_field, extra_errors
+
+# Incremental ramsin_rules validation. A base namelist (the template) is
+# checked once and its per-group state kept: coerced values, coercion errors
+# and what every rule reported. A namelist that differs from it is checked by
+# coercing only the variables that changed and running only the rules whose
+# inputs changed, following the dependency graph below; the other rules report
+# what they reported for the base. Errors and values are the ones a full
+# ramsin_rules.check_values gives (test_incremental_validation.bash).
+
+
+def rule_inputs(kind, fields, params):
+    # The variables a group rule reads
+    inputs = set(as_tuple(fields))
+    if kind == "length_equals":
+        other, when = params
+        inputs.add(other)
+        if when is not None:
+            inputs.add(when[0])
+    elif kind == "less_than_field":
+        inputs.add(params[0])
+    elif kind == "valid_date":
+        inputs.update(params)
+    return frozenset(inputs)
+
+
+def cross_rule_inputs(rule):
+    # The (group, variable) pairs a cross-group rule reads
+    _, field, (other, _, when) = rule
+    return frozenset([field, other, *((group, name) for group, name, _ in when)])
+
+
+def dependency_graph():
+    # For each group, the inputs of its rules and of its cross-group rules in
+    # the order of COMPILED_RULES and COMPILED_CROSS_RULES
+    rules = {group: [rule_inputs(kind, fields, params) for kind, fields, params in group_rules]
+             for group, group_rules in RULES.items()}
+    cross = {}
+    for file_rules in CROSS_RULES.values():
+        for rule in file_rules:
+            cross.setdefault(rule[1][0], []).append(cross_rule_inputs(rule))
+    return rules, cross
+
+
+RULE_INPUTS, CROSS_RULE_INPUTS = dependency_graph()
+
+
+class GroupState:
+    def __init__(self, variables, coerced, coerce_errors, extras, rule_results, errors,
+                 cross_results):
+        self.variables = variables
+        self.coerced = coerced
+        # variable -> its coercion error
+        self.coerce_errors = coerce_errors
+        self.extras = extras
+        # what each rule of the group reported, as (variable, message) lists
+        self.rule_results = rule_results
+        self.errors = errors
+        # what each cross-group rule reported, None when they did not run
+        self.cross_results = cross_results
+
+
+def changed(a, b):
+    # Equal values of another type coerce differently ("1" vs 1, 1 vs 1.0)
+    if type(a) is not type(b) or a != b:
+        return True
+    if isinstance(a, (list, tuple)):
+        types = list(map(type, a))
+        if types != list(map(type, b)):
+            return True
+        return (list in types or tuple in types) and any(map(changed, a, b))
+    return False
+
+
+MISSING = object()
+
+
+def changed_variables(base, variables):
+    if variables is base:
+        return set()
+    names = {name for name in base if name not in variables}
+    names.update(name for name, value in variables.items()
+                 if changed(base.get(name, MISSING), value))
+    return names
+
+
+def check_variables(group, variables, base=None, names=None):
+    # Coercion and group rules, everything without base, otherwise only what
+    # names (the changed variables of the group) reach
+    fields = GROUP_FIELDS[group]
+    if base is None:
+        coerced, coerce_errors, to_coerce = {}, {}, fields
+        extras = extra_errors(group, variables)
+    else:
+        coerced, coerce_errors = dict(base.coerced), dict(base.coerce_errors)
+        to_coerce = [name for name in names if name in fields]
+        extras = (extra_errors(group, variables) if any(name not in fields for name in names)
+                  else base.extras)
+    for name in to_coerce:
+        coerced.pop(name, None)
+        coerce_errors.pop(name, None)
+        value, error = coerce_field(group, name, variables)
+        if error is None:
+            coerced[name] = value
+        else:
+            coerce_errors[name] = error
+    if base is not None and to_coerce:
+        coerced = {name: coerced[name] for name in fields if name in coerced}
+
+    errors = [coerce_errors[name] for name in fields if name in coerce_errors]
+    errors.extend(extras)
+
+    # Rules only see variables that passed type coercion, a variable reports its
+    # first failure only. dirty holds the variables a rule may see differently
+    # than for the base: the changed ones and those an earlier rule now fails
+    # or passes differently.
+    checked = dict(coerced)
+    dirty = None if base is None else set(names)
+    rule_results = []
+    for i, check in enumerate(COMPILED_RULES.get(group, ())):
+        if base is None or dirty & RULE_INPUTS[group][i]:
+            results = list(check(checked))
+            if base is not None and results != base.rule_results[i]:
+                dirty.update(name for name, _ in results)
+                dirty.update(name for name, _ in base.rule_results[i])
+        else:
+            results = base.rule_results[i]
+        for name, message in results:
+            errors.append(((group, name), message, "value_error"))
+            del checked[name]
+        rule_results.append(results)
+
+    order = FIELD_ORDER[group]
+    errors.sort(key=lambda error: order.get(error[0][1], len(order)))
+    return coerced, coerce_errors, extras, rule_results, errors
+
+
+def check_group(group, variables, valid, base=None, names=None, changes=None,
+                base_valid=None):
+    # A full check without base, otherwise only what names (the changed
+    # variables of the group) and changes (all changed variables, for the
+    # cross-group rules) reach. Returns base itself when nothing changed.
+    if base is not None and not names:
+        # Unchanged: only the cross-group rules may now see other groups
+        if base.cross_results is None:
+            return base
+        coerced, coerce_errors, extras = base.coerced, base.coerce_errors, base.extras
+        rule_results, errors = base.rule_results, []
+    else:
+        coerced, coerce_errors, extras, rule_results, errors = check_variables(
+            group, variables, base, names)
+        if errors:
+            return GroupState(variables, coerced, coerce_errors, extras, rule_results,
+                              errors, None)
+
+    # Cross-group rules see this group and the valid groups declared before it
+    valid = {**valid, group: coerced}
+    cross_results = []
+    for i, check in enumerate(COMPILED_CROSS_RULES.get(group, ())):
+        inputs = CROSS_RULE_INPUTS[group][i]
+        if (base is None or base.cross_results is None or i >= len(base.cross_results)
+                or any(name in changes.get(input_group, ()) for input_group, name in inputs)
+                or any((input_group in valid) != (input_group in base_valid)
+                       for input_group, _ in inputs)):
+            messages = list(check(valid))
+        else:
+            messages = base.cross_results[i]
+        cross_results.append(messages)
+        if messages:
+            errors = [((group,), messages[0], "value_error")]
+            break
+    if base is not None and not names and cross_results == base.cross_results:
+        return base
+    return GroupState(variables, coerced, coerce_errors, extras, rule_results, errors,
+                      cross_results)
+
+
+def check_values(values, ramsin_file, base=None):
+    # Returns the group states and the errors, in ramsin_rules.check_values order
+    changes = None
+    if base is not None:
+        changes = {group: changed_variables(base.states[group].variables, variables)
+                   for group, variables in values.items() if group in base.states}
+
+    states = {}
+    errors = []
+    valid = {}
+    for group, file_of_group in GROUPS.items():
+        if file_of_group != ramsin_file:
+            continue
+        if group not in values:
+            errors.append(((group,), "field required", "value_error.missing"))
+            continue
+
+        base_state = base.states.get(group) if base is not None else None
+        if base_state is None:
+            state = check_group(group, values[group], valid)
+        else:
+            state = check_group(group, values[group], valid, base_state, changes[group],
+                                changes, base.valid)
+        states[group] = state
+        if state.errors:
+            errors.extend(state.errors)
+        else:
+            valid[group] = state.coerced
+
+    for group in values:
+        if GROUPS.get(group) != ramsin_file:
+            errors.append(((group,), "extra fields not permitted", "value_error.extra"))
+    return states, valid, errors
+
+
+class Base:
+    def __init__(self, values, ramsin_file):
+        self.values = values
+        self.ramsin_file = ramsin_file
+        self.states, self.valid, self.errors = check_values(values, ramsin_file)
+        # Coerced values equal to the parsed ones are kept once, the base is
+        # cached with the parsed template
+        for state in self.states.values():
+            for name, value in state.coerced.items():
+                if not changed(state.variables.get(name, MISSING), value):
+                    state.coerced[name] = state.variables[name]
+
+    def check(self, values):
+        states, _, errors = check_values(values, self.ramsin_file, self)
+        # Unchanged groups share their state with the base, the caller gets copies
+        return {group: dict(state.coerced) for group, state in states.items()}, errors
+
+    def validate(self, values):
+        coerced, errors = self.check(values)
+        if errors:
+            raise RamsinValidationError(MODELS[self.ramsin_file], errors)
+        return coerced
+
+
+# The base of each file, replaced when another template is primed
+BASES = {}
+
+
+def same_values(a, b):
+    return a.keys() == b.keys() and all(
+        a[group] is b[group] or not changed_variables(a[group], b[group]) for group in a)
+
+
+def prime(values, ramsin_file, base=None):
+    # base: a check of these values made before, kept with the parsed template
+    if base is None or not same_values(base.values, values):
+        base = BASES.get(ramsin_file)
+        if base is None or not same_values(base.values, values):
+            base = Base(values, ramsin_file)
+    BASES[ramsin_file] = base
+    return base
+
+
+def validate(values, ramsin_file, groups=None):
+    if groups is not None:
+        # The lazy parser already leaves out the groups nothing reaches
+        import ramsin_rules
+        return ramsin_rules.validate(values, ramsin_file, groups)
+
+    # Against the primed template, or against these values when none was primed
+    base = BASES.get(ramsin_file)
+    if base is None:
+        base = prime(values, ramsin_file)
+    return base.validate(values)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+
+# Digest, size and mtime of each output written, for --manifest. An output whose
+# rendered text has the digest recorded for it, and whose size and mtime are
+# still the recorded ones, is left alone instead of being written again.
+#   {"/run/dir/RAMSIN_BASIC_MODIFIED": {"sha256": "...", "size": 5210,
+#                                        "mtime_ns": 1700000000000000000}}
+
+
+def digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def load(path):
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+class Manifest:
+    def __init__(self, path):
+        self.path = path
+        self.entries = load(path)
+        self.updates = {}
+
+    def unchanged(self, output, text_digest):
+        entry = self.entries.get(os.path.abspath(output))
+        if entry is None or entry.get("sha256") != text_digest:
+            return False
+        try:
+            stat = os.stat(output)
+        except OSError:
+            return False
+        return entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+
+    def record(self, output, text_digest):
+        stat = os.stat(output)
+        entry = {"sha256": text_digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        self.entries[os.path.abspath(output)] = entry
+        self.updates[os.path.abspath(output)] = entry
+
+    def take_updates(self):
+        updates, self.updates = self.updates, {}
+        return updates
+
+    def save(self, updates=None):
+        # Merged into the manifest on disk at the time of saving and replaced in
+        # one step, so concurrent renders lose at most each other's entries
+        from ramsin_env import write_text
+
+        updates = self.take_updates() if updates is None else updates
+        if not updates:
+            return
+        write_text(self.path, json.dumps({**load(self.path), **updates}, indent=1))
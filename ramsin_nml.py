@@ -0,0 +1,373 @@
+from __future__ import annotations
+import re
+import threading
+
+# Single-pass reader for the namelist dialect used by the RAMSIN files:
+# $GROUP ... $END (or &GROUP ... /) blocks, ! comments, scalars, quoted
+# strings and comma or blank separated arrays continued over several lines.
+# Produces the same group -> variable -> value mapping as f90nml.read and
+# records where each value sits in the text, so overridden values can be
+# spliced into the original text with comments and layout left untouched.
+# LazyRamsinNamelist only indexes where each group starts and ends and parses
+# a group the first time it is looked up.
+
+TOKEN_RE = re.compile(r"""
+    (?P<space>[ \t\r\n]+)
+  | (?P<comment>![^\n]*)
+  | (?P<string>'(?:[^']|'')*'|"(?:[^"]|"")*")
+  | (?P<group>[$&][A-Za-z_]\w*)
+  | (?P<slash>/)
+  | (?P<name>[A-Za-z_]\w*)(?=[ \t\r\n]*=)
+  | (?P<equals>=)
+  | (?P<comma>,)
+  | (?P<repeat>\d+\*)
+  | (?P<value>[^ \t\r\n,!/'"=$&]+)
+""", re.VERBOSE)
+
+INT_RE = re.compile(r"[+-]?\d+$")
+FLOAT_RE = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eEdD][+-]?\d+)?$")
+LOGICALS = {
+    ".true.": True, ".t.": True, "true": True, "t": True,
+    ".false.": False, ".f.": False, "false": False, "f": False,
+}
+END_GROUPS = ("$end", "&end")
+
+# Enough of TOKEN_RE to find group boundaries outside comments and strings,
+# skipping everything else in one step
+BOUNDARY_RE = re.compile(r"""
+    [^!'"$&/]*
+    (?:
+        (?P<comment>![^\n]*)
+      | (?P<string>'(?:[^']|'')*'|"(?:[^"]|"")*")
+      | (?P<group>[$&][A-Za-z_]\w*)
+      | (?P<slash>/)
+    )
+""", re.VERBOSE)
+
+
+def to_value(token):
+    if INT_RE.match(token):
+        return int(token)
+    if FLOAT_RE.match(token):
+        return float(token.replace("d", "e").replace("D", "E"))
+    logical = LOGICALS.get(token.lower())
+    if logical is not None:
+        return logical
+    return token
+
+
+def to_string(token):
+    quote = token[0]
+    return token[1:-1].replace(quote * 2, quote)
+
+
+def line_number(text, pos):
+    return text.count("\n", 0, pos) + 1
+
+
+class RamsinNamelist(dict):
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+        # (group, variable) -> (start, end) offsets of the value text
+        self.spans = {}
+        # group -> offset of its $END
+        self.ends = {}
+
+    def splice(self, patch):
+        edits = []
+        for group, variables in patch.items():
+            group = group.lower()
+            if group not in self:
+                raise KeyError(f"Group {group} is not in the namelist")
+            current = self[group]
+            for name, value in variables.items():
+                name = name.lower()
+                if name in current:
+                    if current[name] == value:
+                        continue
+                    start, end = self.spans[(group, name)]
+                    if "\n" in self.text[start:end] and value not in (None, []):
+                        edits.extend(splice_lines(self.text, start, end, value))
+                        continue
+                    column = start - self.text.rfind("\n", 0, start) - 1
+                    edits.append((start, end, to_fortran(value, column)))
+                else:
+                    end = self.ends[group]
+                    prefix = f"   {name.upper()} = "
+                    edits.append((end, end,
+                                  f"{prefix}{to_fortran(value, len(prefix))},\n"))
+
+        if not edits:
+            return self.text
+
+        edits.sort(key=lambda edit: edit[0])
+        pieces = []
+        pos = 0
+        for start, end, replacement in edits:
+            pieces.append(self.text[pos:start])
+            pieces.append(replacement)
+            pos = end
+        pieces.append(self.text[pos:])
+        return "".join(pieces)
+
+
+VALUES_PER_LINE = 8
+
+
+def splice_lines(text, start, end, value):
+    # A value over several lines keeps its lines and the comments on them:
+    # each line takes as many values as it held, the last line the rest
+    lines = []
+    line = -1
+    repeat = 1
+    for match in TOKEN_RE.finditer(text, start, end):
+        kind = match.lastgroup
+        if kind == "space" or kind == "comment":
+            continue
+        if line != text.count("\n", start, match.start()):
+            line = text.count("\n", start, match.start())
+            # [start, end, values] of the value text on the line
+            lines.append([match.start(), match.end(), 0])
+        lines[-1][1] = match.end()
+        if kind == "repeat":
+            repeat = int(match.group(kind)[:-1])
+        elif kind != "comma":
+            lines[-1][2] += repeat
+            repeat = 1
+
+    values = list(value) if isinstance(value, (list, tuple)) else [value]
+    edits = []
+    used = 0
+    for line_start, line_end, count in lines[:-1]:
+        # The last line keeps at least one value, no line ends in a null
+        take = values[used:used + min(count, max(0, len(values) - used - 1))]
+        used += len(take)
+        if take:
+            edits.append((line_start, line_end, ", ".join(to_fortran(v) for v in take) + ","))
+            continue
+        # A line left without values goes, unless it still holds a comment
+        first = text.rfind("\n", 0, line_start) + 1
+        last = text.find("\n", line_end) + 1
+        if text[first:line_start].strip() or text[line_end:last].strip():
+            edits.append((line_start, line_end, ""))
+        else:
+            edits.append((first, last, ""))
+    line_start, line_end, _ = lines[-1]
+    column = line_start - text.rfind("\n", 0, line_start) - 1
+    rest = values[used:]
+    edits.append((line_start, line_end, to_fortran(rest if len(rest) > 1 else rest[0], column)))
+    return edits
+
+
+def to_fortran(value, column=0):
+    if isinstance(value, (list, tuple)):
+        # Long arrays continue on lines aligned with the first value
+        lines = [", ".join(to_fortran(v) for v in value[i:i + VALUES_PER_LINE])
+                 for i in range(0, len(value), VALUES_PER_LINE)]
+        return (",\n" + " " * column).join(lines)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return ".true." if value else ".false."
+    if isinstance(value, (int, float)):
+        return repr(value)
+    value = str(value)
+    return "'" + value.replace("'", "''") + "'"
+
+
+def store(group, name, values):
+    if len(values) == 0:
+        group[name] = None
+    elif len(values) == 1:
+        group[name] = values[0]
+    else:
+        group[name] = values
+
+
+class LazyRamsinNamelist(RamsinNamelist):
+    lazy = True
+
+    def __init__(self, text):
+        super().__init__(text)
+        # group -> [(start, end)] offsets from its $GROUP to the end of its $END
+        self.bounds = index_groups(text)
+        self.lock = threading.Lock()
+
+    def __missing__(self, group):
+        if group not in self.bounds:
+            raise KeyError(group)
+        # The daemon's request threads share one template: a group is parsed
+        # aside and published in one assignment, never seen half filled
+        with self.lock:
+            if dict.__contains__(self, group):
+                return dict.__getitem__(self, group)
+            parsed = RamsinNamelist(self.text)
+            for start, end in self.bounds[group]:
+                parse_into(parsed, self.text, start, end)
+            self.spans.update(parsed.spans)
+            self.ends.update(parsed.ends)
+            dict.__setitem__(self, group, parsed[group])
+            return parsed[group]
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k != "lock"}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, lock=threading.Lock())
+
+    def __contains__(self, group):
+        return group in self.bounds
+
+    def __iter__(self):
+        return iter(self.bounds)
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def get(self, group, default=None):
+        return self[group] if group in self.bounds else default
+
+    def keys(self):
+        return self.bounds.keys()
+
+    def items(self):
+        return [(group, self[group]) for group in self.bounds]
+
+    def values(self):
+        return [self[group] for group in self.bounds]
+
+
+def index_groups(text):
+    bounds = {}
+    start = None
+    for match in BOUNDARY_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "comment" or kind == "string":
+            continue
+        token = match.group(kind)
+        token_start = match.start(kind)
+        is_end = kind == "slash" or token.lower() in END_GROUPS
+        if start is None:
+            if is_end:
+                raise ValueError(
+                    f"Expected a $GROUP at line {line_number(text, token_start)}, "
+                    f"found {token!r}")
+            group_name, start = token[1:].lower(), token_start
+        elif is_end:
+            bounds.setdefault(group_name, []).append((start, match.end()))
+            start = None
+        else:
+            raise ValueError(
+                f"Missing $END before {token!r} at line {line_number(text, token_start)}")
+
+    if start is not None:
+        raise ValueError("Missing $END at end of file")
+    return bounds
+
+
+def reads(text):
+    namelist = RamsinNamelist(text)
+    parse_into(namelist, text)
+    return namelist
+
+
+def reads_lazy(text):
+    return LazyRamsinNamelist(text)
+
+
+def parse_into(namelist, text, pos=0, endpos=None):
+    spans = namelist.spans
+    group = None
+    group_name = None
+    name = None
+    values = []
+    span_start = span_end = 0
+    # True after '=' or a separator, where a further comma means a null value
+    pending = False
+    repeat = 0
+
+    for match in TOKEN_RE.finditer(text, pos, len(text) if endpos is None else endpos):
+        kind = match.lastgroup
+        token = match.group(kind)
+
+        if kind == "space" or kind == "comment":
+            continue
+
+        if group is None:
+            if kind == "group" and token.lower() not in END_GROUPS:
+                group_name = token[1:].lower()
+                group = namelist.setdefault(group_name, {})
+                continue
+            raise ValueError(
+                f"Expected a $GROUP at line {line_number(text, match.start())}, "
+                f"found {token!r}")
+
+        if kind == "group" or kind == "slash":
+            if kind == "group" and token.lower() not in END_GROUPS:
+                raise ValueError(
+                    f"Missing $END before {token!r} at line "
+                    f"{line_number(text, match.start())}")
+            if name is not None:
+                store(group, name, values + [None] * repeat)
+                spans[(group_name, name)] = (span_start, span_end)
+            namelist.ends[group_name] = match.start()
+            group, name, values, pending, repeat = None, None, [], False, 0
+            continue
+
+        if kind == "name":
+            if name is not None:
+                store(group, name, values + [None] * repeat)
+                spans[(group_name, name)] = (span_start, span_end)
+            name, values, pending, repeat = token.lower(), [], False, 0
+            continue
+
+        if kind == "equals":
+            if name is None or values or pending:
+                raise ValueError(
+                    f"Unexpected '=' at line {line_number(text, match.start())}")
+            pending = True
+            span_start = span_end = match.end()
+            continue
+
+        if name is None:
+            raise ValueError(
+                f"Unsupported syntax {token!r} at line {line_number(text, match.start())}")
+
+        # The span runs from the first value to the last value or null, a
+        # trailing comma stays outside it
+        if span_start == span_end:
+            span_start = match.start()
+
+        if kind == "comma":
+            if repeat:
+                values.extend([None] * repeat)
+                repeat = 0
+                span_end = match.end()
+            elif pending:
+                values.append(None)
+                span_end = match.end()
+            pending = True
+            continue
+
+        span_end = match.end()
+
+        if kind == "repeat":
+            repeat = int(token[:-1])
+            continue
+
+        value = to_string(token) if kind == "string" else to_value(token)
+        if repeat:
+            values.extend([value] * repeat)
+            repeat = 0
+        else:
+            values.append(value)
+        pending = False
+
+    if group is not None:
+        raise ValueError("Missing $END at end of file")
+
+
+def read(path):
+    with open(path) as f:
+        return reads(f.read())
@@ -0,0 +1,168 @@
+from __future__ import annotations
+import argparse
+import re
+import sys
+
+from ramsin_env import read_ramsin, render_files, write_output, add_template_args, \
+    template_parser
+from ramsin_encodings import CONVERTERS, parse_list
+from ramsin_env_resolver import parse_env_value
+from ramsin_field_registry import GROUPS, FIELDS
+
+# The values of -v are written like in the namelist or in f90nml -v: strings may
+# be quoted, arrays are comma separated. They are coerced like RAMSIN_*
+# variables, to the types of the registry, and arrays of numbers and logicals
+# take the same compact encodings (45*0.0, linspace(0,1,5), @file.npy, ...).
+ITEM_RE = re.compile(r"""\s*('(?:[^']|'')*'|"(?:[^"]|"")*"|[^,'"]*?)\s*(,|$)""")
+
+
+def get_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="ramsin_env.py patch",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="""
+Set the variables given with -v in the group given by the -g before them, for
+any number of groups of RAMSIN_BASIC and RAMSIN_ADVANCED, reading, validating
+and writing each file once. RAMSIN_* variables are not read.
+    ramsin_env.py patch -rb RAMSIN_BASIC -ra RAMSIN_ADVANCED \\
+        -g MODEL_GRIDS -v TIMMAX=48 -v DTLONG=30. \\
+        -g MODEL_FILE_INFO -v "HFILOUT='./dataout/HIS/run'" \\
+        -g MODEL_OPTIONS2 -v RADDATFN=./tables/rad_param.data""",
+    )
+
+    parser.add_argument(
+        "--ramsin_basic",
+        "-rb",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC",
+        help="the RAMSIN_BASIC file",
+    )
+    parser.add_argument(
+        "--ramsin_advanced",
+        "-ra",
+        action="store",
+        type=str,
+        default="",
+        help="the RAMSIN_ADVANCED file (default: ADVANCED_RAMSIN of the patched\n"
+             "RAMSIN_BASIC)",
+    )
+    parser.add_argument(
+        "--output_basic",
+        "-ob",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC_MODIFIED",
+        help="the filename to write the RAMSIN_BASIC",
+    )
+    parser.add_argument(
+        "--output_advanced",
+        "-oa",
+        action="store",
+        type=str,
+        default="RAMSIN_ADVANCED_MODIFIED",
+        help="the filename to write the RAMSIN_ADVANCED",
+    )
+    parser.add_argument(
+        "--group",
+        "-g",
+        action="append",
+        dest="patch",
+        type=lambda group: ("group", group),
+        help="the namelist group the following -v set, in either file",
+    )
+    parser.add_argument(
+        "--variable",
+        "-v",
+        action="append",
+        dest="patch",
+        type=lambda item: ("variable", item),
+        help="KEY=VALUE, a variable of the last -g group",
+    )
+    parser.add_argument(
+        "--fsync",
+        action="store_true",
+        help="fsync each output and its directory before returning",
+    )
+    add_template_args(parser)
+
+    args = parser.parse_args(argv)
+    args.parser = template_parser(parser, args)
+    try:
+        args.overrides = parse_patch(args.patch or [])
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def unquote(raw):
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "'\"":
+        return raw[1:-1].replace(raw[0] * 2, raw[0])
+    return raw
+
+
+def split_items(raw):
+    items = []
+    pos = 0
+    while True:
+        match = ITEM_RE.match(raw, pos)
+        if match is None:
+            raise ValueError(f"cannot split {raw!r} into comma separated values")
+        items.append(match.group(1))
+        if not match.group(2):
+            return items
+        pos = match.end()
+
+
+def parse_value(name, raw):
+    _, type_name, is_list = FIELDS[name]
+    if not is_list:
+        return parse_env_value(name, unquote(raw.strip()))
+    if type_name != "str":
+        return parse_list(raw, type_name)
+    convert = CONVERTERS[type_name]
+    return [convert(unquote(item)) for item in split_items(raw)]
+
+
+def parse_patch(patch):
+    overrides = {}
+    group = None
+    for kind, item in patch:
+        if kind == "group":
+            group = item.lower()
+            if group not in GROUPS:
+                raise ValueError(f"-g {item}: unknown group")
+            continue
+        if group is None:
+            raise ValueError(f"-v {item}: no -g group before it")
+        name, sep, raw = item.partition("=")
+        name = name.strip().lower()
+        if not sep:
+            raise ValueError(f"-v {item}: expected KEY=VALUE")
+        if FIELDS.get(name, (None,))[0] != group:
+            raise ValueError(f"-v {item}: {group.upper()} has no variable {name.upper()}")
+        try:
+            overrides.setdefault(group, {})[name] = parse_value(name, raw)
+        except ValueError as e:
+            raise ValueError(f"-v {item}: {e}") from None
+    return overrides
+
+
+def patch_main(argv=None):
+    args = get_args(argv)
+
+    def read(path, half=None):
+        return read_ramsin(path, args.use_cache, args.cache_dir, args.parser)
+
+    basic_text, ramsin_advanced_path, advanced_text = render_files(
+        args.ramsin_basic, args.ramsin_advanced, args.overrides, read, args.writer,
+        args.validator)
+    print(f"Updating RAMSIN_BASIC from {args.ramsin_basic}")
+    write_output(args.output_basic, basic_text, fsync=args.fsync)
+    print(f"Updating RAMSIN_ADVANCED from {ramsin_advanced_path}")
+    write_output(args.output_advanced, advanced_text, fsync=args.fsync)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(patch_main())
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import bisect
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Input files BRAMS opens for the RUNTYPE being rendered, checked before
+# anything is written. Every directory is listed once with os.scandir, on a
+# thread pool, and the files are looked up in the sorted listings instead of
+# being stat'ed one by one, which is slow on Lustre.
+#   MAKESFC  the HEADER of each geographic dataset read for some grid (flag 1)
+#   INITIAL  the emission maps of each grid for the start date (CCATT = 1 and
+#            SRCMAPFN not NONE) and, with SOIL_MOIST i or a, the soil moisture
+#            of the start date or, with SOIL_MOIST_FAIL = l, of one of the
+#            previous days. USDATA_IN may hold a YYYYMMDD placeholder, otherwise
+#            the date follows the prefix.
+
+GEO_DATASETS = (
+    # (prefix variable, flag variable)
+    ("itoptfn", "itoptflg"),
+    ("isstfn", "isstflg"),
+    ("ivegtfn", "ivegtflg"),
+    ("isoilfn", "isoilflg"),
+    ("ndvifn", "ndviflg"),
+)
+SOIL_MOIST_LOOKBACK_DAYS = 5
+WORKERS = 16
+
+
+def start_date(grids):
+    return datetime.datetime(grids["iyear1"], grids["imonth1"], grids["idate1"],
+                             grids["itime1"] // 100, grids["itime1"] % 100)
+
+
+def soil_moisture_file(usdata_in, day):
+    # (path, is a prefix of the file name)
+    if "YYYYMMDD" in usdata_in:
+        return usdata_in.replace("YYYYMMDD", day.strftime("%Y%m%d")), False
+    return usdata_in + day.strftime("%Y%m%d"), True
+
+
+def required_inputs(basic, advanced):
+    # (variable, candidates): one of the (path, is prefix) candidates must exist
+    grids = basic["model_grids"]
+    ngrids = advanced["model_grids2"]["ngrids"]
+    runtype = grids["runtype"].upper()
+    inputs = []
+
+    if runtype == "MAKESFC":
+        files, flags = basic["model_file_info"], advanced["model_file_info2"]
+        for prefix, flag in GEO_DATASETS:
+            if 1 in flags[flag][:ngrids]:
+                inputs.append((prefix, [(files[prefix] + "HEADER", False)]))
+
+    if runtype == "INITIAL":
+        start = start_date(grids)
+        ccatt = basic["ccatt_info"]
+        if ccatt["ccatt"] == 1 and ccatt["srcmapfn"].upper() != "NONE":
+            stamp = start.strftime("-T-%Y-%m-%d-%H%M%S")
+            for grid in range(1, ngrids + 1):
+                inputs.append(("srcmapfn", [(f"{ccatt['srcmapfn']}{stamp}-g{grid}.", True)]))
+
+        options = basic["model_options"]
+        fail = options["soil_moist_fail"].lower()
+        if advanced["model_options2"]["soil_moist"].lower() in ("i", "a") and fail != "h":
+            days = SOIL_MOIST_LOOKBACK_DAYS if fail == "l" else 0
+            inputs.append(("usdata_in", [
+                soil_moisture_file(options["usdata_in"], start - datetime.timedelta(days=back))
+                for back in range(days + 1)]))
+    return inputs
+
+
+def list_directory(directory):
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(entry.name for entry in entries)
+    except OSError:
+        return None
+
+
+class Listings:
+    # Sorted file names of each directory, None for a directory that cannot be
+    # listed, kept for the following checks
+    def __init__(self):
+        self.names = {}
+
+    def fetch(self, directories, workers=WORKERS):
+        todo = sorted({directory for directory in directories if directory not in self.names})
+        if not todo:
+            return
+        with ThreadPoolExecutor(min(workers, len(todo))) as pool:
+            self.names.update(zip(todo, pool.map(list_directory, todo)))
+
+    def exists(self, path, is_prefix=False):
+        directory, name = os.path.split(path)
+        names = self.names[directory or "."]
+        if names is None:
+            return False
+        i = bisect.bisect_left(names, name)
+        return i < len(names) and (names[i] == name or is_prefix and names[i].startswith(name))
+
+
+def missing_inputs(basic, advanced, listings=None, workers=WORKERS, cwd=None):
+    # Relative paths are taken from cwd, the current directory by default
+    inputs = required_inputs(basic, advanced)
+    if cwd is not None:
+        inputs = [(variable, [(os.path.join(cwd, path), is_prefix)
+                              for path, is_prefix in candidates])
+                  for variable, candidates in inputs]
+    listings = Listings() if listings is None else listings
+    listings.fetch((os.path.dirname(path) or "." for _, candidates in inputs
+                    for path, _ in candidates), workers)
+
+    missing = []
+    for variable, candidates in inputs:
+        if any(listings.exists(path, is_prefix) for path, is_prefix in candidates):
+            continue
+        paths = [path + "*" if is_prefix else path for path, is_prefix in candidates]
+        directories = {os.path.dirname(path) or "." for path, _ in candidates}
+        if len(directories) == 1 and listings.names[min(directories)] is None:
+            missing.append(f"{variable.upper()}: directory {min(directories)} not found")
+        elif len(paths) == 1:
+            missing.append(f"{variable.upper()}: {paths[0]} not found")
+        else:
+            missing.append(f"{variable.upper()}: none of {', '.join(paths)} found")
+    return missing
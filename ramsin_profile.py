@@ -0,0 +1,66 @@
+from __future__ import annotations
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Wall and CPU time of the phases of a render, for --profile. Phases are kept
+# per half ("main" for the steps shared by both files, "basic", "advanced")
+# in the order they ran.
+
+
+class Profile:
+    def __init__(self, stats_path=None):
+        self.phases = {}
+        self.info = {}
+        self.stats_path = stats_path
+        self.profiler = None
+        if stats_path is not None:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+    @contextmanager
+    def phase(self, half, name):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            timing = self.phases.setdefault(half, {}).setdefault(name, {"wall": 0.0, "cpu": 0.0})
+            timing["wall"] += time.perf_counter() - wall
+            timing["cpu"] += time.process_time() - cpu
+
+    def record(self, half, name, value):
+        self.info.setdefault(half, {})[name] = value
+
+    def record_file(self, half, name, path):
+        try:
+            self.record(half, name, {"path": path, "bytes": os.path.getsize(path)})
+        except OSError:
+            self.record(half, name, {"path": path, "bytes": None})
+
+    def report(self):
+        report = {
+            "wall": time.perf_counter() - self.start_wall,
+            "cpu": time.process_time() - self.start_cpu,
+        }
+        for half in dict.fromkeys([*self.phases, *self.info]):
+            report[half] = {**self.info.get(half, {}), "phases": self.phases.get(half, {})}
+        return report
+
+    def finish(self, path):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.stats_path)
+        if path is None:
+            return
+        text = json.dumps(self.report(), indent=2)
+        if path == "-":
+            print(text, file=sys.stderr)
+        else:
+            with open(path, "w") as f:
+                f.write(text + "\n")
@@ -0,0 +1,526 @@
+from __future__ import annotations
+from datetime import date
+
+from ramsin_field_registry import GROUPS, FIELDS, MODELS, DEFAULTS
+
+# Declarative form of the choice/range rules in ramsin_model_validator and
+# ramsin_adv_model_validator. The rules are compiled once into frozenset and
+# comparison checks and every group is checked in a single pass, collecting
+# all violations instead of stopping at the first one. Unlike the schema in
+# ramsin_field_registry the tables are not generated: a change to a validator
+# must be copied here (test_validation_backends.bash compares the two).
+
+
+def choices(fields, *values):
+    return ("choices", fields, values)
+
+
+def each_choice(fields, *values):
+    return ("each_choice", fields, values)
+
+
+def positive(*fields):
+    return ("positive", fields, ())
+
+
+def minimum(fields, value):
+    return ("minimum", fields, (value,))
+
+
+def between(fields, low, high):
+    return ("between", fields, (low, high))
+
+
+def min_length(fields, value):
+    return ("min_length", fields, (value,))
+
+
+def length_equals(fields, other, when=None):
+    return ("length_equals", fields, (other, when))
+
+
+def less_than_field(fields, other):
+    return ("less_than_field", fields, (other,))
+
+
+def valid_date(year, month, day):
+    return ("valid_date", year, (month, day))
+
+
+def multiple_of(field, other, max_ratio=None, when=()):
+    # field and other are (group, variable); when is a list of (group, variable, value)
+    return ("multiple_of", field, (other, max_ratio, when))
+
+
+ON_OFF = (0, 1)
+
+RULES = {
+    "model_grids": [
+        min_length("expnme", 1),
+        choices("runtype", "MAKESFC", "MAKEVFILE", "INITIAL", "HISTORY", "MEMORY"),
+        choices("timeunit", "h", "m", "s"),
+        positive("timmax", "imonth1", "idate1", "iyear1", "nnxp", "nnyp", "nnzp", "nzg",
+                 "nzs", "deltax", "deltay"),
+        valid_date("iyear1", "imonth1", "idate1"),
+        minimum("dtlong", 1.0),
+        length_equals("zz", "nnzp", when=("deltaz", 0.0)),
+    ],
+    "ccatt_info": [
+        choices(("ccatt", "chem_assim", "aerosol", "aer_assim"), *ON_OFF),
+        choices("chemistry", -1, 0, 1, 2, 3, 4),
+    ],
+    "model_file_info": [
+        choices("ioutput", 0, 1, 2, 10),
+    ],
+    "model_options": [
+        choices("ilwrtyp", *range(0, 7)),
+        choices("nnqparm", *range(0, 9)),
+        choices("closure_type", "PB", "EN", "GR", "LO", "MC", "SC", "AS"),
+        choices("nnshcu", 0, 1, 2, 3),
+        choices("isfcl", *range(0, 6)),
+        choices("isfcl_ocean", *ON_OFF),
+        choices("soil_moist_fail", "s", "h", "l"),
+        choices("mcphys_type", *range(0, 8)),
+    ],
+    "isan_control": [
+        positive("isan_inc"),
+    ],
+    "isan_isentropic": [
+        choices("icfiletype", 0, 1, 2, 3, 4),
+    ],
+    "post": [
+        length_equals("vp", "nvp"),
+    ],
+    "model_grids2": [
+        choices("ihtran", *ON_OFF),
+        choices("ideltat", 0, 1, 2),
+    ],
+    "ccatt_info2": [
+        choices("split_method", "SYMMETRIC", "SEQUENTIAL", "PARALLEL"),
+        choices(("chemistry_aq", "recycle_tracers", "plumerise", "volcanoes"), *ON_OFF),
+        choices("def_proc_src", "STOP", "LAST_SOURCES"),
+    ],
+    "teb_spm_info": [
+        choices("teb_spm", *ON_OFF),
+    ],
+    "model_file_info2": [
+        choices("nud_type", 0, 1, 2, 3, 4),
+        choices(("iclobber", "ihistdel", "ipastin", "kwrite", "initfld", "iupdndvi",
+                 "iupdsst", "mkcoltab"), *ON_OFF),
+        choices("applyiau", 0, 1, 2),
+    ],
+    "model_options2": [
+        choices("dyncore_flag", 0, 1, 2, 3),
+        choices("advmnt", 0, 1, 2),
+        choices("iexev", 1, 2),
+        choices("jbnd", 1, 2, 3, 4),
+        choices("lsflg", 0, 1, 2, 3),
+        minimum("npatch", 2),
+        less_than_field("nvegpat", "npatch"),
+        choices("nvgcon", *range(1, 19)),
+        choices("nslcon", *range(1, 13)),
+        choices("ihorgrad", 1, 2),
+        choices("irime", *ON_OFF),
+        choices("iplaws", *ON_OFF),
+        choices(("icorflg", "imassflx", "lonrad", "g3d_spread"), *ON_OFF),
+        each_choice("idiffk", *range(1, 9)),
+        choices("soil_moist", "n", "i", "h", "a"),
+    ],
+    "model_sound": [
+        choices("ipsflg", *ON_OFF),
+        choices("itsflg", 0, 1, 2),
+        choices("irtsflg", 0, 1, 2, 3, 4),
+        choices("iusflg", *ON_OFF),
+    ],
+    "model_print": [
+        between("nplt", 0, 50),
+        each_choice("ixsctn", 1, 2, 3),
+        each_choice("iplfld", "UP", "VP", "WP", "PP", "THP", "RT", "RC", "PCPT", "TKE",
+                    "HSCL", "RR", "RP", "RA", "TV", "CP", "RV", "RTP", "VSCL", "THETA",
+                    "RL", "TG", "SLM", "THVP", "RI", "RCOND", "CONPR", "CONP", "CONH",
+                    "CONM", "THIL", "TEMP", "TVP", "THV", "RELHUM", "SPEED", "FTHRD",
+                    "MICRO", "Z0", "ZI", "ZMAT", "USTARL", "USTARW", "TSTARL", "TSTARW",
+                    "RSTARL", "RSTARW", "UW", "VW", "WFZ", "TFZ", "QFZ", "RLONG",
+                    "RSHORT"),
+    ],
+    "isan_control2": [
+        choices("guess1st", "PRESS", "RAMS"),
+        choices(("i1st_flg", "iupa_flg", "isfc_flg"), 1, 2, 3),
+        choices(("ioflgisz", "ioflgvar"), *ON_OFF),
+    ],
+    "isan_isentropic2": [
+        minimum("nisn", 1),
+        length_equals("levth", "nisn"),
+    ],
+}
+
+CROSS_RULES = {
+    "basic": [
+        multiple_of(("model_file_info", "frqanl"), ("model_grids", "dtlong")),
+        multiple_of(("ccatt_info", "chem_timestep"), ("model_grids", "dtlong"),
+                    max_ratio=4, when=[("ccatt_info", "ccatt", 1)]),
+        multiple_of(("ccatt_info", "aer_timestep"), ("model_grids", "dtlong"),
+                    max_ratio=4, when=[("ccatt_info", "ccatt", 1),
+                                       ("ccatt_info", "aerosol", 1)]),
+    ],
+    "advanced": [],
+}
+
+
+class RamsinValidationError(ValueError):
+    def __init__(self, model_name, errors):
+        self.model_name = model_name
+        self.errors = errors
+        super().__init__(str(self))
+
+    def __str__(self):
+        count = len(self.errors)
+        lines = [f"{count} validation error{'' if count == 1 else 's'} for {self.model_name}"]
+        for loc, message, error_type in self.errors:
+            lines.append(" -> ".join(loc))
+            lines.append(f"  {message} (type={error_type})")
+        return "\n".join(lines)
+
+
+# Type coercion follows the pydantic v1 rules for the field types in the registry
+
+BOOL_STRINGS = {
+    "0": False, "off": False, "f": False, "false": False, "n": False, "no": False,
+    "1": True, "on": True, "t": True, "true": True, "y": True, "yes": True,
+}
+
+
+def to_int(v):
+    if isinstance(v, int) and not isinstance(v, bool):
+        return v
+    if isinstance(v, (str, bytes, float, bool)):
+        try:
+            return int(v)
+        except (ValueError, OverflowError):
+            pass
+    raise TypeError("value is not a valid integer", "type_error.integer")
+
+
+def to_float(v):
+    if isinstance(v, float):
+        return v
+    if isinstance(v, (str, bytes, int)):
+        try:
+            return float(v)
+        except ValueError:
+            pass
+    raise TypeError("value is not a valid float", "type_error.float")
+
+
+def to_str(v):
+    if isinstance(v, str):
+        return v
+    if isinstance(v, (int, float)):
+        return str(v)
+    raise TypeError("str type expected", "type_error.str")
+
+
+def to_bool(v):
+    if v is True or v is False:
+        return v
+    if isinstance(v, str):
+        v = v.lower()
+    if isinstance(v, (str, int)) and v in BOOL_STRINGS:
+        return BOOL_STRINGS[v]
+    if v in (0, 1):
+        return bool(v)
+    raise TypeError("value could not be parsed to a boolean", "type_error.bool")
+
+
+COERCERS = {
+    "int": to_int,
+    "float": to_float,
+    "str": to_str,
+    "bool": to_bool,
+}
+
+
+def group_fields():
+    fields = {group: {} for group in GROUPS}
+    for name, (group, type_name, is_list) in FIELDS.items():
+        fields[group][name] = (COERCERS[type_name], is_list)
+    return fields
+
+
+GROUP_FIELDS = group_fields()
+FIELD_ORDER = {group: {name: i for i, name in enumerate(fields)}
+               for group, fields in GROUP_FIELDS.items()}
+
+
+def coerce_field(group, name, variables):
+    # (value, None) or (None, error)
+    coerce, is_list = GROUP_FIELDS[group][name]
+    if name not in variables:
+        # pydantic v1 does not validate defaults
+        if name in DEFAULTS:
+            return DEFAULTS[name], None
+        return None, ((group, name), "field required", "value_error.missing")
+    value = variables[name]
+    if value is None:
+        return None, ((group, name), "none is not an allowed value",
+                      "type_error.none.not_allowed")
+    try:
+        if is_list:
+            if not isinstance(value, (list, tuple)):
+                raise TypeError("value is not a valid list", "type_error.list")
+            return [coerce(v) for v in value], None
+        return coerce(value), None
+    except TypeError as e:
+        return None, ((group, name), *e.args)
+
+
+def extra_errors(group, variables):
+    fields = GROUP_FIELDS[group]
+    return [((group, name), "extra fields not permitted", "value_error.extra")
+            for name in variables if name not in fields]
+
+
+def coerce_group(group, variables, errors):
+    coerced = {}
+    for name in GROUP_FIELDS[group]:
+        value, error = coerce_field(group, name, variables)
+        if error is None:
+            coerced[name] = value
+        else:
+            errors.append(error)
+    errors.extend(extra_errors(group, variables))
+    return coerced
+
+
+# Rule compilers: each returns check(values) yielding (variable, message)
+
+def as_tuple(fields):
+    return (fields,) if isinstance(fields, str) else tuple(fields)
+
+
+def compile_choices(fields, values):
+    allowed = frozenset(values)
+    message = f"Value must be one of {list(values)}"
+
+    def check(group):
+        for name in fields:
+            if name in group and group[name] not in allowed:
+                yield name, message
+    return check
+
+
+def compile_each_choice(fields, values):
+    allowed = frozenset(values)
+    message = f"Each value must be one of {list(values)}"
+
+    def check(group):
+        for name in fields:
+            if name in group and not allowed.issuperset(group[name]):
+                yield name, message
+    return check
+
+
+def compile_positive(fields, _):
+    def check(group):
+        for name in fields:
+            if name in group and group[name] <= 0:
+                yield name, "Value must be positive"
+    return check
+
+
+def compile_minimum(fields, params):
+    low = params[0]
+    message = f"Value must be greater or equal to {int(low) if low == int(low) else low}"
+
+    def check(group):
+        for name in fields:
+            if name in group and group[name] < low:
+                yield name, message
+    return check
+
+
+def compile_between(fields, params):
+    low, high = params
+    message = f"Value must be between {low} and {high}"
+
+    def check(group):
+        for name in fields:
+            if name in group and not low <= group[name] <= high:
+                yield name, message
+    return check
+
+
+def compile_min_length(fields, params):
+    low = params[0]
+    message = f"Length must be greater or equal to {low}"
+
+    def check(group):
+        for name in fields:
+            if name in group and len(group[name]) < low:
+                yield name, message
+    return check
+
+
+def compile_length_equals(fields, params):
+    other, when = params
+    message = f"Length must be equal to {other}"
+
+    def check(group):
+        if other not in group:
+            return
+        if when is not None and group.get(when[0]) != when[1]:
+            return
+        for name in fields:
+            if name in group and len(group[name]) != int(group[other]):
+                yield name, message
+    return check
+
+
+def compile_less_than_field(fields, params):
+    other = params[0]
+    message = f"Value must be greater or equal to 1 and lesser than {other.upper()}"
+
+    def check(group):
+        for name in fields:
+            if name in group and (group[name] < 1
+                                  or (other in group and group[name] >= group[other])):
+                yield name, message
+    return check
+
+
+def compile_valid_date(fields, params):
+    year = fields[0]
+    month, day = params
+
+    def check(group):
+        if year in group and month in group and day in group:
+            try:
+                date.fromisoformat(f"{group[year]:04}-{group[month]:02}-{group[day]:02}")
+            except ValueError as e:
+                yield year, str(e)
+    return check
+
+
+RULE_COMPILERS = {
+    "choices": compile_choices,
+    "each_choice": compile_each_choice,
+    "positive": compile_positive,
+    "minimum": compile_minimum,
+    "between": compile_between,
+    "min_length": compile_min_length,
+    "length_equals": compile_length_equals,
+    "less_than_field": compile_less_than_field,
+    "valid_date": compile_valid_date,
+}
+
+
+def compile_cross_rule(rule):
+    _, (group, name), (other, max_ratio, when) = rule
+    other_group, other_name = other
+    if max_ratio is None:
+        message = f"{name} must be a multiple of {other_name}"
+    else:
+        message = f"{name} must be a multiple of {other_name} and {max_ratio} times at most"
+
+    def check(values):
+        if group not in values or other_group not in values:
+            return
+        for when_group, when_name, when_value in when:
+            if values.get(when_group, {}).get(when_name) != when_value:
+                return
+        value = values[group].get(name)
+        divisor = values[other_group].get(other_name)
+        if value is None or divisor is None:
+            return
+        if value % divisor != 0.0 or (max_ratio is not None and value / divisor > max_ratio):
+            yield message
+    return check
+
+
+def compile_rules():
+    compiled = {}
+    for group, rules in RULES.items():
+        compiled[group] = [RULE_COMPILERS[kind](as_tuple(fields), params)
+                           for kind, fields, params in rules]
+    # Cross-group rules run with the group they report on
+    cross = {}
+    for rules in CROSS_RULES.values():
+        for rule in rules:
+            cross.setdefault(rule[1][0], []).append(compile_cross_rule(rule))
+    return compiled, cross
+
+
+COMPILED_RULES, COMPILED_CROSS_RULES = compile_rules()
+
+
+def check_group(group, variables, valid):
+    group_errors = []
+    coerced = coerce_group(group, variables, group_errors)
+    failed = {loc[1] for loc, _, _ in group_errors}
+    # Rules only see variables that passed type coercion, as in pydantic
+    checked = {k: v for k, v in coerced.items() if k not in failed}
+    for check in COMPILED_RULES.get(group, ()):
+        for name, message in list(check(checked)):
+            group_errors.append(((group, name), message, "value_error"))
+            # Like a pydantic field, a variable reports its first failure only
+            del checked[name]
+
+    if group_errors:
+        # pydantic order: declared variables first, then the extra ones
+        order = FIELD_ORDER[group]
+        group_errors.sort(key=lambda error: order.get(error[0][1], len(order)))
+        return coerced, group_errors
+
+    # Cross-group rules see this group and the valid groups declared before it
+    valid = {**valid, group: coerced}
+    for check in COMPILED_CROSS_RULES.get(group, ()):
+        for message in check(valid):
+            return coerced, [((group,), message, "value_error")]
+    return coerced, []
+
+
+def linked_groups(groups, ramsin_file):
+    # The groups plus every group a cross-group rule ties to them
+    linked = set(groups)
+    changed = True
+    while changed:
+        changed = False
+        for _, (group, _), (other, _, when) in CROSS_RULES[ramsin_file]:
+            rule_groups = {group, other[0], *(when_group for when_group, _, _ in when)}
+            if linked & rule_groups and not rule_groups <= linked:
+                linked |= rule_groups
+                changed = True
+    return linked
+
+
+def check_values(values, ramsin_file, groups=None):
+    # With groups, only those groups are required
+    errors = []
+    coerced = {}
+    valid = {}
+
+    for group, file_of_group in GROUPS.items():
+        if file_of_group != ramsin_file or groups is not None and group not in groups:
+            continue
+        if group not in values:
+            errors.append(((group,), "field required", "value_error.missing"))
+            continue
+
+        coerced[group], group_errors = check_group(group, values[group], valid)
+        if group_errors:
+            errors.extend(group_errors)
+        else:
+            valid[group] = coerced[group]
+
+    for group in values:
+        if GROUPS.get(group) != ramsin_file:
+            errors.append(((group,), "extra fields not permitted", "value_error.extra"))
+
+    return coerced, errors
+
+
+def validate(values, ramsin_file, groups=None):
+    coerced, errors = check_values(values, ramsin_file, groups)
+    if errors:
+        raise RamsinValidationError(MODELS[ramsin_file], errors)
+    return coerced
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import argparse
+import copy
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+
+from ramsin_env import ENV_SOCKET_VARIABLE, add_template_args, template_parser, \
+    read_ramsin, render_files, write_output, open_manifest, get_adjusters, VALIDATORS, \
+    SPLICE_PARSERS
+from ramsin_env_resolver import resolve_overrides
+
+# Requests and responses are one JSON object per line. A request carries the
+# RAMSIN_* variables of the client and the same paths and options as the
+# command line:
+#   {"environ": {"RAMSIN_DTLONG": "15"}, "override_files": ["site.toml"], "cwd": "/run/dir",
+#    "ramsin_basic": "RAMSIN_BASIC", "ramsin_advanced": "", "output_basic": "out/RAMSIN_BASIC",
+#    "output_advanced": null,
+#    "manifest": "out/manifest.json", "fsync": false,
+#    "parser": "native", "writer": "splice", "validator": "rules",
+#    "adjust": {"check_zz": false, "emit_zz": true, "max_stretch": null,
+#               "check_sounding": false, "sounding": "sounding.csv", "check_dimensions": true,
+#               "preflight": true, "preflight_workers": null}}
+# Relative paths are taken from cwd; override files are parsed once and kept
+# until they change. Outputs without a path are returned as text in the
+# response, the others with whether they were written or reused:
+#   {"ok": true, "ramsin_advanced": "...", "status_basic": "written", "advanced": "<text>"}
+#   {"ok": false, "error": "RamsinValidationError: ..."}
+
+
+def default_socket_path():
+    base = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(base, f"ramsin_env-{os.getuid()}.sock")
+
+
+def get_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="ramsin_env.py serve",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description=f"""
+Keep the models and parsed templates loaded and render override sets sent
+over a Unix socket, several at a time. Point the command line at the daemon
+with --socket or {ENV_SOCKET_VARIABLE}; it then sends its RAMSIN_* variables and
+paths to the daemon instead of rendering itself.""",
+    )
+
+    parser.add_argument(
+        "--socket",
+        action="store",
+        type=str,
+        default=os.environ.get(ENV_SOCKET_VARIABLE) or default_socket_path(),
+        help=f"the Unix socket to listen on\n"
+             f"(default: ${ENV_SOCKET_VARIABLE} or {default_socket_path()})",
+    )
+    parser.add_argument(
+        "--ramsin_basic",
+        "-rb",
+        action="store",
+        type=str,
+        default="RAMSIN_BASIC",
+        help="a RAMSIN_BASIC template to load at start up",
+    )
+    add_template_args(parser)
+
+    args = parser.parse_args(argv)
+    args.parser = template_parser(parser, args)
+    return args
+
+
+class TemplateStore:
+    # Parsed templates kept in memory, parsed again when the file changes
+    def __init__(self, use_cache=True, cache_dir=None):
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.templates = {}
+        self.lock = threading.Lock()
+
+    def read(self, path, parser, writer):
+        stat = os.stat(path)
+        key = (os.path.realpath(path), parser)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.templates.get(key)
+        if entry is None or entry[0] != version:
+            entry = (version, read_ramsin(path, self.use_cache, self.cache_dir, parser))
+            with self.lock:
+                self.templates[key] = entry
+
+        # The f90nml writer patches the namelist in place, splice leaves it alone
+        if writer == "f90nml":
+            return copy.deepcopy(entry[1])
+        return entry[1]
+
+
+def handle_request(request, store, defaults):
+    cwd = request.get("cwd") or os.getcwd()
+    parser = request.get("parser") or defaults.parser
+    writer = request.get("writer") or defaults.writer
+    validator = request.get("validator") or defaults.validator
+    if writer == "splice" and parser not in SPLICE_PARSERS:
+        raise ValueError("--writer splice needs the native or lazy parser")
+    if parser == "lazy" and writer != "splice":
+        raise ValueError("--parser lazy needs --writer splice")
+
+    overrides = resolve_overrides(request.get("override_files"), request.get("environ", {}),
+                                  cwd)
+    adjusters = get_adjusters(argparse.Namespace(**request.get("adjust", {}), cwd=cwd))
+    basic_text, ramsin_advanced_path, advanced_text = render_files(
+        os.path.join(cwd, request["ramsin_basic"]), request.get("ramsin_advanced") or "",
+        overrides, lambda path, half: store.read(os.path.join(cwd, path), parser, writer),
+        writer, validator, adjusters=adjusters)
+
+    manifest_path = request.get("manifest")
+    manifest = open_manifest(manifest_path and os.path.join(cwd, manifest_path))
+    response = {"ok": True, "ramsin_advanced": ramsin_advanced_path}
+    for name, text in (("basic", basic_text), ("advanced", advanced_text)):
+        path = request.get(f"output_{name}")
+        if path:
+            response[f"status_{name}"] = write_output(os.path.join(cwd, path), text,
+                                                      manifest, request.get("fsync", False))
+        else:
+            response[name] = text
+    if manifest is not None:
+        manifest.save()
+    return response
+
+
+def make_server(path, store, defaults):
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    response = handle_request(json.loads(line), store, defaults)
+                except Exception as e:
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+                self.wfile.flush()
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+    return Server(path, RequestHandler)
+
+
+def remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            os.remove(path)
+            return
+    raise RuntimeError(f"A daemon is already listening on {path}")
+
+
+def warm_up(store, args):
+    # Pay the imports, template parsing and model building before the first request
+    for validate in VALIDATORS.values():
+        try:
+            validate({}, "basic")
+        except ValueError:
+            pass
+        except ImportError:
+            # An optional backend that is not installed
+            pass
+
+    if os.path.exists(args.ramsin_basic):
+        try:
+            render_files(args.ramsin_basic, "", {},
+                         lambda path, half: store.read(path, args.parser, args.writer),
+                         args.writer, args.validator)
+        except Exception as e:
+            print(f"Could not load {args.ramsin_basic}: {e}", file=sys.stderr)
+
+
+def serve_main(argv=None):
+    args = get_args(argv)
+    store = TemplateStore(args.use_cache, args.cache_dir)
+    warm_up(store, args)
+
+    remove_stale_socket(args.socket)
+    old_umask = os.umask(0o077)
+    try:
+        server = make_server(args.socket, store, args)
+    finally:
+        os.umask(old_umask)
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"Serving on {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(args.socket)
+    return 0
@@ -0,0 +1,107 @@
+from __future__ import annotations
+import numpy as np
+
+# The MODEL_SOUND sounding as one (5, levels) array, rows PS, TS, RTS, US, VS.
+# What each row holds depends on IPSFLG, ITSFLG, IRTSFLG and IUSFLG; PS(1) is
+# the surface pressure (mb) with either IPSFLG. The lengths, the order of the
+# pressures (decreasing) or heights (increasing) and the physical bounds are
+# checked on the whole array at once.
+
+ARRAYS = ("ps", "ts", "rts", "us", "vs")
+
+SURFACE_PRESSURE = (300.0, 1100.0)
+# flag -> (low, high, unit) of each array
+PS_BOUNDS = {0: (1.0, 1100.0, "mb"), 1: (-500.0, 100000.0, "m")}
+TS_BOUNDS = {0: (-120.0, 60.0, "C"), 1: (150.0, 335.0, "K"), 2: (150.0, 2000.0, "K")}
+RTS_BOUNDS = {
+    0: (-150.0, 60.0, "C"),
+    1: (120.0, 335.0, "K"),
+    2: (0.0, 50.0, "g/kg"),
+    3: (0.0, 100.0, "%"),
+    4: (0.0, 150.0, "K"),
+}
+# IUSFLG -> bounds of US, bounds of VS
+WIND_BOUNDS = {
+    0: ((-150.0, 150.0, "m/s"), (-150.0, 150.0, "m/s")),
+    1: ((0.0, 360.0, "degrees"), (0.0, 150.0, "m/s")),
+}
+
+
+def bounds(sound):
+    us, vs = WIND_BOUNDS[sound["iusflg"]]
+    return [PS_BOUNDS[sound["ipsflg"]], TS_BOUNDS[sound["itsflg"]],
+            RTS_BOUNDS[sound["irtsflg"]], us, vs]
+
+
+def check_sounding(sound):
+    lengths = [len(sound[name]) for name in ARRAYS]
+    if len(set(lengths)) != 1:
+        return ["PS, TS, RTS, US and VS must have the same length, not "
+                + ", ".join(f"{name.upper()} {length}" for name, length in zip(ARRAYS, lengths))]
+    if lengths[0] < 2:
+        return ["The sounding needs at least 2 levels"]
+
+    data = np.array([sound[name] for name in ARRAYS], dtype=float)
+    limits = bounds(sound)
+    low = np.array([[low] for low, _, _ in limits]).repeat(data.shape[1], axis=1)
+    high = np.array([[high] for _, high, _ in limits]).repeat(data.shape[1], axis=1)
+    low[0, 0], high[0, 0] = SURFACE_PRESSURE
+    bad = ~((data >= low) & (data <= high))
+
+    errors = []
+    for row, level in zip(*np.nonzero(bad)):
+        if errors and errors[-1][0] == row:
+            errors[-1][2] += 1
+            continue
+        unit = "mb" if (row, level) == (0, 0) else limits[row][2]
+        errors.append([row, f"{ARRAYS[row].upper()}({level + 1}) = {data[row, level]:g} is "
+                            f"outside [{low[row, level]:g}, {high[row, level]:g}] {unit}", 0])
+    errors = [message + (f" (and {more} more levels)" if more else "")
+              for _, message, more in errors]
+
+    # Pressures decrease from the surface, heights increase above it
+    if sound["ipsflg"] == 0:
+        steps, what, first = np.diff(data[0]), "pressures must decrease", 1
+    else:
+        steps, what, first = -np.diff(data[0, 1:]), "heights must increase", 2
+    wrong = np.flatnonzero(steps >= 0)
+    if len(wrong):
+        k = wrong[0] + first
+        errors.append(f"PS {what}, PS({k + 1}) = {data[0, k]:g} after "
+                      f"PS({k}) = {data[0, k - 1]:g}")
+    return errors
+
+
+def load_sounding(path):
+    # A CSV or whitespace separated text file, one level per line, in the
+    # PS TS RTS US VS column order or the order of a header line naming them.
+    # Lines starting with # or ! are comments.
+    with open(path) as f:
+        lines = [line for line in f if line.strip() and line.lstrip()[0] not in "#!"]
+    if not lines:
+        raise ValueError(f"No levels in the sounding file {path}")
+    delimiter = "," if "," in lines[0] else None
+
+    columns = ARRAYS
+    if any(c.isalpha() for c in lines[0]):
+        columns = tuple(name.strip().lower() for name in lines[0].split(delimiter))
+        if sorted(columns) != sorted(ARRAYS):
+            raise ValueError(f"The header of {path} must name the columns PS, TS, RTS, US "
+                             f"and VS, not {', '.join(columns)}")
+        lines = lines[1:]
+
+    data = np.loadtxt(lines, delimiter=delimiter, ndmin=2)
+    if data.shape[1] != len(columns):
+        raise ValueError(f"{path} has {data.shape[1]} columns, expected {len(columns)}")
+    return {name: data[:, i].tolist() for i, name in enumerate(columns)}
+
+
+def sounding(patch, path=None):
+    # Applied to the validated RAMSIN_ADVANCED patch, see ramsin_env.sounding
+    sound = patch["model_sound"]
+    if path is not None:
+        sound = patch["model_sound"] = {**sound, **load_sounding(path)}
+    errors = check_sounding(sound)
+    if errors:
+        raise ValueError("Invalid sounding:\n  " + "\n  ".join(errors))
+    return patch
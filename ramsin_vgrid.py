@@ -0,0 +1,56 @@
+from __future__ import annotations
+import numpy as np
+
+# Vertical grid of the coarse grid. With DELTAZ > 0 BRAMS derives the levels
+# itself (gridset): ZZ(1) = -DELTAZ/2, ZZ(2) = DELTAZ/2 and each following
+# spacing is the previous one times DZRAT, capped at DZMAX. With DELTAZ = 0
+# the ZZ list is used as given.
+
+MAX_STRETCH_RATIO = 1.2
+
+
+def compute_zz(deltaz, dzrat, dzmax, nnzp):
+    if deltaz <= 0:
+        raise ValueError("DELTAZ must be positive to compute ZZ")
+    if nnzp < 2:
+        raise ValueError("NNZP must be at least 2 to compute ZZ")
+    spacing = np.minimum(deltaz * dzrat ** np.arange(1, nnzp - 1, dtype=float), dzmax)
+    zz = np.empty(nnzp)
+    zz[0] = -0.5 * deltaz
+    zz[1] = 0.5 * deltaz
+    zz[2:] = zz[1] + np.cumsum(spacing)
+    return zz
+
+
+def check_zz(zz, nnzp, max_ratio=MAX_STRETCH_RATIO):
+    zz = np.asarray(zz, dtype=float)
+    errors = []
+    if len(zz) != nnzp:
+        errors.append(f"ZZ has {len(zz)} levels, NNZP is {nnzp}")
+
+    spacing = np.diff(zz)
+    for k in np.flatnonzero(spacing <= 0):
+        errors.append(f"ZZ must increase, level {k + 2} ({zz[k + 1]:g}) is not above "
+                      f"level {k + 1} ({zz[k]:g})")
+
+    if not errors:
+        ratio = spacing[1:] / spacing[:-1]
+        for k in np.flatnonzero(ratio > max_ratio):
+            errors.append(f"ZZ spacing grows by {ratio[k]:.3g} from level {k + 2} to "
+                          f"{k + 3}, more than {max_ratio:g}")
+    return errors
+
+
+def vertical_grid(patch, check=False, emit=False, max_ratio=MAX_STRETCH_RATIO):
+    # Applied to the validated RAMSIN_BASIC patch, see ramsin_env.get_adjusters and
+    # ramsin_env.render_ramsin
+    grids = patch["model_grids"]
+    if emit and grids["deltaz"] > 0:
+        zz = compute_zz(grids["deltaz"], grids["dzrat"], grids["dzmax"], grids["nnzp"])
+        grids["zz"] = [round(float(z), 3) for z in zz]
+        grids["deltaz"] = 0.0
+    elif check and grids["deltaz"] == 0:
+        errors = check_zz(grids["zz"], grids["nnzp"], max_ratio)
+        if errors:
+            raise ValueError("Invalid ZZ:\n  " + "\n  ".join(errors))
+    return patch
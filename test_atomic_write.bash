@@ -0,0 +1,64 @@
+#!/bin/bash
+# Checks the atomic output writer: no temporary files are left behind, a
+# replaced output keeps its mode, --fsync renders the same text, a failed
+# replace leaves nothing behind and concurrent renders into one output leave
+# one complete render.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+render() {
+    isolated "$@"
+}
+
+leftovers() {
+    find "$OUT" -type f -name '.*'
+}
+
+render RAMSIN_DTLONG=15 python3 ramsin_env.py -ob "$OUT/plain_B" -oa "$OUT/plain_A" \
+    >/dev/null || exit 1
+render RAMSIN_DTLONG=15 python3 ramsin_env.py --fsync -ob "$OUT/fsync_B" -oa "$OUT/fsync_A" \
+    >/dev/null || exit 1
+if ! cmp -s "$OUT/plain_B" "$OUT/fsync_B" || ! cmp -s "$OUT/plain_A" "$OUT/fsync_A"; then
+    fail "--fsync renders differently"
+fi
+
+chmod 640 "$OUT/plain_B"
+render RAMSIN_DTLONG=20 python3 ramsin_env.py -ob "$OUT/plain_B" -oa "$OUT/plain_A" \
+    >/dev/null || exit 1
+mode=$(stat -c %a "$OUT/plain_B")
+if [ "$mode" != 640 ] || ! grep -qi "dtlong = 20.0" "$OUT/plain_B"; then
+    fail "the replaced output has mode $mode, expected 640, or was not replaced"
+fi
+
+# A directory in the way of the output: the rename fails
+mkdir "$OUT/RAMSIN_BASIC_DIR"
+if render RAMSIN_DTLONG=15 python3 ramsin_env.py -ob "$OUT/RAMSIN_BASIC_DIR" \
+        -oa "$OUT/unused_A" >/dev/null 2>&1; then
+    fail "an output over a directory was written"
+fi
+
+pids=()
+for dtlong in 10 15 20 30; do
+    render RAMSIN_DTLONG=$dtlong python3 ramsin_env.py -ob "$OUT/shared_B" -oa "$OUT/shared_A" \
+        >/dev/null &
+    pids+=($!)
+done
+for pid in "${pids[@]}"; do
+    wait "$pid" || exit 1
+done
+complete=0
+for dtlong in 10 15 20 30; do
+    render RAMSIN_DTLONG=$dtlong python3 ramsin_env.py -ob "$OUT/single_B" -oa "$OUT/single_A" \
+        >/dev/null || exit 1
+    cmp -s "$OUT/shared_B" "$OUT/single_B" && complete=1
+done
+if [ $complete -ne 1 ]; then
+    fail "concurrent renders left an output that is none of the renders"
+fi
+
+if [ -n "$(leftovers)" ]; then
+    fail "temporary files were left behind:" "$(leftovers)"
+fi
+
+echo "OK: outputs are replaced atomically and keep their mode"
@@ -0,0 +1,91 @@
+#!/bin/bash
+# Checks ramsin_env.py batch: each member of a JSONL or CSV table renders what
+# a single ramsin_env.py run with the same RAMSIN_* variables renders, row
+# values win over the environment, the outputs do not depend on --jobs, a
+# member may name its own RAMSIN_ADVANCED and a failing member is reported
+# without stopping the others.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+cat > "$OUT/members.jsonl" <<'EOF'
+{"expnme": "a"}
+{"RAMSIN_EXPNME": "b", "dtlong": 10, "timmax": 6}
+{"expnme": "c", "iplevs": [1000, 500], "inplevs": 2}
+EOF
+cat > "$OUT/members.csv" <<'EOF'
+expnme,dtlong,timmax,iplevs,inplevs
+a,,,,
+b,10,6,,
+c,,,"1000,500",2
+EOF
+
+batch() {
+    isolated RAMSIN_DTLONG=15 python3 ramsin_env.py batch "$@"
+}
+
+for table in members.jsonl members.csv; do
+    for jobs in 1 2; do
+        dir="$OUT/$table-$jobs"
+        if ! output=$(batch "$OUT/$table" -j $jobs -ob "$dir/{expnme}/RAMSIN_BASIC" \
+                -oa "$dir/{expnme}/RAMSIN_ADVANCED_{index}" 2>&1); then
+            fail "batch $table -j $jobs" "$output"
+        fi
+        if ! echo "$output" | grep -q "Rendered 3/3 configurations"; then
+            fail "batch $table -j $jobs did not render 3 configurations" "$output"
+        fi
+    done
+done
+
+# What single runs with the same variables render
+single() {
+    local name=$1
+    shift
+    isolated RAMSIN_DTLONG=15 "$@" python3 ramsin_env.py \
+        -ob "$OUT/single/$name/RAMSIN_BASIC" -oa "$OUT/single/$name/RAMSIN_ADVANCED" \
+        >/dev/null || exit 1
+}
+mkdir -p "$OUT/single/a" "$OUT/single/b" "$OUT/single/c"
+single a RAMSIN_EXPNME=a
+single b RAMSIN_EXPNME=b RAMSIN_DTLONG=10 RAMSIN_TIMMAX=6
+single c RAMSIN_EXPNME=c RAMSIN_IPLEVS=1000,500 RAMSIN_INPLEVS=2
+
+index=0
+for name in a b c; do
+    for dir in "$OUT"/members.*-[12]; do
+        if ! cmp -s "$dir/$name/RAMSIN_BASIC" "$OUT/single/$name/RAMSIN_BASIC" \
+                || ! cmp -s "$dir/$name/RAMSIN_ADVANCED_$index" \
+                    "$OUT/single/$name/RAMSIN_ADVANCED"; then
+            fail "member $name of ${dir#$OUT/} differs from a single render" \
+                "$(diff "$dir/$name/RAMSIN_BASIC" "$OUT/single/$name/RAMSIN_BASIC")"
+        fi
+    done
+    index=$((index + 1))
+done
+
+# A member naming another RAMSIN_ADVANCED with ADVANCED_RAMSIN renders from it
+sed 's/NACOUST  = 4/NACOUST  = 6/' RAMSIN_ADVANCED > "$OUT/RAMSIN_ADVANCED_D"
+printf '{"expnme": "a"}\n{"expnme": "d", "advanced_ramsin": "%s"}\n' \
+    "$OUT/RAMSIN_ADVANCED_D" > "$OUT/advanced.jsonl"
+for jobs in 1 2; do
+    if ! output=$(batch "$OUT/advanced.jsonl" -j $jobs -ob "$OUT/advanced-$jobs/{expnme}/B" \
+            -oa "$OUT/advanced-$jobs/{expnme}/A" 2>&1); then
+        fail "batch with ADVANCED_RAMSIN -j $jobs" "$output"
+    fi
+    expect_value "$OUT/advanced-$jobs/a/A" model_grids2 nacoust 4 "the template member"
+    expect_value "$OUT/advanced-$jobs/d/A" model_grids2 nacoust 6 "the ADVANCED_RAMSIN member"
+done
+
+printf '{"expnme": "ok"}\n{"expnme": "bad", "iplevs": "1,a"}\n' > "$OUT/failing.jsonl"
+output=$(batch "$OUT/failing.jsonl" -j 1 -ob "$OUT/failing/{expnme}/RAMSIN_BASIC" \
+    -oa "$OUT/failing/{expnme}/RAMSIN_ADVANCED" 2>&1)
+status=$?
+if [ $status -ne 1 ] || ! echo "$output" | grep -q "Member 1 failed: " \
+        || ! echo "$output" | grep -qi "RAMSIN_IPLEVS" \
+        || ! echo "$output" | grep -q "Rendered 1/2 configurations" \
+        || [ ! -f "$OUT/failing/ok/RAMSIN_BASIC" ]; then
+    fail "a failing member is not reported by index and variable, or stops the batch" \
+        "$output"
+fi
+
+echo "OK: batch members render like single runs from JSONL and CSV tables"
@@ -0,0 +1,61 @@
+#!/bin/bash
+# Checks --check_dimensions: the template passes, raising NGRIDS reports each
+# per-grid array with fewer values, raising NZG reports each soil array whose
+# length differs, and the run passes once the arrays are extended. Nothing is
+# written when it fails.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+render() {
+    rm -f "$OUT/RAMSIN_BASIC" "$OUT/RAMSIN_ADVANCED"
+    isolated "$@" python3 ramsin_env.py --check_dimensions \
+        -ob "$OUT/RAMSIN_BASIC" -oa "$OUT/RAMSIN_ADVANCED" 2>&1
+}
+
+passes() {
+    local output
+    if ! output=$(render "${@:2}") || [ ! -f "$OUT/RAMSIN_ADVANCED" ]; then
+        fail "$1" "$output"
+    fi
+}
+
+rejects() {
+    # rejects MESSAGE "LINE..." VAR=VALUE...; exactly these lines are reported
+    local output
+    if output=$(render "${@:3}") || [ -f "$OUT/RAMSIN_BASIC" ]; then
+        fail "$1: the run was not stopped" "$output"
+    fi
+    if [ "$(echo "$output" | sed -n '/^ValueError: Inconsistent array lengths:$/,$p' \
+            | tail -n +2)" != "$2" ]; then
+        fail "$1: expected" "$2
+got
+$output"
+    fi
+}
+
+passes "the template"
+
+rejects "NGRIDS = 3" \
+"  CSX (MODEL_OPTIONS2) has 2 values, NGRIDS is 3 (at least that many are needed)
+  CSZ (MODEL_OPTIONS2) has 2 values, NGRIDS is 3 (at least that many are needed)
+  XKHKM (MODEL_OPTIONS2) has 2 values, NGRIDS is 3 (at least that many are needed)
+  ZKHKM (MODEL_OPTIONS2) has 2 values, NGRIDS is 3 (at least that many are needed)
+  AKMIN (MODEL_OPTIONS2) has 2 values, NGRIDS is 3 (at least that many are needed)
+  GRIDWT (ISAN_ISENTROPIC2) has 2 values, NGRIDS is 3 (at least that many are needed)" \
+    RAMSIN_Model_Grids2_Ngrids=3
+passes "NGRIDS = 3 with 3 values each" RAMSIN_Model_Grids2_Ngrids=3 RAMSIN_CSX=0.2,0.2,0.2 \
+    RAMSIN_CSZ=0.2,0.2,0.2 RAMSIN_XKHKM=3,3,3 RAMSIN_ZKHKM=3,3,3 RAMSIN_AKMIN=1,1,1 \
+    RAMSIN_GRIDWT=1,1,1
+
+rejects "NZG = 8" \
+"  SLZ (MODEL_OPTIONS2) has 7 values, NZG is 8
+  SLMSTR (MODEL_OPTIONS2) has 7 values, NZG is 8
+  STGOFF (MODEL_OPTIONS2) has 7 values, NZG is 8" \
+    RAMSIN_NZG=8
+rejects "a soil array longer than NZG" "  SLMSTR (MODEL_OPTIONS2) has 8 values, NZG is 7" \
+    RAMSIN_SLMSTR=0.3,0.3,0.3,0.3,0.3,0.3,0.3,0.3
+passes "NZG = 8 with 8 values each" RAMSIN_NZG=8 RAMSIN_SLZ=-12,-8,-7,-4,-2,-1,-0.3,-0.1 \
+    RAMSIN_SLMSTR=0.3,0.3,0.3,0.3,0.3,0.3,0.3,0.3 RAMSIN_STGOFF=0,0,0,0,0,0,0,0
+
+echo "OK: --check_dimensions reports each array whose length does not fit"
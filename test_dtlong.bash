@@ -0,0 +1,71 @@
+#!/bin/bash
+# Checks ramsin_env.py dtlong against limits computed by hand on a 10 km grid
+# with the template's 80 m lowest ZZ spacing and NACOUST = 4: the advective,
+# vertical and acoustic limits, a nest refined by NSTRATX and NNDTRAT, the
+# suggestion FRQANL = 10800 s is a multiple of, and --apply.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+dtlong() {
+    isolated RAMSIN_DELTAX=10000 RAMSIN_DELTAY=10000 "$@"
+}
+
+check() {
+    # check MESSAGE EXPECTED... -- COMMAND...
+    local message=$1 expected=() output
+    shift
+    while [ "$1" != "--" ]; do
+        expected+=("$1")
+        shift
+    done
+    shift
+    if ! output=$(dtlong "$@" 2>&1); then
+        fail "$message" "$output"
+    fi
+    for line in "${expected[@]}"; do
+        if ! echo "$output" | grep -qF -- "$line"; then
+            fail "$message: no line with: $line" "$output"
+        fi
+    done
+}
+
+# 0.8 * 10000 / (80 * sqrt 2) = 70.71 s advective, 0.8 * 80 / 0.5 = 128 s
+# vertical, 10000 / (340 * sqrt 2) = 20.80 s acoustic; 70 s does not divide
+# FRQANL, 60 s does
+check "the advective limit" \
+    "   1    10000.0     1      70.71     128.00      20.80      70.71      70.71" \
+    "DTLONG 120 s, largest stable 70.71 s, suggested 60 s" \
+    -- python3 ramsin_env.py dtlong
+
+# At 40 m/s the 4 acoustic steps bound the long one: 83.19 s, 80 s divides FRQANL
+check "the acoustic limit" \
+    "   1    10000.0     1     141.42     128.00      20.80      83.19      83.19" \
+    "DTLONG 120 s, largest stable 83.19 s, suggested 80 s" \
+    -- python3 ramsin_env.py dtlong --max_wind 40
+
+check "the vertical limit" \
+    "   1    10000.0     1      70.71      32.00      20.80      32.00      32.00" \
+    "DTLONG 120 s, largest stable 32.00 s, suggested 30 s" \
+    -- python3 ramsin_env.py dtlong --max_vertical_wind 2
+
+# The nest has a third of the spacing and a quarter of the timestep
+check "a nest" \
+    "   2     3333.3     4      23.57     128.00       6.93      23.57      94.28" \
+    "largest stable 70.71 s, suggested 60 s" \
+    -- RAMSIN_Model_Grids2_Ngrids=2 python3 ramsin_env.py dtlong
+
+check "--apply" "suggested 60 s" \
+    -- RAMSIN_EXPNME=applied python3 ramsin_env.py dtlong --apply \
+    -ob "$OUT/RAMSIN_BASIC" -oa "$OUT/RAMSIN_ADVANCED"
+expect_value "$OUT/RAMSIN_BASIC" model_grids dtlong 60.0 "--apply"
+expect_value "$OUT/RAMSIN_BASIC" model_grids deltax 10000.0 "--apply"
+expect_value "$OUT/RAMSIN_BASIC" model_grids expnme applied "--apply"
+[ -f "$OUT/RAMSIN_ADVANCED" ] || fail "--apply wrote no RAMSIN_ADVANCED"
+
+if output=$(dtlong python3 ramsin_env.py dtlong --max_wind 0 2>&1) \
+        || ! echo "$output" | grep -q "must be positive"; then
+    fail "--max_wind 0 was not rejected" "$output"
+fi
+
+echo "OK: dtlong reports the hand-computed limits and applies its suggestion"
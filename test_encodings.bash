@@ -0,0 +1,46 @@
+#!/bin/bash
+# Checks the compact encodings of list-valued RAMSIN_* variables end to end:
+# each value is rendered by ramsin_env.py and read back from the output.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+printf '# levels\n280 285\n290,295\n' > "$OUT/levth.txt"
+python3 -c 'import sys, numpy as np; np.save(sys.argv[1], np.arange(7) / 10)' "$OUT/slmstr.npy"
+
+# variable|group|RAMSIN_* value|expected value read back
+CASES="
+vp|post|topo, precip|['topo', 'precip']
+vp|post|topo, 2*precip|['topo', 'precip', 'precip']
+iplevs|post| 1000 , 850,500 |[1000, 850, 500]
+iplevs|post|3*500|[500, 500, 500]
+levth|isan_isentropic2|range(280, 300, 5)|[280, 285, 290, 295]
+levth|isan_isentropic2|@$OUT/levth.txt|[280, 285, 290, 295]
+slmstr|model_options2|7*0.3|[0.3, 0.3, 0.3, 0.3, 0.3, 0.3, 0.3]
+slmstr|model_options2|linspace(0, 0.6, 7)|[0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+slmstr|model_options2|2*0.1, linspace(0.2, 0.4, 3), 2*0.5|[0.1, 0.1, 0.2, 0.3, 0.4, 0.5, 0.5]
+slmstr|model_options2|@$OUT/slmstr.npy|[0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+zz|model_grids|geomspace(10, 1000, 3), 2000|[10.0, 100.0, 1000.0, 2000.0]
+"
+
+# The variables a list length is checked against
+declare -A SIZES=([vp]=RAMSIN_NVP [levth]=RAMSIN_NISN [iplevs]=RAMSIN_INPLEVS [zz]=RAMSIN_NNZP)
+
+while IFS='|' read -r name group raw expected; do
+    [ -z "$name" ] && continue
+    size=()
+    if [ -n "${SIZES[$name]}" ]; then
+        count=$(python3 -c 'import sys; print(sys.argv[1].count(",") + 1)' "$expected")
+        size=("${SIZES[$name]}=$count")
+    fi
+    file=RAMSIN_BASIC
+    [ "$group" = isan_isentropic2 ] || [ "$group" = model_options2 ] && file=RAMSIN_ADVANCED
+
+    if ! output=$(isolated "RAMSIN_${name^^}=$raw" "${size[@]}" RAMSIN_DELTAZ=0 \
+            python3 ramsin_env.py -ob "$OUT/RAMSIN_BASIC" -oa "$OUT/RAMSIN_ADVANCED" 2>&1); then
+        fail "RAMSIN_${name^^}=$raw" "$output"
+    fi
+    expect_value "$OUT/$file" "$group" "$name" "$expected" "RAMSIN_${name^^}=$raw"
+done <<< "$CASES"
+
+echo "OK: compact list encodings render the expected values"
@@ -0,0 +1,33 @@
+#!/bin/bash
+# Checks how ramsin_env.py resolves RAMSIN_* variables: RAMSIN_{GROUP}_{VARIABLE}
+# wins over RAMSIN_{VARIABLE} in either order, names are case-insensitive,
+# unknown names are ignored and a malformed value is reported by name.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+render() {
+    isolated "$@" python3 ramsin_env.py -ob "$OUT/RAMSIN_BASIC" -oa "$OUT/RAMSIN_ADVANCED" \
+        >/dev/null
+}
+
+render RAMSIN_MODEL_GRIDS_DTLONG=20 RAMSIN_DTLONG=15 || exit 1
+expect_value "$OUT/RAMSIN_BASIC" model_grids dtlong 20.0 "qualified before plain"
+render RAMSIN_DTLONG=15 RAMSIN_MODEL_GRIDS_DTLONG=20 || exit 1
+expect_value "$OUT/RAMSIN_BASIC" model_grids dtlong 20.0 "plain before qualified"
+
+render ramsin_timmax=12 RAMSIN_Model_Grids2_Nacoust=4 RAMSIN_NOT_A_VARIABLE=1 || exit 1
+expect_value "$OUT/RAMSIN_BASIC" model_grids timmax 12.0 "lower case name"
+expect_value "$OUT/RAMSIN_ADVANCED" model_grids2 nacoust 4 "mixed case qualified name"
+
+render RAMSIN_IPLEVS=1000,850,500 || exit 1
+expect_value "$OUT/RAMSIN_BASIC" post iplevs "[1000, 850, 500]" "integer list"
+
+error=$(render RAMSIN_IPLEVS=1,a 2>&1)
+status=$?
+if [ $status -ne 2 ] || [ "$(echo "$error" | wc -l)" -ne 1 ] \
+        || ! echo "$error" | grep -q "RAMSIN_IPLEVS"; then
+    fail "a malformed RAMSIN_IPLEVS is not reported on one line naming it:" "$error"
+fi
+
+echo "OK: RAMSIN_* variables resolve with group-qualified precedence and named errors"
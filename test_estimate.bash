@@ -0,0 +1,83 @@
+#!/bin/bash
+# Checks ramsin_env.py estimate against hand-computed costs: a --cost_table
+# that leaves only the dynamics (1 core-second per grid-point-timestep) or only
+# the radiation, a nest refined by NSTRATX and NNDTRAT, the table and --json
+# outputs, the warning that nests are costed with the coarse grid size, and the
+# error for an NXTNEST that names no coarser grid.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+cat > "$OUT/dynamics.json" <<'EOF'
+{"dynamics": 1.0, "acoustic": 0.0, "microphysics": {"2": 0.0}, "radiation": {"6": 0.0},
+ "cumulus": {"8": 0.0}, "memory": {"base": 8, "microphysics": {"2": 0}}}
+EOF
+cat > "$OUT/radiation.json" <<'EOF'
+{"dynamics": 0.0, "acoustic": 0.0, "microphysics": {"2": 0.0}, "radiation": {"6": 3600.0},
+ "cumulus": {"8": 0.0}}
+EOF
+
+# 1 h of a 10x10x10 grid at DTLONG = 60 s and a nest with NSTRATX = 3 and
+# NNDTRAT = 4 from the template
+estimate() {
+    isolated RAMSIN_TIMMAX=1 RAMSIN_DTLONG=60 RAMSIN_NNXP=10 \
+        RAMSIN_NNYP=10 RAMSIN_NNZP=10 RAMSIN_Model_Grids2_Ngrids=2 "$@"
+}
+
+field() {
+    python3 -c 'import json, sys
+result = json.load(open(sys.argv[1]))
+for key in sys.argv[2:]:
+    result = result[int(key) if isinstance(result, list) else key]
+print(result)' "$@"
+}
+
+expect() {
+    local got
+    got=$(field "$OUT/$1" "${@:2:$#-2}")
+    if [ "$got" != "${!#}" ]; then
+        fail "$1 ${*:2:$#-2} is $got, expected ${!#}"
+    fi
+}
+
+estimate python3 ramsin_env.py estimate --cost_table "$OUT/dynamics.json" --json - \
+    > "$OUT/dynamics.out" 2>/dev/null || exit 1
+expect dynamics.out duration_seconds 3600.0
+expect dynamics.out grids 0 timesteps 60
+expect dynamics.out grids 0 grid_point_timesteps 60000
+expect dynamics.out grids 1 dt 15.0
+expect dynamics.out grids 1 deltax 6666.666666666667
+expect dynamics.out grids 1 timesteps 240
+expect dynamics.out grid_point_timesteps 300000
+# (60000 + 240000) core-seconds
+expect dynamics.out core_hours 83.33333333333334
+expect dynamics.out memory_bytes 16000
+
+# RADFRQ = 1800 s: 2 radiation calls of 3600 s per grid point on each grid
+estimate python3 ramsin_env.py estimate --cost_table "$OUT/radiation.json" --json - \
+    > "$OUT/radiation.out" 2>/dev/null || exit 1
+expect radiation.out grids 0 core_hours 2000.0
+expect radiation.out core_hours 4000.0
+
+if ! output=$(estimate python3 ramsin_env.py estimate --cost_table "$OUT/dynamics.json" \
+        --json "$OUT/dynamics.file" 2>&1); then
+    fail "estimate --json FILE" "$output"
+fi
+if ! echo "$output" | grep -q "total 3e+05 grid-point-timesteps, 83.3 core-hours"; then
+    fail "estimate --json FILE did not print the table" "$output"
+fi
+expect dynamics.file core_hours 83.33333333333334
+if ! echo "$output" | grep -q "grid 2 is costed with as many points"; then
+    fail "a nest was costed without a warning" "$output"
+fi
+output=$(estimate RAMSIN_Model_Grids2_Ngrids=1 python3 ramsin_env.py estimate 2>&1)
+if [ $? -ne 0 ] || echo "$output" | grep -q "warning"; then
+    fail "a single grid was not estimated without a warning" "$output"
+fi
+
+if output=$(estimate RAMSIN_Model_Grids2_Nxtnest=2,2 python3 ramsin_env.py estimate 2>&1) \
+        || ! echo "$output" | grep -q "NXTNEST of grid 2 must name a coarser grid"; then
+    fail "a nest of itself was not rejected" "$output"
+fi
+
+echo "OK: estimate matches the hand-computed costs"
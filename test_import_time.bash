@@ -0,0 +1,33 @@
+#!/bin/bash
+# Checks the import-time budget of ramsin_env.py with python3 -X importtime.
+# Budget is the cumulative import time of the ramsin_env module in microseconds,
+# taken as the best of RUNS imports.
+IMPORT_TIME_BUDGET_US=${IMPORT_TIME_BUDGET_US:-50000}
+RUNS=${RUNS:-5}
+DEFERRED_MODULES="pydantic f90nml ramsin_model ramsin_model_validator ramsin_adv_model ramsin_adv_model_validator"
+
+cd "$(dirname "$0")" || exit 1
+
+best=""
+for _ in $(seq "$RUNS"); do
+    report=$(python3 -X importtime -c "import ramsin_env" 2>&1 >/dev/null)
+
+    for module in $DEFERRED_MODULES; do
+        if echo "$report" | grep -qE "\| +${module}$"; then
+            echo "FAIL: importing ramsin_env also imports ${module}"
+            exit 1
+        fi
+    done
+
+    cumulative=$(echo "$report" | grep -E "\| ramsin_env$" | cut -d'|' -f2 | tr -d ' ')
+    if [ -z "$best" ] || [ "$cumulative" -lt "$best" ]; then
+        best=$cumulative
+    fi
+done
+
+if [ "$best" -gt "$IMPORT_TIME_BUDGET_US" ]; then
+    echo "FAIL: importing ramsin_env took ${best}us, budget is ${IMPORT_TIME_BUDGET_US}us"
+    exit 1
+fi
+
+echo "OK: importing ramsin_env took ${best}us, budget is ${IMPORT_TIME_BUDGET_US}us"
@@ -0,0 +1,120 @@
+#!/bin/bash
+# Checks that incremental validation against a pre-validated template gives
+# exactly what a full ramsin_rules validation gives (the coerced values and
+# the same errors in the same order) for random override sets, with extra
+# weight on the variables rules tie together.
+FUZZ_CASES=${FUZZ_CASES:-3000}
+FUZZ_SEED=${FUZZ_SEED:-1}
+
+cd "$(dirname "$0")" || exit 1
+
+python3 - "$FUZZ_CASES" "$FUZZ_SEED" <<'PYEOF'
+import random
+import sys
+
+import ramsin_incremental
+import ramsin_nml
+import ramsin_rules
+from ramsin_env import merge_overrides
+
+cases, seed = int(sys.argv[1]), int(sys.argv[2])
+rng = random.Random(seed)
+
+RANDOM_VALUES = [
+    0, 1, -1, 2, 3, 4, 5, 100, 0.0, 1.0, 2.5, 30.0, True, False, "", "X", "abc", "h",
+    "PB", "INITIAL", "1", "15", "15.", "2.5", "-2", " 3 ", "1e3", ".true.", "yes",
+    [], [1, 2], [1.5], [True], ["1", "2"], None,
+]
+# Variables read by the cross-group rules and by the rules comparing two
+# variables of a group, with values around their usual ones
+TIED_VALUES = {
+    ("model_grids", "dtlong"): [7, 15, 30.0, 60, 120.0, 0, "x"],
+    ("model_file_info", "frqanl"): [120, 600.0, 1000, 10800.0],
+    ("ccatt_info", "ccatt"): [0, 1, 2],
+    ("ccatt_info", "aerosol"): [0, 1],
+    ("ccatt_info", "chem_timestep"): [60.0, 120, 480.0, 500, 7200],
+    ("ccatt_info", "aer_timestep"): [60.0, 120, 480.0, 500],
+    ("model_grids", "nnzp"): [2, 3, 45],
+    ("model_grids", "deltaz"): [0.0, 80.0],
+    ("model_grids", "zz"): [[0.0, 20.0], [0.0, 20.0, 46.0]],
+    ("model_grids", "imonth1"): [2, 12, 13],
+    ("model_grids", "idate1"): [1, 29, 31],
+    ("model_grids", "iyear1"): [2020, 2021],
+    ("post", "nvp"): [1, 2, 3],
+    ("post", "vp"): [["topo"], ["topo", "precip"]],
+    ("model_options2", "npatch"): [1, 2, 3, 5],
+    ("model_options2", "nvegpat"): [1, 2, 3],
+    ("isan_isentropic2", "nisn"): [1, 2, 3],
+    ("isan_isentropic2", "levth"): [[280], [280, 290]],
+}
+
+
+def random_overrides(template):
+    overrides = {}
+    for _ in range(rng.randint(1, 4)):
+        if rng.random() < 0.5:
+            (group, name), choices = rng.choice(list(TIED_VALUES.items()))
+            if group not in template:
+                continue
+            value = rng.choice(choices)
+        else:
+            group = rng.choice(list(template))
+            if not template[group]:
+                continue
+            name = rng.choice(list(template[group]))
+            value = rng.choice(RANDOM_VALUES)
+        if rng.random() < 0.03:
+            name = "not_a_variable"
+        overrides.setdefault(group, {})[name] = value
+    return overrides
+
+
+def compare(label, values, ramsin_file):
+    expected = ramsin_rules.check_values(values, ramsin_file)
+    base = ramsin_incremental.BASES[ramsin_file]
+    got = base.check(values)
+    if got != expected:
+        print(f"FAIL: {label} (seed {seed})")
+        print(f"  full:        {expected[1]}")
+        print(f"  incremental: {got[1]}")
+        sys.exit(1)
+    # A caller changing the patch must not reach the base
+    for group in got[0].values():
+        group["changed_by_caller"] = True
+    return bool(expected[1])
+
+
+templates = {
+    "basic": dict(ramsin_nml.read("RAMSIN_BASIC").items()),
+    "advanced": dict(ramsin_nml.read("RAMSIN_ADVANCED").items()),
+}
+for ramsin_file, template in templates.items():
+    ramsin_incremental.prime(template, ramsin_file)
+    compare(ramsin_file, template, ramsin_file)
+
+rejected = 0
+for case in range(cases):
+    ramsin_file = rng.choice(list(templates))
+    template = templates[ramsin_file]
+    overrides = random_overrides(template)
+    values = merge_overrides(template, overrides)
+    if case % 5 == 0:
+        # Copies instead of the template's own group dicts
+        values = {group: dict(variables) for group, variables in values.items()}
+    rejected += compare(f"{ramsin_file} {overrides}", values, ramsin_file)
+
+    if case % 10 == 0:
+        # A variant, often invalid, as the base
+        ramsin_incremental.prime(values, ramsin_file)
+        compare(f"{ramsin_file} base {overrides}", template, ramsin_file)
+        more = random_overrides(template)
+        compare(f"{ramsin_file} base {overrides} with {more}",
+                merge_overrides(values, more), ramsin_file)
+        ramsin_incremental.prime(template, ramsin_file)
+
+for ramsin_file, template in templates.items():
+    compare(f"{ramsin_file} again", template, ramsin_file)
+
+print(f"OK: incremental validation matches a full validation on {cases} override sets "
+      f"({rejected} rejected)")
+PYEOF
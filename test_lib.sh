@@ -0,0 +1,35 @@
+# Helpers shared by the test_*.bash scripts, sourced once they have changed to
+# the repository directory. Sets $OUT to a temporary directory removed on exit.
+
+OUT=$(mktemp -d)
+trap 'rm -rf "$OUT"' EXIT
+
+# isolated [VAR=VALUE...] COMMAND...: runs COMMAND with only PATH, HOME and the
+# given variables, so the caller's RAMSIN_* variables do not leak in
+isolated() {
+    env -i PATH="$PATH" HOME="$HOME" "$@"
+}
+
+# value FILE GROUP VARIABLE: prints a value of a namelist read with ramsin_nml
+value() {
+    python3 -c 'import sys, ramsin_nml
+print(ramsin_nml.read(sys.argv[1])[sys.argv[2]][sys.argv[3]])' "$@"
+}
+
+# fail MESSAGE [OUTPUT]: reports a failure, with the output that shows it
+fail() {
+    echo "FAIL: $1"
+    if [ $# -gt 1 ]; then
+        echo "$2"
+    fi
+    exit 1
+}
+
+# expect_value FILE GROUP VARIABLE EXPECTED MESSAGE
+expect_value() {
+    local got
+    got=$(value "$1" "$2" "$3")
+    if [ "$got" != "$4" ]; then
+        fail "$5: $3 is $got, expected $4"
+    fi
+}
@@ -0,0 +1,59 @@
+#!/bin/bash
+# Checks --manifest: a second render of the same text reuses the outputs and
+# leaves their mtimes alone, a changed render, an output edited by hand and a
+# deleted output are written again, and copy-through runs use it too.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+render() {
+    isolated "$@" python3 ramsin_env.py --manifest "$OUT/manifest.json" \
+        -ob "$OUT/RAMSIN_BASIC" -oa "$OUT/RAMSIN_ADVANCED"
+}
+
+expect() {
+    # expect MESSAGE BASIC_STATUS ADVANCED_STATUS VAR=VALUE...
+    local message=$1 basic=$2 advanced=$3 output
+    shift 3
+    if ! output=$(render "$@" 2>&1); then
+        fail "$message" "$output"
+    fi
+    if ! echo "$output" | grep -qx "  $basic $OUT/RAMSIN_BASIC" \
+            || ! echo "$output" | grep -qx "  $advanced $OUT/RAMSIN_ADVANCED"; then
+        fail "$message: expected RAMSIN_BASIC $basic, RAMSIN_ADVANCED $advanced" "$output"
+    fi
+}
+
+mtimes() {
+    stat -c %y "$OUT/RAMSIN_BASIC" "$OUT/RAMSIN_ADVANCED"
+}
+
+expect "a first render" written written RAMSIN_DTLONG=15
+before=$(mtimes)
+sleep 0.05
+expect "the same render" reused reused RAMSIN_DTLONG=15
+if [ "$(mtimes)" != "$before" ]; then
+    fail "reused outputs were touched"
+fi
+
+expect "a changed RAMSIN_BASIC" written reused RAMSIN_DTLONG=20
+if ! grep -qi "dtlong = 20.0" "$OUT/RAMSIN_BASIC"; then
+    fail "the changed RAMSIN_BASIC was not written"
+fi
+
+echo "! edited" >> "$OUT/RAMSIN_ADVANCED"
+expect "an output edited by hand" reused written RAMSIN_DTLONG=20
+if grep -q "! edited" "$OUT/RAMSIN_ADVANCED"; then
+    fail "the output edited by hand was not replaced"
+fi
+
+rm "$OUT/RAMSIN_BASIC"
+expect "a deleted output" written reused RAMSIN_DTLONG=20
+
+expect "a copy-through" written written
+expect "the same copy-through" reused reused
+if ! cmp -s "$OUT/RAMSIN_BASIC" RAMSIN_BASIC; then
+    fail "the copy-through output differs from the template"
+fi
+
+echo "OK: --manifest reuses unchanged outputs and rewrites changed ones"
@@ -0,0 +1,79 @@
+#!/bin/bash
+# Checks the layering of --override_file: the template, then each file in the
+# order given, then RAMSIN_* variables, for TOML, JSON and .env files, and that
+# a bad file is reported by name.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+BASIC=$OUT/RAMSIN_BASIC
+ADVANCED=$OUT/RAMSIN_ADVANCED
+
+cat > "$OUT/site.toml" <<'EOF'
+[model_grids]
+dtlong = 30.0
+timmax = 12
+nnxp = 200
+
+[model_options2]
+slmstr = "7*0.3"
+EOF
+cat > "$OUT/case.json" <<'EOF'
+{"RAMSIN_TIMMAX": 48, "model_grids": {"nnxp": 150}}
+EOF
+cat > "$OUT/run.env" <<'EOF'
+# comments and other names are ignored
+export RAMSIN_NNXP="120"
+PATH=/nowhere
+EOF
+
+template_dtlong=$(value RAMSIN_BASIC model_grids dtlong)
+
+render() {
+    isolated "$@" -ob "$BASIC" -oa "$ADVANCED" >/dev/null
+}
+
+render python3 ramsin_env.py --override_file "$OUT/site.toml" || exit 1
+expect_value "$BASIC" model_grids dtlong 30.0 "one TOML file"
+expect_value "$BASIC" model_grids nnxp 200 "one TOML file"
+expect_value "$ADVANCED" model_options2 slmstr "[0.3, 0.3, 0.3, 0.3, 0.3, 0.3, 0.3]" \
+    "compact encoding in a TOML file"
+
+render python3 ramsin_env.py --override_file "$OUT/site.toml" --override_file "$OUT/case.json" \
+    || exit 1
+expect_value "$BASIC" model_grids timmax 48.0 "the later JSON file wins"
+expect_value "$BASIC" model_grids nnxp 150 "the later JSON file wins"
+expect_value "$BASIC" model_grids dtlong 30.0 "the earlier file keeps what the later one leaves"
+
+render python3 ramsin_env.py --override_file "$OUT/case.json" --override_file "$OUT/site.toml" \
+    || exit 1
+expect_value "$BASIC" model_grids timmax 12.0 "the later TOML file wins"
+expect_value "$BASIC" model_grids nnxp 200 "the later TOML file wins"
+
+render RAMSIN_NNXP=90 RAMSIN_DTLONG=15 python3 ramsin_env.py \
+    --override_file "$OUT/site.toml" --override_file "$OUT/run.env" || exit 1
+expect_value "$BASIC" model_grids nnxp 90 "RAMSIN_* variables win over the files"
+expect_value "$BASIC" model_grids dtlong 15.0 "RAMSIN_* variables win over the files"
+expect_value "$BASIC" model_grids timmax 12.0 "the files win over the template"
+
+render python3 ramsin_env.py --override_file "$OUT/site.toml" --override_file "$OUT/run.env" \
+    || exit 1
+expect_value "$BASIC" model_grids nnxp 120 "the .env file wins over the earlier TOML file"
+
+render python3 ramsin_env.py || exit 1
+expect_value "$BASIC" model_grids dtlong "$template_dtlong" "no file keeps the template"
+
+# batch parses the files once for all members, the members win over them
+printf '{"expnme": "a"}\n{"expnme": "b", "dtlong": 10}\n' > "$OUT/members.jsonl"
+isolated python3 ramsin_env.py batch "$OUT/members.jsonl" -j 1 \
+    --override_file "$OUT/site.toml" -ob "$OUT/{index}_RAMSIN_BASIC" \
+    -oa "$OUT/{index}_RAMSIN_ADVANCED" >/dev/null || exit 1
+expect_value "$OUT/0_RAMSIN_BASIC" model_grids dtlong 30.0 "a batch member without DTLONG"
+expect_value "$OUT/1_RAMSIN_BASIC" model_grids dtlong 10.0 "a batch member with DTLONG"
+
+echo '{"model_grids": {"not_a_variable": 1}}' > "$OUT/bad.json"
+error=$(render python3 ramsin_env.py --override_file "$OUT/bad.json" 2>&1)
+if ! echo "$error" | grep -q "bad.json: MODEL_GRIDS has no variable NOT_A_VARIABLE"; then
+    fail "an unknown variable in an override file is not reported by name:" "$error"
+fi
+
+echo "OK: override files layer as template < files in order < RAMSIN_* variables"
@@ -0,0 +1,98 @@
+#!/bin/bash
+# Checks the parsed-template cache: a template is parsed once and then loaded
+# from the cache, parsed again when it changes, a broken entry is dropped, the
+# LRU cap holds, and renders with and without the cache are identical.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+python3 - "$OUT" <<'PYEOF'
+import os
+import pickle
+import sys
+
+import ramsin_cache
+import ramsin_nml
+
+out = sys.argv[1]
+cache_dir = os.path.join(out, "cache")
+template = os.path.join(out, "RAMSIN_BASIC")
+with open("RAMSIN_BASIC") as f:
+    text = f.read()
+with open(template, "w") as f:
+    f.write(text)
+
+parses = []
+
+
+def parse(content):
+    parses.append(content)
+    return ramsin_nml.reads(content)
+
+
+def fail(message):
+    print(f"FAIL: {message}")
+    sys.exit(1)
+
+
+def entries():
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith(".pickle"))
+
+
+first = ramsin_cache.cached_parse(template, parse, "native", cache_dir)
+second = ramsin_cache.cached_parse(template, parse, "native", cache_dir)
+if len(parses) != 1:
+    fail(f"an unchanged template was parsed {len(parses)} times")
+if second != first or second["model_grids"]["dtlong"] != first["model_grids"]["dtlong"]:
+    fail("the cached parse differs from the parse")
+if len(entries()) != 1:
+    fail(f"one template left {len(entries())} cache entries")
+
+with open(os.path.join(cache_dir, entries()[0]), "rb") as f:
+    entry = pickle.load(f)
+if set(entry) != {"key", "value"}:
+    fail(f"a cache entry holds {sorted(entry)}, expected only the key and the value")
+
+ramsin_cache.cached_parse(template, parse, "f90nml-tag", cache_dir)
+if len(parses) != 2:
+    fail("a different parser tag reused the entry of another parser")
+
+with open(template, "w") as f:
+    f.write(text.replace("DTLONG   = 120.", "DTLONG   = 60."))
+changed = ramsin_cache.cached_parse(template, parse, "native", cache_dir)
+if len(parses) != 3 or changed["model_grids"]["dtlong"] != 60.0:
+    fail("a changed template was not parsed again")
+
+for name in entries():
+    with open(os.path.join(cache_dir, name), "wb") as f:
+        f.write(b"not a pickle")
+again = ramsin_cache.cached_parse(template, parse, "native", cache_dir)
+if len(parses) != 4 or again["model_grids"]["dtlong"] != 60.0:
+    fail("a broken cache entry was not dropped and parsed again")
+
+size = os.path.getsize(os.path.join(cache_dir, entries()[0]))
+for n in range(6):
+    with open(template, "w") as f:
+        f.write(text + f"! {n}\n")
+    ramsin_cache.cached_parse(template, parse, "native", cache_dir, max_bytes=3 * size)
+total = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in entries())
+if total > 3 * size:
+    fail(f"the cache holds {total} bytes, over its {3 * size} byte cap")
+PYEOF
+[ $? -eq 0 ] || exit 1
+
+for parser in f90nml native; do
+    for cache in "--cache_dir $OUT/render-cache" "--cache_dir $OUT/render-cache" "--no-cache"; do
+        isolated RAMSIN_DTLONG=15 python3 ramsin_env.py \
+            --parser "$parser" $cache -ob "$OUT/RAMSIN_BASIC_$parser" \
+            -oa "$OUT/RAMSIN_ADVANCED_$parser" >/dev/null || exit 1
+        if [ -n "$previous" ] && ! cmp -s "$OUT/RAMSIN_BASIC_$parser" "$previous"; then
+            fail "--parser $parser $cache renders differently"
+        fi
+        previous=$OUT/previous
+        cp "$OUT/RAMSIN_BASIC_$parser" "$previous"
+    done
+    unset previous
+done
+
+echo "OK: parsed templates are cached, invalidated on change and capped"
@@ -0,0 +1,77 @@
+#!/bin/bash
+# Checks --preflight from a run directory holding the inputs: the MAKESFC
+# dataset headers of the flagged datasets, the INITIAL soil moisture of the
+# start date or of one of the days before, and the CCATT emission maps. Each
+# missing input is reported by variable and nothing is written.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+REPO=$PWD
+cd "$OUT" || exit 1
+
+render() {
+    rm -f RAMSIN_BASIC_OUT RAMSIN_ADVANCED_OUT
+    isolated "$@" python3 "$REPO/ramsin_env.py" --preflight \
+        -rb "$REPO/RAMSIN_BASIC" -ra "$REPO/RAMSIN_ADVANCED" \
+        -ob RAMSIN_BASIC_OUT -oa RAMSIN_ADVANCED_OUT 2>&1
+}
+
+passes() {
+    local output
+    if ! output=$(render "${@:2}") || [ ! -f RAMSIN_ADVANCED_OUT ]; then
+        fail "$1" "$output"
+    fi
+}
+
+fails() {
+    # fails MESSAGE "LINE..." VAR=VALUE...
+    local output line
+    if output=$(render "${@:3}") || [ -f RAMSIN_BASIC_OUT ]; then
+        fail "$1: the run was not stopped" "$output"
+    fi
+    while IFS= read -r line; do
+        if ! echo "$output" | grep -qxF "  $line"; then
+            fail "$1: not reported: $line" "$output"
+        fi
+    done <<< "$2"
+}
+
+fails "MAKESFC without the datasets" "ITOPTFN: directory ./datafix_model/topo1km not found
+ISSTFN: directory ./datafix_model/sst_week not found
+NDVIFN: directory ./datafix_model/NDVI-MODIS_GRADS not found" RAMSIN_RUNTYPE=MAKESFC
+
+mkdir -p datafix_model/topo1km datafix_model/sst_week datafix_model/GL_OGE_INPE \
+    datafix_model/GL_FAO_INPE datafix_model/NDVI-MODIS_GRADS
+touch datafix_model/topo1km/ELHEADER datafix_model/GL_OGE_INPE/OGEHEADER \
+    datafix_model/GL_FAO_INPE/FAOHEADER datafix_model/NDVI-MODIS_GRADS/NHEADER
+fails "MAKESFC without one header" "ISSTFN: ./datafix_model/sst_week/WHEADER not found" \
+    RAMSIN_RUNTYPE=MAKESFC
+passes "MAKESFC with the dataset not read" RAMSIN_RUNTYPE=MAKESFC RAMSIN_ISSTFLG=0,0,0,0,0
+touch datafix_model/sst_week/WHEADER
+passes "MAKESFC with every header" RAMSIN_RUNTYPE=MAKESFC
+
+# Start 2020-12-01 00:00, SOIL_MOIST_FAIL = l looks 5 days back
+fails "INITIAL without soil moisture" \
+    "USDATA_IN: directory ./datain/UMID not found" RAMSIN_RUNTYPE=INITIAL RAMSIN_SOIL_MOIST=i
+mkdir -p datain/UMID
+touch datain/UMID/GL_SM.GPNR.20201125.vfm
+fails "INITIAL with soil moisture 6 days old" \
+    "USDATA_IN: none of ./datain/UMID/GL_SM.GPNR.20201201*, ./datain/UMID/GL_SM.GPNR.20201130*, \
+./datain/UMID/GL_SM.GPNR.20201129*, ./datain/UMID/GL_SM.GPNR.20201128*, \
+./datain/UMID/GL_SM.GPNR.20201127*, ./datain/UMID/GL_SM.GPNR.20201126* found" \
+    RAMSIN_RUNTYPE=INITIAL RAMSIN_SOIL_MOIST=i
+touch datain/UMID/GL_SM.GPNR.20201127.vfm
+passes "INITIAL with soil moisture 4 days old" RAMSIN_RUNTYPE=INITIAL RAMSIN_SOIL_MOIST=i
+fails "INITIAL with soil moisture 4 days old and SOIL_MOIST_FAIL = s" \
+    "USDATA_IN: ./datain/UMID/GL_SM.GPNR.20201201* not found" \
+    RAMSIN_RUNTYPE=INITIAL RAMSIN_SOIL_MOIST=i RAMSIN_SOIL_MOIST_FAIL=s
+passes "INITIAL with homogeneous soil moisture" RAMSIN_RUNTYPE=INITIAL RAMSIN_SOIL_MOIST=n
+
+mkdir src
+fails "INITIAL without emission maps" "SRCMAPFN: ./src/map-T-2020-12-01-000000-g1.* not found" \
+    RAMSIN_RUNTYPE=INITIAL RAMSIN_CCATT=1 RAMSIN_SRCMAPFN=./src/map
+touch src/map-T-2020-12-01-000000-g1.vfm
+passes "INITIAL with emission maps" RAMSIN_RUNTYPE=INITIAL RAMSIN_CCATT=1 \
+    RAMSIN_SRCMAPFN=./src/map
+
+echo "OK: --preflight reports each missing input and passes when they exist"
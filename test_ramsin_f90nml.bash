@@ -103,3 +103,71 @@ f90nml -g ISAN_ISENTROPIC2 \
 
 mv ${OUTPREFIX}/RAMSIN_ADV_TMP ${OUTPREFIX}/RAMSIN_ADV_"$JOBNAME"
 rm ${OUTPREFIX}/RAMSIN_ADV
+
+
+## The same edits in one pass with ramsin_env.py patch, checked against the chain above
+
+python3 "$(dirname "$0")"/ramsin_env.py patch \
+    -rb ${PRE_SUBMIT_DIR}/$RAMSIN_BASIC -ra ${PRE_SUBMIT_DIR}/$RAMSIN_ADV \
+    -ob ${OUTPREFIX}/RAMSIN_PATCH_"$JOBNAME" -oa ${OUTPREFIX}/RAMSIN_ADV_PATCH_"$JOBNAME" \
+    -g MODEL_ADV_RAMSIN \
+    -v ADVANCED_RAMSIN=\""${OUTPREFIX}"/RAMSIN_ADV_"$JOBNAME"\" \
+    -g MODEL_GRIDS \
+    -v EXPNME="$EXPNME" \
+    -v TIMMAX=$TIMMAX \
+    -v IMONTH1=$IMONTH1 \
+    -v IDATE1=$IDATE1 \
+    -v IYEAR1=$IYEAR1 \
+    -v DTLONG=$DTLONG \
+    -g MODEL_FILE_INFO \
+    -v VARFPFX=\'${OUTPREFIX}/IVAR/FRN\' \
+    -v HFILOUT=\'${OUTPREFIX}/HIS/FRN\' \
+    -v AFILOUT=\'${OUTPREFIX}/ANL/FRN\' \
+    -v TOPFILES=\'${OUTPREFIX}/SFC/top_OQ3g_FRN\' \
+    -v SFCFILES=\'${OUTPREFIX}/SFC/sfc_OQ3g_FRN\' \
+    -v SSTFPFX=\'${OUTPREFIX}/SFC/sst_OQ3g_FRN\' \
+    -v NDVIFPFX=\'${OUTPREFIX}/SFC/ndv_OQ3g_FRN\' \
+    -v FRQANL=$FRQANL \
+    -v IVEGTFN=\"/home/oper/prevtempo/datafix/MapBiomas/Bio+LU\" \
+    -v ISSTFN=\"/home/oper/prevtempo/datain/sst_week/W\" \
+    -v ISOILFN=\"${INPREFIX}/datafix_model/GL_FAO_INPE/FAO\" \
+    -v NDVIFN=\"${INPREFIX}/datafix_model/NDVI-MODIS_GRADS/N\" \
+    -v ITOPTFN=\"${INPREFIX}/datafix_model/topo1km/EL\" \
+    -g MODEL_OPTIONS \
+    -v USMODEL_IN=\"\" \
+    -v USDATA_IN=\"${INPREFIX}/dados/SOIL_MOISTURE/dados_JULES/${IYEAR1}${IMONTH1}/AM.YYYYMMDD.nc\" \
+    -g ISAN_CONTROL \
+    -v VARPFX=\"${OUTPREFIX}/IVAR/FRN\" \
+    -g ISAN_ISENTROPIC \
+    -v ICFILETYPE=4 \
+    -v ICPREFIX=\"${SCRATCH}/mateusff/GRADS/${DATE}00/IC\" \
+    -g POST \
+    -v GPREFIX=\"${OUTPREFIX}/POST/FRN25KM\" \
+    -g MODEL_FILE_INFO2 \
+    -v COLTABFN=\"${INPREFIX}/tables/micro/ct2.0\" \
+    -v MAPAOTFILE=\"${INPREFIX}/tables/rad_carma/infMapAOT.vfm\" \
+    -v JULESIN=\"./jules.in\" \
+    -g MODEL_OPTIONS2 \
+    -v RADDATFN=\"${INPREFIX}/tables/rad_carma/rad_param.data\" \
+    -g ISAN_ISENTROPIC2 \
+    -v ICGRADSPREFIX=\"${OUTPREFIX}/IC/icGrads\" \
+    >/dev/null || exit 1
+
+python3 - ${OUTPREFIX}/RAMSIN_"$JOBNAME" ${OUTPREFIX}/RAMSIN_PATCH_"$JOBNAME" \
+    ${OUTPREFIX}/RAMSIN_ADV_"$JOBNAME" ${OUTPREFIX}/RAMSIN_ADV_PATCH_"$JOBNAME" <<'PYEOF' || exit 1
+import sys
+import f90nml
+
+for chained, patched in zip(sys.argv[1::2], sys.argv[2::2]):
+    expected, got = f90nml.read(chained).todict(), f90nml.read(patched).todict()
+    # Numbers compare by value: patch writes TIMMAX = 24 as the REAL 24.0
+    if got != expected:
+        for group in expected:
+            for name, value in expected[group].items():
+                other = got.get(group, {}).get(name)
+                if other != value:
+                    print(f"  {group}.{name}: f90nml={value!r} patch={other!r}")
+        print(f"FAIL: ramsin_env.py patch and the f90nml chain give different {chained}")
+        sys.exit(1)
+print("OK: ramsin_env.py patch gives the values of the chained f90nml calls")
+PYEOF
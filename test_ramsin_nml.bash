@@ -0,0 +1,240 @@
+#!/bin/bash
+# Differential test of the native RAMSIN reader (ramsin_nml) against f90nml.read
+# on the shipped templates and on randomly re-formatted and mutated variants.
+# Also checks that values spliced into each variant read back as expected and
+# that a shorter list drops the lines it leaves empty.
+FUZZ_CASES=${FUZZ_CASES:-300}
+FUZZ_SEED=${FUZZ_SEED:-1}
+
+cd "$(dirname "$0")" || exit 1
+
+python3 - "$FUZZ_CASES" "$FUZZ_SEED" <<'PYEOF'
+import json
+import random
+import sys
+
+import f90nml
+import ramsin_nml
+
+cases, seed = int(sys.argv[1]), int(sys.argv[2])
+rng = random.Random(seed)
+
+
+def plain(value):
+    if isinstance(value, dict):
+        return {k: plain(v) for k, v in value.items()}
+    return value
+
+
+def check(label, text):
+    expected = plain(f90nml.reads(text).todict())
+    # json keeps int/float/bool distinct, unlike ==
+    got = ramsin_nml.reads(text)
+    if json.dumps(got) != json.dumps(expected):
+        print(f"FAIL: {label}")
+        print(text)
+        for group in expected:
+            for name in expected[group]:
+                if json.dumps(expected[group][name]) != json.dumps(got.get(group, {}).get(name)):
+                    print(f"  {group}.{name}: f90nml={expected[group][name]!r} "
+                          f"native={got.get(group, {}).get(name)!r}")
+        sys.exit(1)
+
+
+def check_splice(label, text):
+    namelist = ramsin_nml.reads(text)
+    patch = {}
+    for group, variables in namelist.items():
+        for name, value in variables.items():
+            if rng.random() < 0.2:
+                patch.setdefault(group, {})[name] = random_value(value)
+    expected = plain(f90nml.reads(text).todict())
+    for group, variables in patch.items():
+        expected[group].update(variables)
+
+    spliced = namelist.splice(patch)
+    got = plain(f90nml.reads(spliced).todict())
+    if json.dumps(got) != json.dumps(expected):
+        print(f"FAIL: splice into {label}")
+        print(spliced)
+        sys.exit(1)
+    if comments(spliced) != comments(text):
+        print(f"FAIL: splice into {label} changed the comments")
+        print(spliced)
+        sys.exit(1)
+
+
+def comments(text):
+    return [m.group() for m in ramsin_nml.TOKEN_RE.finditer(text) if m.lastgroup == "comment"]
+
+
+def check_splice_zz():
+    # The comments on the lines of a multi-line value stay on their lines
+    namelist = ramsin_nml.read("RAMSIN_BASIC")
+    zz = namelist["model_grids"]["zz"]
+    for new in ([z + 1 for z in zz], zz[:10], zz + [26000.0, 27000.0], [0.0, 50.0]):
+        spliced = namelist.splice({"model_grids": {"zz": new}})
+        if ramsin_nml.reads(spliced)["model_grids"]["zz"] != new:
+            print(f"FAIL: splice of {len(new)} ZZ levels reads back differently")
+            sys.exit(1)
+        lines = spliced.splitlines()
+        block = lines[next(i for i, line in enumerate(lines) if line.lstrip().startswith("ZZ")):]
+        for comment in ["!Vertical levels if DELTAZ = 0  !#1", "!# 02 to 06", "!# 42 to 45"]:
+            if not any(line.rstrip().endswith(comment) for line in block[:20]):
+                print(f"FAIL: splice of {len(new)} ZZ levels lost {comment!r}")
+                print("\n".join(block[:20]))
+                sys.exit(1)
+        if len(new) == len(zz) and len(block[1].split(",")) != 6:
+            print("FAIL: splice of as many ZZ levels changed the values on each line")
+            print("\n".join(block[:12]))
+            sys.exit(1)
+
+
+def check_splice_shrink():
+    # Lines a shorter list leaves empty go, those with a comment stay
+    namelist = ramsin_nml.read("RAMSIN_BASIC")
+    spliced = namelist.splice({"post": {"vp": ["topo", "precip"]}})
+    if ramsin_nml.reads(spliced)["post"]["vp"] != ["topo", "precip"]:
+        print("FAIL: splice of a shorter VP reads back differently")
+        sys.exit(1)
+    if len(spliced.splitlines()) != len(namelist.text.splitlines()) - 11:
+        print("FAIL: splice of 2 of the 13 VP lines did not drop the 11 others")
+        print(spliced)
+        sys.exit(1)
+    spliced = namelist.splice({"model_grids": {"zz": [0.0, 50.0]}})
+    if any(not line.strip() for line in spliced.splitlines()
+           if line not in namelist.text.splitlines()):
+        print("FAIL: splice of 2 ZZ levels left blank lines")
+        print(spliced)
+        sys.exit(1)
+
+
+def random_case(name):
+    return "".join(c.upper() if rng.random() < 0.5 else c.lower() for c in name)
+
+
+def comment():
+    return rng.choice(["", "", " ! note", " !'quoted' = \"x\", /", " !# 1 to 5", "   !"])
+
+
+def format_float(v):
+    style = rng.randrange(6)
+    if style == 0:
+        text = repr(v)
+    elif style == 1 and v == int(v) and abs(v) < 1e15:
+        text = f"{int(v)}."
+    elif style == 2:
+        text = f"{v:e}"
+    elif style == 3:
+        text = f"{v:E}".replace("E", "D")
+    elif style == 4 and 0 < abs(v) < 1:
+        text = f"{v:.6f}".replace("0.", ".", 1)
+    else:
+        text = repr(v)
+    if v >= 0 and rng.random() < 0.2:
+        text = "+" + text
+    return text
+
+
+def format_scalar(v):
+    if isinstance(v, bool):
+        return rng.choice([[".true.", ".TRUE.", "T", ".t."], [".false.", "F", ".f."]][not v])
+    if isinstance(v, int):
+        text = str(v)
+        if v >= 0 and rng.random() < 0.2:
+            text = "0" * rng.randrange(1, 3) + text
+        return text
+    if isinstance(v, float):
+        return format_float(v)
+    quote = rng.choice(["'", '"'])
+    return quote + v.replace(quote, quote * 2) + quote
+
+
+def format_values(values):
+    items = []
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1] == values[i] \
+                and type(values[j + 1]) is type(values[i]):
+            j += 1
+        if j > i and rng.random() < 0.5:
+            items.append(f"{j - i + 1}*{format_scalar(values[i])}")
+            i = j + 1
+        else:
+            items.append(format_scalar(values[i]))
+            i += 1
+
+    text = ""
+    for n, item in enumerate(items):
+        text += item
+        if n < len(items) - 1:
+            text += rng.choice([",", ", ", " ,", ",  "]) if rng.random() < 0.9 else " "
+            if rng.random() < 0.15:
+                text += comment() + "\n" + " " * rng.randrange(8)
+    if rng.random() < 0.7:
+        text += ","
+    return text
+
+
+def random_value(like):
+    kind = type(like[0] if isinstance(like, list) else like)
+    size = len(like) if isinstance(like, list) else 1
+    if rng.random() < 0.2:
+        size = rng.randrange(1, 60)
+
+    def one():
+        if kind is bool:
+            return rng.random() < 0.5
+        if kind is int:
+            return rng.randrange(-10 ** 6, 10 ** 6)
+        if kind is float:
+            return rng.choice([0.0, 1.0, -2.5, 1e-7, 12345.678, rng.uniform(-1e5, 1e5)])
+        alphabet = "abcXYZ ./!=,&$_-'\"0123"
+        return "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 12)))
+
+    values = [one() for _ in range(size)]
+    return values if size > 1 else values[0]
+
+
+def render(namelist, mutate):
+    lines = []
+    for group, variables in namelist.items():
+        dollar = rng.random() < 0.7
+        lines.append(" " * rng.randrange(3) + ("$" if dollar else "&")
+                     + random_case(group) + comment())
+        for name, value in variables.items():
+            if mutate and rng.random() < 0.3:
+                value = random_value(value)
+            values = value if isinstance(value, list) else [value]
+            spaces = " " * rng.randrange(4)
+            lines.append(f"{' ' * rng.randrange(1, 6)}{random_case(name)}{spaces}="
+                         f"{' ' * rng.randrange(3)}{format_values(values)}{comment()}")
+            if rng.random() < 0.1:
+                lines.append("")
+        lines.append(" " + (rng.choice(["$END", "$end"]) if dollar else "/"))
+        lines.append(rng.choice(["", "! between groups"]))
+    return "\n".join(lines) + "\n"
+
+
+check_splice_zz()
+check_splice_shrink()
+
+templates = {}
+for path in ["RAMSIN_BASIC", "RAMSIN_ADVANCED"]:
+    with open(path) as f:
+        text = f.read()
+    check(path, text)
+    check_splice(path, text)
+    templates[path] = plain(f90nml.reads(text).todict())
+
+for case in range(cases):
+    path = rng.choice(list(templates))
+    label = f"{path} variant {case} (seed {seed})"
+    text = render(templates[path], case % 2 == 1)
+    check(label, text)
+    check_splice(label, text)
+
+print(f"OK: native reader and splice writer match f90nml on both templates "
+      f"and {cases} variants")
+PYEOF
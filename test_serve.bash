@@ -0,0 +1,132 @@
+#!/bin/bash
+# Checks the ramsin_env.py serve daemon: renders sent over its socket match
+# local renders, paths are taken from the client's directory, concurrent
+# requests share lazy templates safely, a changed template is read again,
+# errors come back to the client and the client renders itself when no daemon
+# listens.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+REPO=$PWD
+
+SOCKET=$OUT/ramsin_env.sock
+trap 'kill $SERVER 2>/dev/null; wait $SERVER 2>/dev/null; rm -rf "$OUT"' EXIT
+
+mkdir -p "$OUT/run"
+cp RAMSIN_BASIC RAMSIN_ADVANCED "$OUT/run/"
+echo '{"model_grids": {"timmax": 6}}' > "$OUT/run/site.json"
+
+python3 ramsin_env.py serve --socket "$SOCKET" >"$OUT/serve.log" 2>&1 &
+SERVER=$!
+for _ in $(seq 100); do
+    [ -S "$SOCKET" ] && break
+    sleep 0.1
+done
+if [ ! -S "$SOCKET" ]; then
+    fail "the daemon did not start" "$(cat "$OUT/serve.log")"
+fi
+
+render() {
+    # render "RAMSIN_X=1 ..." ARGS, run from the run directory: relative paths
+    # are the client's
+    local vars=$1
+    shift
+    (cd "$OUT/run" && isolated $vars python3 "$REPO/ramsin_env.py" \
+        -rb RAMSIN_BASIC -ra RAMSIN_ADVANCED "$@")
+}
+
+for writer in f90nml splice; do
+    for vars in "RAMSIN_DTLONG=15" "RAMSIN_DTLONG=20 RAMSIN_EXPNME=served"; do
+        render "$vars RAMSIN_ENV_SOCKET=$SOCKET" --writer $writer --override_file site.json \
+            -ob remote_B -oa remote_A >"$OUT/remote.log" 2>&1 \
+            || fail "$vars --writer $writer through the daemon" "$(cat "$OUT/remote.log")"
+        render "$vars" --writer $writer --override_file site.json -ob local_B -oa local_A \
+            >/dev/null || exit 1
+        if grep -q "rendering here" "$OUT/remote.log"; then
+            fail "the client rendered itself with a daemon running" "$(cat "$OUT/remote.log")"
+        fi
+        for file in B A; do
+            if ! cmp -s "$OUT/run/remote_$file" "$OUT/run/local_$file"; then
+                fail "$vars --writer $writer renders differently through the daemon" \
+                    "$(diff "$OUT/run/remote_$file" "$OUT/run/local_$file")"
+            fi
+        done
+    done
+done
+
+# Concurrent requests share the daemon's lazy templates while their groups are
+# parsed for the first time. A daemon run in the test process switches threads
+# often, so a request seeing a group half parsed shows up: each round starts
+# from fresh templates, reads them with one request leaving RAMSIN_ADVANCED
+# unparsed, then sends the others at once and compares them with renders from
+# templates of their own. FRQANL = 10800 s is a multiple of each DTLONG.
+python3 - "$OUT/threads.sock" "$OUT/run" <<'PYEOF' || exit 1
+import os
+import sys
+import threading
+
+from ramsin_client import request
+from ramsin_serve import TemplateStore, get_args, handle_request, make_server
+
+socket_path, run = sys.argv[1:]
+VARIANTS = ["RAMSIN_DTLONG=10 RAMSIN_SLMSTR=7*0.1", "RAMSIN_DTLONG=20 RAMSIN_NACOUST=3",
+            "RAMSIN_DTLONG=30 RAMSIN_NZG=7", "RAMSIN_DTLONG=40 RAMSIN_SLMSTR=7*0.4"]
+defaults = get_args(["--socket", socket_path])
+
+
+def message(variables):
+    return {"environ": dict(item.split("=") for item in variables.split()), "cwd": run,
+            "ramsin_basic": "RAMSIN_BASIC", "ramsin_advanced": "RAMSIN_ADVANCED",
+            "parser": "lazy", "writer": "splice"}
+
+
+expected = {variables: handle_request(message(variables), TemplateStore(False), defaults)
+            for variables in VARIANTS}
+sys.setswitchinterval(1e-6)
+for _ in range(20):
+    store = TemplateStore(False)
+    server = make_server(socket_path, store, defaults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    request(socket_path, message("RAMSIN_EXPNME=warm"))
+    barrier = threading.Barrier(4 * len(VARIANTS))
+    failures = []
+
+    def send(variables):
+        barrier.wait()
+        response = request(socket_path, message(variables))
+        if response != expected[variables]:
+            failures.append(f"{variables}: {response.get('error', 'rendered differently')}")
+
+    threads = [threading.Thread(target=send, args=(VARIANTS[n % len(VARIANTS)],))
+               for n in range(4 * len(VARIANTS))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+    server.server_close()
+    os.remove(socket_path)
+    if failures:
+        print("FAIL: concurrent lazy requests:\n" + "\n".join(failures))
+        sys.exit(1)
+PYEOF
+
+# A changed template is read again
+sed -i 's/DTLONG   = 120\./DTLONG   = 90./' "$OUT/run/RAMSIN_BASIC"
+render RAMSIN_EXPNME=changed --socket "$SOCKET" -ob remote_B -oa remote_A >/dev/null || exit 1
+if ! grep -qi "dtlong = 90.0" "$OUT/run/remote_B"; then
+    fail "the daemon rendered a stale template"
+fi
+
+output=$(render RAMSIN_DTLONG=abc --socket "$SOCKET" -ob remote_B -oa remote_A 2>&1)
+if [ $? -eq 0 ] || ! echo "$output" | grep -q "dtlong"; then
+    fail "an invalid value rendered through the daemon was not reported" "$output"
+fi
+
+output=$(render RAMSIN_DTLONG=15 --socket "$OUT/none.sock" -ob local_B -oa local_A 2>&1)
+if [ $? -ne 0 ] || ! echo "$output" | grep -q "rendering here" \
+        || ! grep -qi "dtlong = 15.0" "$OUT/run/local_B"; then
+    fail "the client did not render itself without a daemon" "$output"
+fi
+
+echo "OK: renders through the daemon match local renders"
@@ -0,0 +1,89 @@
+#!/bin/bash
+# Checks --sounding and --check_sounding: a CSV file with a header in another
+# column order and a text file with comments are written into MODEL_SOUND, and
+# unequal lengths, values out of bounds, pressures or heights out of order and
+# a bad header are reported.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+cat > "$OUT/sounding.csv" <<'EOF'
+TS,PS,RTS,US,VS
+20,1000,10,5,1
+10,850,8,10,2
+-20,500,2,20,3
+EOF
+cat > "$OUT/sounding.txt" <<'EOF'
+# PS TS RTS US VS
+1000 20 80 5 1
+850 10 70 10 2
+! the top level
+500 -30 30 20 3
+EOF
+
+render() {
+    isolated "$@" -ob "$OUT/RAMSIN_BASIC" -oa "$OUT/RAMSIN_ADVANCED" 2>&1
+}
+
+sound() {
+    python3 -c 'import sys, ramsin_nml
+sound = ramsin_nml.read(sys.argv[1])["model_sound"]
+print(*(sound[name] for name in ("ps", "ts", "rts", "us", "vs")))' "$OUT/RAMSIN_ADVANCED"
+}
+
+imports() {
+    local output got
+    if ! output=$(render "${@:3}"); then
+        fail "$1" "$output"
+    fi
+    got=$(sound)
+    if [ "$got" != "$2" ]; then
+        fail "$1: MODEL_SOUND holds $got"
+    fi
+}
+
+rejects() {
+    # rejects MESSAGE "LINE..." COMMAND...
+    local output line
+    if output=$(render "${@:3}"); then
+        fail "$1: the run was not stopped"
+    fi
+    while IFS= read -r line; do
+        if ! echo "$output" | grep -qF -- "$line"; then
+            fail "$1: not reported: $line" "$output"
+        fi
+    done <<< "$2"
+}
+
+if ! output=$(render python3 ramsin_env.py --check_sounding); then
+    fail "--check_sounding rejected the template sounding" "$output"
+fi
+
+imports "a CSV file with a header" "[1000.0, 850.0, 500.0] [20.0, 10.0, -20.0] \
+[10.0, 8.0, 2.0] [5.0, 10.0, 20.0] [1.0, 2.0, 3.0]" \
+    RAMSIN_IPSFLG=0 RAMSIN_IRTSFLG=2 python3 ramsin_env.py --sounding "$OUT/sounding.csv"
+imports "a text file with comments" "[1000.0, 850.0, 500.0] [20.0, 10.0, -30.0] \
+[80.0, 70.0, 30.0] [5.0, 10.0, 20.0] [1.0, 2.0, 3.0]" \
+    RAMSIN_IPSFLG=0 python3 ramsin_env.py --sounding "$OUT/sounding.txt"
+
+rejects "pressures with IPSFLG = 1" "Invalid sounding:
+PS heights must increase, PS(3) = 500 after PS(2) = 850" \
+    python3 ramsin_env.py --sounding "$OUT/sounding.csv"
+rejects "a relative humidity as a mixing ratio" \
+    "RTS(1) = 80 is outside [0, 50] g/kg (and 1 more levels)" \
+    RAMSIN_IPSFLG=0 RAMSIN_IRTSFLG=2 python3 ramsin_env.py --sounding "$OUT/sounding.txt"
+rejects "unequal lengths" \
+    "PS, TS, RTS, US and VS must have the same length, not PS 3, TS 11, RTS 11, US 11, VS 11" \
+    RAMSIN_PS=1010,1000,900 python3 ramsin_env.py --check_sounding
+rejects "a temperature out of bounds and heights out of order" \
+    "TS(1) = 99 is outside [-120, 60] C (and 2 more levels)
+PS heights must increase, PS(3) = 900 after PS(2) = 1000" \
+    RAMSIN_TS=99,99,99,1,1,1,1,1,1,1,1 \
+    RAMSIN_PS=1010,1000,900,3000,4000,6000,8000,11000,15000,20000,20001 \
+    python3 ramsin_env.py --check_sounding
+
+sed -i 's/^TS,/T,/' "$OUT/sounding.csv"
+rejects "a bad header" "must name the columns PS, TS, RTS, US and VS, not t, ps, rts, us, vs" \
+    RAMSIN_IPSFLG=0 python3 ramsin_env.py --sounding "$OUT/sounding.csv"
+
+echo "OK: --sounding imports CSV and text soundings and invalid soundings are reported"
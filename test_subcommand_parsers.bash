@@ -0,0 +1,31 @@
+#!/bin/bash
+# Checks that the dtlong and estimate subcommands run under every template
+# parser and print the same report with each, with and without an override.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+PARSERS="f90nml native lazy"
+
+for overrides in "" "RAMSIN_DTLONG=20 RAMSIN_TIMMAX=12"; do
+    for subcommand in "dtlong" "estimate --json -"; do
+        expected=""
+        for parser in $PARSERS; do
+            if ! output=$(isolated $overrides python3 ramsin_env.py $subcommand \
+                    --parser "$parser" --cache_dir "$OUT" -rb RAMSIN_BASIC 2>&1); then
+                fail "${overrides:+$overrides }ramsin_env.py $subcommand --parser $parser" \
+                    "$output"
+            fi
+            if [ -z "$expected" ]; then
+                expected=$output
+            elif [ "$output" != "$expected" ]; then
+                echo "FAIL: ${overrides:+$overrides }ramsin_env.py $subcommand --parser $parser" \
+                     "differs from --parser ${PARSERS%% *}"
+                diff <(echo "$expected") <(echo "$output")
+                exit 1
+            fi
+        done
+    done
+done
+
+echo "OK: dtlong and estimate give the same report with the $PARSERS parsers"
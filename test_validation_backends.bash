@@ -0,0 +1,95 @@
+#!/bin/bash
+# Checks that the validation backends (pydantic 1 models, ramsin_rules tables
+# and the pydantic v2 core schema) accept and reject the same namelists: both
+# templates, then variants with random values, removed and extra variables.
+# Prints the time each backend takes to validate the templates.
+FUZZ_CASES=${FUZZ_CASES:-2000}
+FUZZ_SEED=${FUZZ_SEED:-1}
+TIMING_REPEAT=${TIMING_REPEAT:-200}
+
+cd "$(dirname "$0")" || exit 1
+
+python3 - "$FUZZ_CASES" "$FUZZ_SEED" "$TIMING_REPEAT" <<'PYEOF'
+import json
+import random
+import sys
+
+import ramsin_nml
+from ramsin_env import VALIDATORS
+from ramsin_bench import best_of
+
+cases, seed, repeat = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+rng = random.Random(seed)
+
+# Values as they come from the templates and from RAMSIN_* variables. NaN is
+# left out: pydantic 1 lets it through every bound.
+RANDOM_VALUES = [
+    0, 1, -1, 2, 3, 4, 5, 100, 0.0, 1.0, 2.5, 30.0, True, False, "", "X", "abc", "h",
+    "PB", "INITIAL", "1", "15", "15.", "2.5", "-2", " 3 ", "1e3", ".true.", "yes",
+    [], [1, 2], [1.5], [True], ["1", "2"], None,
+]
+
+
+def decide(validate, values, ramsin_file):
+    try:
+        return True, json.dumps(validate(values, ramsin_file))
+    except ValueError as e:
+        # pydantic 1 and pydantic-core ValidationErrors are ValueErrors
+        return False, type(e).__name__
+    except KeyError:
+        # The pydantic 1 validators index values of variables that failed
+        return None, None
+
+
+def mutate(values):
+    values = {group: dict(variables) for group, variables in values.items()}
+    for _ in range(rng.randint(1, 3)):
+        group = rng.choice(list(values))
+        if not values[group]:
+            continue
+        name = rng.choice(list(values[group]))
+        r = rng.random()
+        if r < 0.03:
+            del values[group][name]
+        elif r < 0.05:
+            values[group]["not_a_variable"] = 1
+        else:
+            values[group][name] = rng.choice(RANDOM_VALUES)
+    return values
+
+
+templates = {
+    "basic": dict(ramsin_nml.read("RAMSIN_BASIC").items()),
+    "advanced": dict(ramsin_nml.read("RAMSIN_ADVANCED").items()),
+}
+
+checked = rejected = 0
+for case in range(-len(templates), cases):
+    if case < 0:
+        ramsin_file = list(templates)[case]
+        values, label = templates[ramsin_file], ramsin_file
+    else:
+        ramsin_file = rng.choice(list(templates))
+        values, label = mutate(templates[ramsin_file]), f"{ramsin_file} variant {case}"
+
+    decisions = {name: decide(validate, values, ramsin_file)
+                 for name, validate in VALIDATORS.items()}
+    if decisions["pydantic"][0] is None:
+        continue
+    checked += 1
+    accepted = decisions["pydantic"][0]
+    rejected += not accepted
+    for name, (ok, patch) in decisions.items():
+        if ok != accepted or (accepted and patch != decisions["pydantic"][1]):
+            print(f"FAIL: {label} (seed {seed}): pydantic accepted={accepted}, "
+                  f"{name} accepted={ok}")
+            sys.exit(1)
+
+print(f"OK: {', '.join(VALIDATORS)} agree on both templates and "
+      f"{checked - len(templates)} variants ({rejected} rejected)")
+
+for ramsin_file, values in templates.items():
+    for name, validate in VALIDATORS.items():
+        seconds = best_of(lambda: validate(values, ramsin_file), repeat)
+        print(f"  {ramsin_file:8} {name:13} {seconds * 1e6:8.1f} us per validation")
+PYEOF
@@ -0,0 +1,49 @@
+#!/bin/bash
+# Checks --emit_zz (the ZZ levels BRAMS derives from DELTAZ, DZRAT, DZMAX and
+# NNZP, written with DELTAZ = 0) with both writers, and --check_zz on an
+# explicit ZZ.
+
+cd "$(dirname "$0")" || exit 1
+. ./test_lib.sh
+
+run() {
+    isolated "$@" -ob "$OUT/RAMSIN_BASIC" -oa "$OUT/RAMSIN_ADVANCED"
+}
+
+# Spacings 100 * 2 ** k capped at 500: 200, 400, 500, 500
+for writer in f90nml splice; do
+    if ! output=$(run RAMSIN_DELTAZ=100 RAMSIN_DZRAT=2 RAMSIN_DZMAX=500 RAMSIN_NNZP=6 \
+            python3 ramsin_env.py --emit_zz --writer "$writer" 2>&1); then
+        fail "--emit_zz --writer $writer" "$output"
+    fi
+    zz=$(value "$OUT/RAMSIN_BASIC" model_grids zz)
+    deltaz=$(value "$OUT/RAMSIN_BASIC" model_grids deltaz)
+    if [ "$zz" != "[-50.0, 50.0, 250.0, 650.0, 1150.0, 1650.0]" ] || [ "$deltaz" != "0.0" ]; then
+        fail "--emit_zz --writer $writer wrote ZZ = $zz, DELTAZ = $deltaz"
+    fi
+done
+
+# Spacings 10, 20, 70: ratios 2 and 3.5
+if output=$(run RAMSIN_DELTAZ=0 RAMSIN_NNZP=4 RAMSIN_ZZ=0,10,30,100 \
+        python3 ramsin_env.py --check_zz 2>&1); then
+    fail "--check_zz accepted a ZZ stretching by 3.5"
+fi
+for message in "ZZ spacing grows by 2 from level 2 to 3, more than 1.2" \
+               "ZZ spacing grows by 3.5 from level 3 to 4, more than 1.2"; do
+    if ! echo "$output" | grep -qF "$message"; then
+        fail "--check_zz did not report: $message" "$output"
+    fi
+done
+
+if ! output=$(run RAMSIN_DELTAZ=0 RAMSIN_NNZP=4 RAMSIN_ZZ=0,10,30,100 \
+        python3 ramsin_env.py --check_zz --max_stretch 4 2>&1); then
+    fail "--check_zz --max_stretch 4 rejected a ZZ stretching by at most 3.5" "$output"
+fi
+
+if output=$(run RAMSIN_DELTAZ=0 RAMSIN_NNZP=4 RAMSIN_ZZ=0,10,5,100 \
+        python3 ramsin_env.py --check_zz --max_stretch 100 2>&1) \
+        || ! echo "$output" | grep -qF "level 3 (5) is not above level 2 (10)"; then
+    fail "--check_zz did not reject a decreasing ZZ" "$output"
+fi
+
+echo "OK: --emit_zz writes the derived levels and --check_zz reports each bad spacing"
@@ -290,10 +290,12 @@ def test_pydantic_validation():
 def test_pydantic_model_fill_with_f90nml_object():
 
     from ramsin_model import RamsinBasic
+    from ramsin_env import merge_overrides
+    from ramsin_env_resolver import resolve_environ
 
     with open("RAMSIN_BASIC") as f:
         ramsin_basic = f90nml.read(f)
-    values = ramsin_basic.values().mapping
+    values = merge_overrides(ramsin_basic.values().mapping, resolve_environ())
     #print(values)
     model = RamsinBasic(**values)
     #print(model)